@@ -1,9 +1,13 @@
-from .graph import AS, BGPDAG
+__version__ = "0.1.4"
+
+from .graph import AS, BGPDAG, BGPDAGView
 from .caida_collector import CaidaCollector
-from .links import CustomerProviderLink, PeerLink
+from .links import CustomerProviderLink, LinkSet, PeerLink
 
 __all__ = ["AS",
            "BGPDAG",
+           "BGPDAGView",
            "CaidaCollector",
            "CustomerProviderLink",
+           "LinkSet",
            "PeerLink"]
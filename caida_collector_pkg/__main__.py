@@ -1,3 +1,10 @@
+from argparse import ArgumentParser
+from csv import writer
+from datetime import datetime
+from pathlib import Path
+import sys
+from typing import List, Optional
+
 from .caida_collector import CaidaCollector
 
 
@@ -5,3 +12,33 @@ def main():
     """Runs CaidaCollector"""
 
     CaidaCollector().run()
+
+
+def diff_main(argv: Optional[List[str]] = None):
+    """Writes the relationship changes between two months as a TSV"""
+
+    parser = ArgumentParser(description="Relationship changes between two "
+                                        "months, without building graphs")
+    parser.add_argument("old_date", help="YYYY.MM.DD")
+    parser.add_argument("new_date", help="YYYY.MM.DD")
+    parser.add_argument("--cache-dir",
+                        type=Path,
+                        default=Path("/tmp/caida_collector_cache"))
+    parser.add_argument("--partitions", type=int, default=64)
+    parser.add_argument("--output", type=Path, help="Defaults to stdout")
+    args = parser.parse_args(argv)
+
+    changes = CaidaCollector().stream_diff(
+        datetime.strptime(args.old_date, "%Y.%m.%d"),
+        datetime.strptime(args.new_date, "%Y.%m.%d"),
+        cache_dir=args.cache_dir,
+        partitions=args.partitions)
+    f = args.output.open(mode="w") if args.output else sys.stdout
+    try:
+        tsv = writer(f, delimiter="\t", lineterminator="\n")
+        tsv.writerow(["change", "asn1", "asn2", "old_rel", "new_rel"])
+        for change in changes:
+            tsv.writerow(["" if x is None else x for x in change])
+    finally:
+        if args.output:
+            f.close()
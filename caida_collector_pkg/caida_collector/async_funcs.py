@@ -0,0 +1,155 @@
+"""Functions to collect Caida data in the background
+
+run_async overlaps I/O and compute: the index fetch, download and
+decompression to the text cache run on a thread pool, and parsing and
+building the graph run on an executor (a process by default). prefetch
+schedules run_async on a background event loop so that a long running
+process can build next month's graph while using this month's, and
+wait picks up the finished BGPDAG
+"""
+
+import asyncio
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from datetime import datetime
+import logging
+from pathlib import Path
+from threading import Thread
+from typing import Optional
+
+from .file_reading_funcs import EDGE_CACHE_SUFFIX
+from ..graph import BGPDAG
+
+# New in 3.7. Before that, get_event_loop is the running loop in coroutines
+_get_running_loop = getattr(asyncio,
+                            "get_running_loop",
+                            asyncio.get_event_loop)
+
+
+async def run_async(self,
+                    dl_time: Optional[datetime] = None,
+                    cache_dir: Path = Path("/tmp/caida_collector_cache"),
+                    tsv_path: Optional[Path] = Path(
+                        "/tmp/caida_collector.tsv"),
+                    executor: Optional[Executor] = None) -> BGPDAG:
+    """Same as run, but doesn't block the event loop
+
+    The graph is built by executor (a new single process pool if None)
+    and passed back through its snapshot in cache_dir. If anything
+    fails, only this month's cache files are removed
+    """
+
+    loop = _get_running_loop()
+    if dl_time is None:
+        dl_time = await loop.run_in_executor(None, self.default_dl_time)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+
+    try:
+        # Network I/O, so threads are enough
+        await loop.run_in_executor(None,
+                                   self._download_to_cache,
+                                   dl_time,
+                                   cache_dir)
+        # CPU heavy parsing and building
+        cpu_executor: Executor = (ProcessPoolExecutor(max_workers=1)
+                                  if executor is None else executor)
+        try:
+            await loop.run_in_executor(cpu_executor,
+                                       self._run_many_worker,
+                                       dl_time,
+                                       cache_dir)
+        finally:
+            if executor is None:
+                # The worker is done, don't block the loop on it exiting
+                cpu_executor.shutdown(wait=False)
+        bgp_dag: BGPDAG = await loop.run_in_executor(
+            None, self._load_snapshot_or_run, dl_time, cache_dir)
+        if tsv_path:
+            await loop.run_in_executor(None,
+                                       self._write_tsv,
+                                       bgp_dag,
+                                       tsv_path)
+    except Exception as e:
+        logging.error(f"Failed to collect {dl_time}: {e}")
+        self._clear_month_cache(dl_time, cache_dir)
+        raise
+    return bgp_dag
+
+
+def _download_to_cache(self, dl_time: datetime, cache_dir: Path):
+    """Downloads and decompresses a month into the text cache
+
+    Skipped if the month is already cached in any form
+    """
+
+    cache_path: Path = cache_dir / dl_time.strftime("%Y.%m.%d")
+    edge_cache_path: Path = cache_path.with_name(cache_path.name
+                                                 + EDGE_CACHE_SUFFIX)
+    if not (cache_path.exists()
+            or edge_cache_path.exists()
+            or self._get_snapshot_path(cache_dir, dl_time).exists()):
+        # The cache is written as the lines are consumed
+        for _ in self.read_file(cache_path, dl_time):
+            pass
+
+
+def prefetch(self,
+             dl_time: datetime,
+             cache_dir: Path = Path("/tmp/caida_collector_cache"),
+             tsv_path: Optional[Path] = None,
+             executor: Optional[Executor] = None) -> "Future[BGPDAG]":
+    """Starts collecting a month in the background. See run_async
+
+    Returns a concurrent.futures.Future of the BGPDAG, which can also be
+    picked up later with wait(dl_time). Prefetching the same month twice
+    returns the same future
+    """
+
+    if dl_time not in self._prefetches:
+        self._prefetches[dl_time] = asyncio.run_coroutine_threadsafe(
+            self.run_async(dl_time, cache_dir, tsv_path, executor),
+            self._get_background_loop())
+    future: Future[BGPDAG] = self._prefetches[dl_time]
+    return future
+
+
+def wait(self,
+         dl_time: Optional[datetime] = None,
+         timeout: Optional[float] = None) -> BGPDAG:
+    """Returns the BGPDAG of a prefetched month, blocking until it's done
+
+    If dl_time is None, waits on the earliest prefetch. Raises the
+    exception of a failed prefetch
+    """
+
+    if not self._prefetches:
+        raise Exception("Nothing has been prefetched")
+    if dl_time is None:
+        dl_time = next(iter(self._prefetches))
+    elif dl_time not in self._prefetches:
+        raise Exception(f"{dl_time} has not been prefetched")
+    future: Future[BGPDAG] = self._prefetches[dl_time]
+    try:
+        bgp_dag: BGPDAG = future.result(timeout=timeout)
+    except Exception:
+        # Timeouts can be waited on again, failures can't
+        if future.done():
+            del self._prefetches[dl_time]
+        raise
+    # Only picked up once, so the graph isn't kept alive by the collector
+    del self._prefetches[dl_time]
+    return bgp_dag
+
+
+def _get_background_loop(self) -> asyncio.AbstractEventLoop:
+    """Returns the event loop that prefetches run on
+
+    Started on first use in a daemon thread, so it never blocks exiting
+    """
+
+    if self._loop is None:
+        self._loop = asyncio.new_event_loop()
+        Thread(target=self._loop.run_forever,
+               name="caida_collector_prefetch",
+               daemon=True).start()
+    loop: asyncio.AbstractEventLoop = self._loop
+    return loop
@@ -0,0 +1,231 @@
+"""Functions to decompress bz2 files across many processes
+
+A bz2 stream is a header ("BZh" + level) followed by independently
+compressed blocks, each starting with a 48 bit magic number and its CRC,
+and ends with an end of stream magic and the combined CRC of every block.
+Blocks are bit aligned, not byte aligned.
+
+To decompress in parallel, the block magics are located at any bit offset,
+contiguous runs of blocks are cut out and wrapped in a new header and end
+of stream marker (with the recomputed combined CRC), and each of these
+standalone streams is decompressed by a worker. bz2 checks every CRC, so
+a spurious magic inside compressed data makes a chunk fail, in which case
+the rest is decompressed serially instead. Output is byte identical.
+
+Memory stays flat: the file is memory mapped, chunks are cut out as they
+are submitted, and only a few chunks per job are in flight at once
+"""
+
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+import bz2
+from functools import partial
+import logging
+from mmap import ACCESS_READ, mmap
+from pathlib import Path
+from typing import Deque, Iterator, List, Tuple, Union
+
+BLOCK_MAGIC: int = 0x314159265359
+EOS_MAGIC: int = 0x177245385090
+_MAGIC_BITS: int = 48
+_CRC_BITS: int = 32
+# Most bz2 blocks in a chunk (each is at most 900k decompressed), so that
+# chunks stay small however large the file is
+MAX_CHUNK_BLOCKS: int = 8
+# Chunks in flight per job
+CHUNKS_IN_FLIGHT: int = 2
+# Bytes read at a time when decompressing serially
+SERIAL_READ_SIZE: int = 1 << 18
+
+# The contents of a bz2 file
+BZ2_DATA = Union[bytes, mmap]
+
+
+def _find_magic(data: BZ2_DATA, magic: int) -> List[int]:
+    """Returns the bit offsets of every occurrence of a 48 bit magic"""
+
+    offsets: List[int] = []
+    for shift in range(8):
+        # 7 byte window with the magic starting shift bits in
+        window: bytes = (magic << (8 - shift)).to_bytes(7, "big")
+        first_mask: int = 0xFF >> shift
+        last_mask: int = (0xFF << (8 - shift)) & 0xFF
+        # The middle 5 bytes are always fully covered by the magic
+        middle: bytes = window[1:6]
+        i: int = data.find(middle, 1)
+        while i != -1:
+            start: int = i - 1
+            if (data[start] & first_mask == window[0] & first_mask
+                    and (last_mask == 0
+                         or (start + 6 < len(data)
+                             and data[start + 6] & last_mask == window[6]))):
+                offsets.append(start * 8 + shift)
+            i = data.find(middle, i + 1)
+    return sorted(offsets)
+
+
+def _get_bits(data: BZ2_DATA, start: int, end: int) -> int:
+    """Returns bits [start, end) of data as an int"""
+
+    first_byte: int = start // 8
+    last_byte: int = (end + 7) // 8
+    value: int = int.from_bytes(data[first_byte:last_byte], "big")
+    value >>= last_byte * 8 - end
+    return value & ((1 << (end - start)) - 1)
+
+
+def _get_chunks(data: BZ2_DATA, num_chunks: int) -> Iterator[bytes]:
+    """Splits a bz2 file into standalone streams of contiguous blocks
+
+    The file is split up front, and raises an exception if it can't be.
+    Chunks are cut out lazily, as they are iterated over
+    """
+
+    block_offsets: List[int] = _find_magic(data, BLOCK_MAGIC)
+    eos_offsets: List[int] = _find_magic(data, EOS_MAGIC)
+    if data[:3] != b"BZh" or len(eos_offsets) == 0:
+        raise Exception("Not a bz2 file")
+
+    # (header, [(start bit, end bit, crc) of every block]) of each stream
+    streams: List[Tuple[bytes, List[Tuple[int, int, int]]]] = []
+    stream_start: int = 0
+    for eos in eos_offsets:
+        header: bytes = data[stream_start // 8:stream_start // 8 + 4]
+        if not header.startswith(b"BZh"):
+            raise Exception(f"No bz2 header at bit {stream_start}")
+        starts: List[int] = [x for x in block_offsets
+                             if stream_start < x < eos]
+        blocks: List[Tuple[int, int, int]] = []
+        for start, end in zip(starts, starts[1:] + [eos]):
+            crc: int = _get_bits(data,
+                                 start + _MAGIC_BITS,
+                                 start + _MAGIC_BITS + _CRC_BITS)
+            blocks.append((start, end, crc))
+        streams.append((header, blocks))
+        # Streams are padded to a byte boundary
+        stream_start = (eos + _MAGIC_BITS + _CRC_BITS + 7) // 8 * 8
+
+    num_blocks: int = sum(len(blocks) for _, blocks in streams)
+    blocks_per_chunk: int = min(max(1, -(-num_blocks // max(num_chunks, 1))),
+                                MAX_CHUNK_BLOCKS)
+    return (_make_stream(data, header, blocks[i:i + blocks_per_chunk])
+            for header, blocks in streams
+            for i in range(0, len(blocks), blocks_per_chunk))
+
+
+def _make_stream(data: BZ2_DATA,
+                 header: bytes,
+                 blocks: List[Tuple[int, int, int]]) -> bytes:
+    """Wraps contiguous blocks in a header and end of stream marker"""
+
+    start: int = blocks[0][0]
+    end: int = blocks[-1][1]
+    combined_crc: int = 0
+    for _, _, crc in blocks:
+        combined_crc = (((combined_crc << 1) | (combined_crc >> 31))
+                        & 0xFFFFFFFF) ^ crc
+    value: int = _get_bits(data, start, end)
+    value = (value << _MAGIC_BITS) | EOS_MAGIC
+    value = (value << _CRC_BITS) | combined_crc
+    num_bits: int = end - start + _MAGIC_BITS + _CRC_BITS
+    padding: int = -num_bits % 8
+    value <<= padding
+    return header + value.to_bytes((num_bits + padding) // 8, "big")
+
+
+def decompress_parallel(path: Union[str, Path],
+                        jobs: int) -> Iterator[bytes]:
+    """Yields the decompressed contents of a bz2 file in order
+
+    Blocks are decompressed across jobs processes. Falls back to serial
+    decompression if the file can't be split
+    """
+
+    with open(path, mode="rb") as f:
+        # Empty files can't be memory mapped
+        if not f.seek(0, 2):
+            return
+        with mmap(f.fileno(), 0, access=ACCESS_READ) as data:
+            try:
+                # More chunks than jobs so that the workers stay busy
+                chunks: Iterator[bytes] = _get_chunks(data, jobs * 4)
+            except Exception as e:
+                logging.warning(f"Can't split {path} ({e}), "
+                                "decompressing serially")
+                yield from _decompress_serially(path)
+                return
+            yield from _decompress_chunks(path, chunks, jobs)
+
+
+def _decompress_chunks(path: Union[str, Path],
+                       chunks: Iterator[bytes],
+                       jobs: int) -> Iterator[bytes]:
+    """Yields decompressed chunks in order, with a few per job in flight"""
+
+    # Bytes already yielded, so a bad chunk can fall back to serial
+    # decompression and continue from the same place
+    yielded: int = 0
+    futures: Deque["Future[bytes]"] = deque()
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        try:
+            for chunk in chunks:
+                futures.append(executor.submit(bz2.decompress, chunk))
+                if len(futures) < jobs * CHUNKS_IN_FLIGHT:
+                    continue
+                decompressed: bytes = futures.popleft().result()
+                yield decompressed
+                yielded += len(decompressed)
+            while futures:
+                decompressed = futures.popleft().result()
+                yield decompressed
+                yielded += len(decompressed)
+        except (OSError, ValueError, EOFError) as e:
+            logging.warning(f"Bad bz2 chunk in {path} ({e}), "
+                            "decompressing serially")
+            for future in futures:
+                future.cancel()
+            futures.clear()
+            yield from _decompress_serially(path, skip=yielded)
+        finally:
+            # i.e. if the caller stops early
+            for future in futures:
+                future.cancel()
+
+
+def _decompress_serially(path: Union[str, Path],
+                         skip: int = 0) -> Iterator[bytes]:
+    """Yields the decompressed contents of a bz2 file, from skip bytes in
+
+    Reads a little at a time, as bz2.decompress would read everything
+    """
+
+    decompressor = bz2.BZ2Decompressor()
+    with open(path, mode="rb") as f:
+        for data in iter(partial(f.read, SERIAL_READ_SIZE), b""):
+            while data:
+                if decompressor.eof:
+                    # The next stream of a multi stream file
+                    decompressor = bz2.BZ2Decompressor()
+                decompressed: bytes = decompressor.decompress(data)
+                data = decompressor.unused_data if decompressor.eof else b""
+                if skip:
+                    skipped: int = min(skip, len(decompressed))
+                    decompressed = decompressed[skipped:]
+                    skip -= skipped
+                if decompressed:
+                    yield decompressed
+    if not decompressor.eof:
+        raise EOFError("Compressed file ended before the end-of-stream "
+                       "marker was reached")
+
+
+def iter_lines(chunks: Iterator[bytes]) -> Iterator[bytes]:
+    """Yields lines (without newlines) from decompressed chunks"""
+
+    remainder: bytes = b""
+    for chunk in chunks:
+        lines: List[bytes] = (remainder + chunk).split(b"\n")
+        remainder = lines.pop()
+        yield from lines
+    if remainder:
+        yield remainder
@@ -1,9 +1,10 @@
-from csv import DictWriter
+import asyncio
+from concurrent.futures import Future
 from datetime import datetime, timedelta
 import logging
 from pathlib import Path
 import shutil
-from typing import List, Optional, Tuple, Type
+from typing import Dict, Optional, Type
 
 
 from ..graph import AS, BGPDAG
@@ -11,52 +12,179 @@ from ..graph import AS, BGPDAG
 # Can't import into class due to mypy issue:
 # https://github.com/python/mypy/issues/7045
 # File funcs
+from .file_reading_funcs import read_edges
 from .file_reading_funcs import read_file
 from .file_reading_funcs import _read_from_cache
 from .file_reading_funcs import _read_from_caida
 from .file_reading_funcs import _download_bz2_file
 from .file_reading_funcs import _copy_to_cache
+from .file_reading_funcs import _read_from_edge_cache
+from .file_reading_funcs import _write_edge_cache
+from .file_reading_funcs import _get_snapshot_path
+from .file_reading_funcs import _read_from_snapshot
 
 # HTML funcs
 from .html_funcs import _get_url
+from .html_funcs import _get_latest_dl_time
+from .html_funcs import _get_index
+from .html_funcs import _fetch_index
+from .html_funcs import _read_index_cache
+from .html_funcs import _write_index_cache
 from .html_funcs import _get_hrefs
 
+from .downloader import Downloader
+
+# Parallel funcs
+from .parallel_funcs import run_many
+from .parallel_funcs import _run_many_worker
+from .parallel_funcs import _load_snapshot_or_run
+from .parallel_funcs import _clear_month_cache
+
+# Async funcs
+from .async_funcs import run_async
+from .async_funcs import _download_to_cache
+from .async_funcs import prefetch
+from .async_funcs import wait
+from .async_funcs import _get_background_loop
+
+# Diff funcs
+from .diff_funcs import diff_months
+from .diff_funcs import run_diff
+
+# Stream diff funcs
+from .stream_diff_funcs import stream_diff
+from .stream_diff_funcs import _diff_lines
+from .stream_diff_funcs import _partition_lines
+
+# TSV funcs
+from .tsv_funcs import _write_tsv
+from .tsv_funcs import _write_tsv_rows
+
 # Graph building funcs
+from .data_extraction_funcs import EdgeArrays
+from .data_extraction_funcs import _get_edges
 from .data_extraction_funcs import _get_ases
 from .data_extraction_funcs import _extract_input_clique
 from .data_extraction_funcs import _extract_ixp_ases
 from .data_extraction_funcs import _extract_provider_customers
 from .data_extraction_funcs import _extract_peers
+from .data_extraction_funcs import _get_edge_arrays
+from .data_extraction_funcs import _links_from_edge_arrays
+from .data_extraction_funcs import _edge_arrays_from_links
 
 
 class CaidaCollector:
     """Downloads relationships, determines metadata, and inserts to db"""
 
+    read_edges = read_edges
     read_file = read_file
     _read_from_cache = _read_from_cache
     _read_from_caida = _read_from_caida
     _download_bz2_file = _download_bz2_file
     _copy_to_cache = _copy_to_cache
+    _read_from_edge_cache = _read_from_edge_cache
+    _write_edge_cache = _write_edge_cache
+    _get_snapshot_path = _get_snapshot_path
+    _read_from_snapshot = _read_from_snapshot
 
     # HTML funcs
     _get_url = _get_url
+    _get_latest_dl_time = _get_latest_dl_time
+    _get_index = _get_index
+    _fetch_index = _fetch_index
+    _read_index_cache = _read_index_cache
+    _write_index_cache = _write_index_cache
     _get_hrefs = _get_hrefs
 
+    # Parallel funcs
+    run_many = run_many
+    _run_many_worker = _run_many_worker
+    _load_snapshot_or_run = _load_snapshot_or_run
+    _clear_month_cache = _clear_month_cache
+
+    # Async funcs
+    run_async = run_async
+    _download_to_cache = _download_to_cache
+    prefetch = prefetch
+    wait = wait
+    _get_background_loop = _get_background_loop
+
+    # Diff funcs
+    diff_months = diff_months
+    run_diff = run_diff
+
+    # Stream diff funcs
+    stream_diff = stream_diff
+    _diff_lines = _diff_lines
+    _partition_lines = _partition_lines
+
+    # TSV funcs
+    _write_tsv = _write_tsv
+    _write_tsv_rows = _write_tsv_rows
+
     # Graph building funcs
+    _get_edges = _get_edges
     _get_ases = _get_ases
     _extract_input_clique = _extract_input_clique
     _extract_ixp_ases = _extract_ixp_ases
     _extract_provider_customers = _extract_provider_customers
     _extract_peers = _extract_peers
+    _get_edge_arrays = _get_edge_arrays
+    _links_from_edge_arrays = _links_from_edge_arrays
+    _edge_arrays_from_links = _edge_arrays_from_links
+
+    # Engines that can parse the relationship lines
+    parse_engines = ("python", "numpy")
 
     def __init__(self,
                  BaseASCls: Type[AS] = AS,
-                 GraphCls: Type[BGPDAG] = BGPDAG):
+                 GraphCls: Type[BGPDAG] = BGPDAG,
+                 parse_engine: str = "python",
+                 index_cache_path: Optional[Path] = Path(
+                     "/tmp/caida_collector_cache/serial_2_index.json"),
+                 index_ttl: float = 12 * 60 * 60,
+                 downloader: Optional[Downloader] = None,
+                 decompress_jobs: int = 1,
+                 tsv_jobs: int = 1):
 
         # Base AS Class for the BGPDAG
         self.BaseASCls: Type[AS] = BaseASCls
         # BGPDAG class
         self.GraphCls: Type[BGPDAG] = GraphCls
+        # python parses line by line, numpy parses in bulk
+        if parse_engine not in self.parse_engines:
+            raise Exception(f"parse_engine must be one of "
+                            f"{self.parse_engines}, not {parse_engine}")
+        self.parse_engine: str = parse_engine
+        # Serial-2 index of {"%Y%m01": url}, cached in memory and on disk
+        # for index_ttl seconds. None for index_cache_path only caches it
+        # in memory
+        self.index_cache_path: Optional[Path] = index_cache_path
+        self.index_ttl: float = index_ttl
+        self._index: Optional[Dict[str, str]] = None
+        self._latest_key: Optional[str] = None
+        # When the index in memory was fetched, and when this collector
+        # last downloaded it (None if it never did)
+        self._index_fetched: float = 0
+        self._index_downloaded: Optional[float] = None
+        # Downloads the relationship files
+        self.downloader: Downloader = (downloader if downloader is not None
+                                       else Downloader())
+        # Processes used to decompress the bz2 file. 1 is serial
+        self.decompress_jobs: int = decompress_jobs
+        # Processes used to format the TSV. 1 is serial
+        self.tsv_jobs: int = tsv_jobs
+        # Background event loop and futures of prefetched months
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._prefetches: Dict[datetime, Future[BGPDAG]] = dict()
+
+    def __getstate__(self):
+        """The event loop and futures stay in this process"""
+
+        state = self.__dict__.copy()
+        state["_loop"] = None
+        state["_prefetches"] = dict()
+        return state
 
     def run(self,
             dl_time: Optional[datetime] = None,
@@ -83,6 +211,9 @@ class CaidaCollector:
 
         Can specify a download time if you want to download an older dataset
         if cache is True it uses the downloaded file that was cached
+
+        If a snapshot of the finished BGPDAG is cached, it's reloaded
+        instead of being rebuilt
         """
 
         # Get the download time
@@ -97,19 +228,29 @@ class CaidaCollector:
             # Path to the cache file for that day
             fmt = "%Y.%m.%d"
             cache_path: Optional[Path] = cache_dir / dl_time.strftime(fmt)
+            # Path to the snapshot of the finished graph
+            snapshot_path: Optional[Path] = self._get_snapshot_path(
+                cache_dir, dl_time)
         else:
             cache_path = None
+            snapshot_path = None
+
+        bgp_dag: Optional[BGPDAG] = None
+        if snapshot_path:
+            bgp_dag = self._read_from_snapshot(snapshot_path)
+
+        if bgp_dag is None:
+            # Parsed relationships, from the binary cache if it exists
+            edges: EdgeArrays = self.read_edges(cache_path, dl_time)
+            cp_links, peer_links = self._links_from_edge_arrays(edges)
+            bgp_dag = self.GraphCls(cp_links,
+                                    peer_links,
+                                    ixps=edges.ixps,
+                                    input_clique=edges.input_clique,
+                                    BaseASCls=self.BaseASCls)
+            if snapshot_path:
+                bgp_dag.to_snapshot(snapshot_path)
 
-        file_lines: Tuple[str, ...] = self.read_file(cache_path, dl_time)
-        (cp_links,
-         peer_links,
-         ixps,
-         input_clique) = self._get_ases(file_lines)
-        bgp_dag: BGPDAG = self.GraphCls(cp_links,
-                                        peer_links,
-                                        ixps=ixps,
-                                        input_clique=input_clique,
-                                        BaseASCls=self.BaseASCls)
         if tsv_path:
             self._write_tsv(bgp_dag, tsv_path)
         return bgp_dag
@@ -117,25 +258,15 @@ class CaidaCollector:
     def default_dl_time(self) -> datetime:
         """Returns default DL time.
 
-        For most things, we download from 4 days ago
-        And for collectors, time must be divisible by 4/8
+        This is the newest file published in the serial-2 index. If the
+        index can't be fetched, fall back to 10 days ago
         """
 
-        # 10 days because sometimes caida takes a while to upload
-        # 7 days ago was actually not enough
-        dl_time: datetime = datetime.utcnow() - timedelta(days=10)
-        return dl_time.replace(hour=0, minute=0, second=0, microsecond=0)
-
-    def _write_tsv(self, dag: BGPDAG, tsv_path: Path):
-        """Writes BGP DAG info to a TSV"""
-
-        logging.info("Made graph. Now writing to TSV")
-        with tsv_path.open(mode="w") as f:
-            # Get columns
-            cols: List[str] = list(next(iter(dag.as_dict.values())
-                                        ).db_row.keys())
-            writer = DictWriter(f, fieldnames=cols, delimiter="\t")
-            writer.writeheader()
-            for x in dag.as_dict.values():
-                writer.writerow(x.db_row)
-        logging.debug("Wrote TSV")
+        try:
+            return self._get_latest_dl_time()
+        except Exception as e:
+            logging.warning(f"Couldn't get the latest Caida file: {e}")
+            # 10 days because sometimes caida takes a while to upload
+            # 7 days ago was actually not enough
+            dl_time: datetime = datetime.utcnow() - timedelta(days=10)
+            return dl_time.replace(hour=0, minute=0, second=0, microsecond=0)
@@ -1,16 +1,54 @@
-from typing import Set, Tuple
+from typing import Iterable, Iterator, NamedTuple, Set, Tuple
+import warnings
+
+import numpy as np
 
 from ..links import CustomerProviderLink as CPLink
+from ..links import LinkSet
 from ..links import PeerLink
 
 
-def _get_ases(self, lines: Tuple[str, ...]) -> Tuple[Set[CPLink],
-                                                     Set[PeerLink],
-                                                     Set[int],
-                                                     Set[int]]:
+class EdgeArrays(NamedTuple):
+    """Relationships of a Caida file as integer arrays
+
+    providers[i] is the provider of customers[i]
+    peers is an (n, 2) array of peer pairs
+    """
+
+    providers: np.ndarray
+    customers: np.ndarray
+    peers: np.ndarray
+    ixps: Set[int]
+    input_clique: Set[int]
+
+
+def _get_edges(self, lines: Iterable[str]) -> EdgeArrays:
+    """Parses the lines into EdgeArrays with the selected parse engine"""
+
+    edges: EdgeArrays
+    if self.parse_engine == "numpy":
+        edges = self._get_edge_arrays(lines)
+    else:
+        (cp_links,
+         peer_links,
+         ixps,
+         input_clique) = self._get_ases(lines)
+        edges = self._edge_arrays_from_links(cp_links,
+                                             peer_links,
+                                             ixps,
+                                             input_clique)
+    return edges
+
+
+def _get_ases(self, lines: Iterable[str]) -> Tuple[Set[CPLink],
+                                                   Set[PeerLink],
+                                                   Set[int],
+                                                   Set[int]]:
     """Fills the initial AS dict and adds the following info:
 
     Creates AS dict with peers, providers, customers, input clique, ixps
+
+    Lines are consumed one at a time, so this works on a stream
     """
 
     input_clique: Set[int] = set()
@@ -67,3 +105,71 @@ def _extract_peers(self, line: str, peer_links: Set[PeerLink]):
 
     peer1_asn, peer2_asn, _, source = line.split("|")
     peer_links.add(PeerLink(int(peer1_asn), int(peer2_asn)))
+
+
+def _get_edge_arrays(self, lines: Iterable[str]) -> EdgeArrays:
+    """Parses all relationships into integer arrays in bulk
+
+    Instead of splitting every line in python, the comment lines are
+    skipped by numpy's loadtxt and the first three columns are converted
+    to ints in one go. The IXP and input clique comment lines are still
+    extracted as they stream by
+    """
+
+    input_clique: Set[int] = set()
+    ixps: Set[int] = set()
+
+    def _extract_comments(lines: Iterable[str]) -> Iterator[str]:
+        for line in lines:
+            if line.startswith("# input clique"):
+                self._extract_input_clique(line, input_clique)
+            elif line.startswith("# IXP ASes"):
+                self._extract_ixp_ases(line, ixps)
+            yield line
+
+    with warnings.catch_warnings():
+        # Empty files are fine, they just have no relationships
+        warnings.filterwarnings("ignore", message=".*no data.*")
+        # <asn1>|<asn2>|<relationship>|<source>
+        rows: np.ndarray = np.loadtxt(_extract_comments(lines),
+                                      dtype=np.int64,
+                                      comments="#",
+                                      delimiter="|",
+                                      usecols=(0, 1, 2),
+                                      ndmin=2)
+
+    # -1 is provider customer, 0 is peer
+    cp_mask: np.ndarray = rows[:, 2] == -1
+    return EdgeArrays(providers=rows[cp_mask, 0],
+                      customers=rows[cp_mask, 1],
+                      peers=rows[~cp_mask, :2],
+                      ixps=ixps,
+                      input_clique=input_clique)
+
+
+def _links_from_edge_arrays(self, edges: EdgeArrays) -> Tuple[LinkSet,
+                                                              LinkSet]:
+    """Converts the edge arrays into the LinkSets the BGPDAG takes"""
+
+    cp_links = LinkSet.from_arrays(CPLink, edges.providers, edges.customers)
+    peer_links = LinkSet.from_arrays(PeerLink,
+                                     edges.peers[:, 0],
+                                     edges.peers[:, 1])
+    return cp_links, peer_links
+
+
+def _edge_arrays_from_links(self,
+                            cp_links: Iterable[CPLink],
+                            peer_links: Iterable[PeerLink],
+                            ixps: Set[int],
+                            input_clique: Set[int]) -> EdgeArrays:
+    """Converts link objects into EdgeArrays"""
+
+    cp_link_set = LinkSet.from_links(cp_links, CPLink)
+    peer_link_set = LinkSet.from_links(peer_links, PeerLink)
+    return EdgeArrays(providers=cp_link_set.asns1,
+                      customers=cp_link_set.asns2,
+                      peers=np.stack([peer_link_set.asns1,
+                                      peer_link_set.asns2], axis=1),
+                      ixps=ixps,
+                      input_clique=input_clique)
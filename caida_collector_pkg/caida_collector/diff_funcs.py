@@ -0,0 +1,74 @@
+"""Functions to update a BGPDAG from one month to the next
+
+Rather than building the next month's graph, the links that changed
+between the months' caches are applied to the graph in place (see
+BGPDAG.apply_diff)
+"""
+
+from datetime import datetime
+from pathlib import Path
+from typing import NamedTuple, Optional, Set
+
+from .data_extraction_funcs import EdgeArrays
+from ..graph import BGPDAG
+from ..links import LinkSet
+
+
+class MonthDiff(NamedTuple):
+    """Links that changed between two months
+
+    ixps and input_clique are the new month's
+    """
+
+    added_cp: LinkSet
+    removed_cp: LinkSet
+    added_peers: LinkSet
+    removed_peers: LinkSet
+    ixps: Set[int]
+    input_clique: Set[int]
+
+
+def diff_months(self,
+                old_dl_time: datetime,
+                new_dl_time: datetime,
+                cache_dir: Path = Path("/tmp/caida_collector_cache")
+                ) -> MonthDiff:
+    """Returns the links that changed from old_dl_time to new_dl_time
+
+    Months are read from the cache, and downloaded if they aren't cached
+    """
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    old_edges: EdgeArrays = self.read_edges(
+        cache_dir / old_dl_time.strftime("%Y.%m.%d"), old_dl_time)
+    new_edges: EdgeArrays = self.read_edges(
+        cache_dir / new_dl_time.strftime("%Y.%m.%d"), new_dl_time)
+    old_cp, old_peers = self._links_from_edge_arrays(old_edges)
+    new_cp, new_peers = self._links_from_edge_arrays(new_edges)
+    return MonthDiff(added_cp=new_cp - old_cp,
+                     removed_cp=old_cp - new_cp,
+                     added_peers=new_peers - old_peers,
+                     removed_peers=old_peers - new_peers,
+                     ixps=new_edges.ixps,
+                     input_clique=new_edges.input_clique)
+
+
+def run_diff(self,
+             bgp_dag: BGPDAG,
+             old_dl_time: datetime,
+             new_dl_time: datetime,
+             cache_dir: Path = Path("/tmp/caida_collector_cache"),
+             tsv_path: Optional[Path] = None) -> BGPDAG:
+    """Updates the BGPDAG of old_dl_time in place to new_dl_time"""
+
+    diff: MonthDiff = self.diff_months(old_dl_time, new_dl_time, cache_dir)
+    bgp_dag.apply_diff(diff.added_cp,
+                       diff.removed_cp,
+                       diff.added_peers,
+                       diff.removed_peers,
+                       ixps=diff.ixps,
+                       input_clique=diff.input_clique,
+                       BaseASCls=self.BaseASCls)
+    if tsv_path:
+        self._write_tsv(bgp_dag, tsv_path)
+    return bgp_dag
@@ -0,0 +1,235 @@
+"""Downloader for Caida files
+
+Uses a pooled requests.Session so connections are reused, retries with
+exponential backoff, resumes dropped downloads with HTTP Range requests,
+optionally downloads large files as parallel ranged chunks, and verifies
+the size (and checksum, if given) of the result
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import logging
+import os
+from pathlib import Path
+import time
+from typing import List, Optional, Tuple, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import HTTPError as Urllib3HTTPError
+
+
+class Downloader:
+    """Downloads files over HTTP with retries, resume and verification"""
+
+    def __init__(self,
+                 retries: int = 5,
+                 backoff: float = 1,
+                 timeout: float = 30,
+                 chunks: int = 1,
+                 min_chunk_size: int = 8 * 1024 * 1024,
+                 block_size: int = 1024 * 1024):
+        """Stores the download settings
+
+        retries: attempts per file (or per chunk) after the first
+        backoff: seconds to wait before the first retry, doubled each time
+        chunks: number of parallel ranged requests for large files
+        min_chunk_size: files are only split if each chunk is this big
+        """
+
+        self.retries: int = retries
+        self.backoff: float = backoff
+        self.timeout: float = timeout
+        self.chunks: int = chunks
+        self.min_chunk_size: int = min_chunk_size
+        self.block_size: int = block_size
+        self._session: Optional[requests.Session] = None
+
+    @property
+    def session(self) -> requests.Session:
+        """Session shared by every request so connections are pooled"""
+
+        if self._session is None:
+            self._session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=max(self.chunks, 1),
+                                  pool_maxsize=max(self.chunks, 1))
+            self._session.mount("http://", adapter)
+            self._session.mount("https://", adapter)
+        return self._session
+
+    def __getstate__(self):
+        """Sessions aren't sent to other processes, they make their own"""
+
+        state = self.__dict__.copy()
+        state["_session"] = None
+        return state
+
+    def download(self,
+                 url: str,
+                 path: Union[str, Path],
+                 size: Optional[int] = None,
+                 checksum: Optional[Tuple[str, str]] = None):
+        """Downloads url to path
+
+        size: expected size in bytes. Defaults to the server's length
+        checksum: (hashlib algorithm, hex digest), i.e. ("md5", "ab12...")
+        """
+
+        path = Path(path)
+        total, accepts_ranges = self._get_size(url)
+        if size is None:
+            size = total
+        elif total is not None and total != size:
+            raise Exception(f"{url} is {total} bytes, expected {size}")
+
+        num_chunks: int = 1
+        if size is not None and accepts_ranges:
+            num_chunks = max(1, min(self.chunks,
+                                    size // max(self.min_chunk_size, 1)))
+
+        if num_chunks > 1:
+            self._download_chunks(url, path, size, num_chunks)  # type: ignore
+        else:
+            self._download_range(url, path, 0, size, truncate=True)
+
+        self._verify(path, size, checksum)
+
+    def _get_size(self, url: str) -> Tuple[Optional[int], bool]:
+        """Returns the size of the file and if the server accepts ranges"""
+
+        def head() -> requests.Response:
+            r = self.session.head(url,
+                                  timeout=self.timeout,
+                                  allow_redirects=True)
+            r.raise_for_status()
+            return r
+
+        try:
+            r = self._with_retries(head)
+        except requests.RequestException as e:
+            # Some servers don't support HEAD. The GET will tell us
+            logging.debug(f"HEAD failed for {url}: {e}")
+            return None, False
+        length = r.headers.get("Content-Length")
+        accepts_ranges = r.headers.get("Accept-Ranges", "") == "bytes"
+        return (int(length) if length is not None else None), accepts_ranges
+
+    def _download_chunks(self,
+                         url: str,
+                         path: Path,
+                         size: int,
+                         num_chunks: int):
+        """Downloads ranges of the file in parallel into one file"""
+
+        # Preallocate so that every chunk can write at its own offset
+        with path.open(mode="wb") as f:
+            f.truncate(size)
+        bounds: List[int] = [size * i // num_chunks
+                             for i in range(num_chunks + 1)]
+        with ThreadPoolExecutor(max_workers=num_chunks) as executor:
+            futures = [executor.submit(self._download_range,
+                                       url,
+                                       path,
+                                       start,
+                                       end,
+                                       False)
+                       for start, end in zip(bounds[:-1], bounds[1:])]
+            for future in futures:
+                future.result()
+
+    def _download_range(self,
+                        url: str,
+                        path: Path,
+                        start: int,
+                        end: Optional[int],
+                        truncate: bool):
+        """Downloads bytes [start, end) of url to the same offset of path
+
+        A dropped connection is resumed from the last byte written.
+        If end is None, downloads until the server stops sending
+        """
+
+        if truncate:
+            path.open(mode="wb").close()
+        # Bytes of this range already written
+        written: List[int] = [0]
+
+        def attempt():
+            offset: int = start + written[0]
+            headers = dict()
+            if offset > 0 or end is not None:
+                last = "" if end is None else str(end - 1)
+                headers["Range"] = f"bytes={offset}-{last}"
+            with self.session.get(url,
+                                  headers=headers,
+                                  stream=True,
+                                  timeout=self.timeout) as r:
+                r.raise_for_status()
+                if offset > 0 and r.status_code != 206:
+                    # Server ignored the range, start over
+                    if start != 0:
+                        raise Exception(f"{url} doesn't support ranges")
+                    written[0] = 0
+                    offset = 0
+                with path.open(mode="r+b") as f:
+                    f.seek(offset)
+                    if truncate:
+                        f.truncate()
+                    # Raw bytes, so that they match the Content-Length
+                    for block in r.raw.stream(self.block_size,
+                                              decode_content=False):
+                        f.write(block)
+                        written[0] += len(block)
+            if end is not None and start + written[0] < end:
+                raise requests.ConnectionError(
+                    f"Connection dropped at byte {start + written[0]}")
+
+        self._with_retries(attempt)
+
+    def _with_retries(self, func):
+        """Calls func, retrying with exponential backoff on errors
+
+        Client errors other than 429 (too many requests), such as a 404,
+        won't change by retrying, so they're raised right away
+        """
+
+        for attempt in range(self.retries + 1):
+            try:
+                return func()
+            except (requests.RequestException,
+                    Urllib3HTTPError,
+                    OSError) as e:
+                if attempt == self.retries or not self._is_retryable(e):
+                    raise
+                wait: float = self.backoff * 2 ** attempt
+                logging.warning(f"{e}. Retrying in {wait}s")
+                time.sleep(wait)
+
+    @staticmethod
+    def _is_retryable(e: Exception) -> bool:
+        """Returns False for HTTP 4xx errors other than 429"""
+
+        if isinstance(e, requests.HTTPError) and e.response is not None:
+            status: int = e.response.status_code
+            return not (400 <= status < 500) or status == 429
+        return True
+
+    def _verify(self,
+                path: Path,
+                size: Optional[int],
+                checksum: Optional[Tuple[str, str]]):
+        """Raises if the file doesn't have the expected size/checksum"""
+
+        actual_size: int = os.path.getsize(path)
+        if size is not None and actual_size != size:
+            raise Exception(f"{path} is {actual_size} bytes, "
+                            f"expected {size}")
+        if checksum is not None:
+            algorithm, expected = checksum
+            hasher = hashlib.new(algorithm)
+            with path.open(mode="rb") as f:
+                for block in iter(lambda: f.read(self.block_size), b""):
+                    hasher.update(block)
+            if hasher.hexdigest().lower() != expected.lower():
+                raise Exception(f"{path} {algorithm} is {hasher.hexdigest()}"
+                                f", expected {expected}")
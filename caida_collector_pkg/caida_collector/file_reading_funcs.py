@@ -2,34 +2,101 @@ from datetime import datetime
 import logging
 import os
 from pathlib import Path
-import shutil
-from tempfile import TemporaryDirectory
-from typing import Optional, Tuple
+from tempfile import NamedTemporaryFile, TemporaryDirectory
+from typing import Iterable, Iterator, Optional
 
 import bz2
-import requests
+import numpy as np
+
+from .bz2_funcs import decompress_parallel, iter_lines
+from .data_extraction_funcs import EdgeArrays
+from .. import __version__
+from ..graph import BGPDAG
 
 
 # Type for lines that are read from caida/cached files
-LINES_TYPE = Tuple[str, ...]
+# Lines are streamed so that the whole file is never held in memory
+LINES_TYPE = Iterator[str]
+
+# The binary edge cache is a single flat int64 .npy file:
+# [magic, version, #cp links, #peer links, #ixps, #input clique,
+#  providers, customers, peers (flattened pairs), ixps, input clique]
+# Bump the version whenever this layout changes so old caches rebuild
+EDGE_CACHE_MAGIC = 0x43414944
+EDGE_CACHE_VERSION = 1
+EDGE_CACHE_HEADER_LEN = 6
+EDGE_CACHE_SUFFIX = ".edges.npy"
+
+
+def _get_snapshot_path(self, cache_dir: Path, dl_time: datetime) -> Path:
+    """Returns the path of the BGPDAG snapshot for this collector
+
+    Snapshots are keyed by date, package version, and the AS/graph classes
+    """
+
+    return cache_dir / (f"{dl_time.strftime('%Y.%m.%d')}.{__version__}."
+                        f"{self.BaseASCls.__name__}.{self.GraphCls.__name__}"
+                        ".dag.npz")
+
+
+def _read_from_snapshot(self, snapshot_path: Path) -> Optional[BGPDAG]:
+    """Reloads the finished BGPDAG from a snapshot if one exists"""
+
+    if snapshot_path.exists():
+        bgp_dag: Optional[BGPDAG] = self.GraphCls.from_snapshot(
+            snapshot_path, BaseASCls=self.BaseASCls)
+        if bgp_dag is None:
+            logging.info("BGPDAG snapshot is outdated. Rebuilding")
+        return bgp_dag
+    else:
+        return None
+
+
+def read_edges(self,
+               cache_path: Optional[Path],
+               dl_time: datetime) -> EdgeArrays:
+    """Returns the parsed relationships, from the binary cache if possible
+
+    The binary cache is loaded with a single mmap, so warm starts skip
+    text parsing entirely. If it doesn't exist, or was written by a
+    different version, the lines are parsed and the cache is rebuilt
+    """
+
+    edge_cache_path: Optional[Path] = None
+    if cache_path:
+        edge_cache_path = cache_path.with_name(cache_path.name
+                                               + EDGE_CACHE_SUFFIX)
+        if edge_cache_path.exists():
+            edges: Optional[EdgeArrays] = self._read_from_edge_cache(
+                edge_cache_path)
+            if edges is not None:
+                return edges
+            logging.info("Edge cache is outdated or corrupt. Rebuilding")
+
+    parsed_edges: EdgeArrays = self._get_edges(self.read_file(cache_path,
+                                                              dl_time))
+    self._write_edge_cache(edge_cache_path, parsed_edges)
+    return parsed_edges
 
 
 def read_file(self,
               cache_path: Optional[Path],
               dl_time: datetime) -> LINES_TYPE:
-    """Reads the file from the URL and unzips it and returns the lines
+    """Reads the file from the URL and unzips it and yields the lines
 
-    Also caches the file for later calls
+    Also caches the file for later calls. The cache is written as the
+    lines are consumed, so the returned iterator must be exhausted
+    for the cache to be written
     """
 
     # If cache exists
     if cache_path and cache_path.exists():
         lines: LINES_TYPE = self._read_from_cache(cache_path)
     else:
-        # Write the raw file
-        lines: LINES_TYPE = self._read_from_caida(dl_time)  # type: ignore
+        # Stream the raw file
+        lines = self._read_from_caida(dl_time)
         # Copies to cache if cache_path is set
-        self._copy_to_cache(cache_path, lines)
+        lines = self._copy_to_cache(cache_path, lines)
 
     return lines
 
@@ -40,7 +107,8 @@ def _read_from_cache(self, cache_path: Path) -> LINES_TYPE:
     # Open cache
     with cache_path.open(mode="r") as f:
         # Read cached file
-        return tuple([x.strip() for x in f])
+        for line in f:
+            yield line.strip()
 
 
 def _read_from_caida(self, dl_time: datetime) -> LINES_TYPE:
@@ -49,6 +117,7 @@ def _read_from_caida(self, dl_time: datetime) -> LINES_TYPE:
     logging.info("No file cached from Caida. Downloading Caida file now")
 
     # Create a temporary dir to write to
+    # The dir lives until the generator is exhausted or closed
     with TemporaryDirectory() as tmp_dir:
         # Path to bz2 download
         bz2_path: str = os.path.join(tmp_dir, "download.bz2")
@@ -56,26 +125,125 @@ def _read_from_caida(self, dl_time: datetime) -> LINES_TYPE:
         self._download_bz2_file(self._get_url(dl_time), bz2_path)
 
         # Unzip and read
-        with bz2.open(bz2_path, mode="rb") as f:
-            # Must decode the bytes into strings and strip
-            return tuple([x.decode().strip() for x in f])
+        if self.decompress_jobs > 1:
+            # Blocks are decompressed in parallel, output is the same
+            chunks = decompress_parallel(bz2_path, self.decompress_jobs)
+            for line in iter_lines(chunks):
+                yield line.decode().strip()
+        else:
+            with bz2.open(bz2_path, mode="rb") as f:
+                # Must decode the bytes into strings and strip
+                for line in f:
+                    yield line.decode().strip()
 
 
 def _download_bz2_file(self, url: str, bz2_path: str):
-    """Downloads Caida BZ2 file"""
+    """Downloads Caida BZ2 file
+
+    Retries, resumes, and verifies the size (see Downloader)
+    """
+
+    self.downloader.download(url, bz2_path)
 
-    # https://stackoverflow.com/a/39217788/8903959
-    # Download the file
-    with requests.get(url, stream=True, timeout=5) as r:
-        r.raise_for_status()
-        with open(bz2_path, mode="wb") as f:
-            shutil.copyfileobj(r.raw, f)
 
+def _copy_to_cache(self,
+                   cache_path: Optional[Path],
+                   lines: Iterable[str]) -> LINES_TYPE:
+    """Tees the lines into the cache while yielding them
 
-def _copy_to_cache(self, cache_path: Optional[Path], lines: LINES_TYPE):
-    """Copies file to the cache"""
+    Lines are written to a temporary file which is only moved into
+    place once every line was consumed, so that a partially read
+    stream never leaves a truncated cache behind
+    """
 
     if cache_path:
-        # Copy raw file to cache
-        with cache_path.open(mode="w") as f:
-            f.write("\n".join(lines))
+        # Unique per writer, since jobs may stream the same month at once
+        f = NamedTemporaryFile(mode="w",
+                               dir=str(cache_path.parent),
+                               prefix=cache_path.name + ".",
+                               suffix=".tmp",
+                               delete=False)
+        tmp_path: Path = Path(f.name)
+        try:
+            with f:
+                for line in lines:
+                    f.write(line + "\n")
+                    yield line
+            os.replace(str(tmp_path), str(cache_path))
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+    else:
+        yield from lines
+
+
+def _read_from_edge_cache(self, edge_cache_path: Path) -> Optional[EdgeArrays]:
+    """Memory maps the binary edge cache
+
+    Returns None if the cache has the wrong magic number or version,
+    or can't be loaded (such as a truncated file)
+    """
+
+    header_len: int = EDGE_CACHE_HEADER_LEN
+    try:
+        arr: np.ndarray = np.load(str(edge_cache_path), mmap_mode="r")
+        if (arr.ndim != 1
+                or arr.dtype != np.int64
+                or len(arr) < header_len
+                or int(arr[0]) != EDGE_CACHE_MAGIC
+                or int(arr[1]) != EDGE_CACHE_VERSION):
+            return None
+        n_cp, n_peer, n_ixp, n_clique = [int(x) for x in arr[2:header_len]]
+    except (ValueError, OSError, EOFError):
+        return None
+    if len(arr) != header_len + 2 * n_cp + 2 * n_peer + n_ixp + n_clique:
+        return None
+
+    # Slices are views into the single mmap
+    bounds = np.cumsum([header_len, n_cp, n_cp, 2 * n_peer, n_ixp, n_clique])
+    (providers,
+     customers,
+     peers,
+     ixps,
+     input_clique) = [arr[start:end] for start, end in zip(bounds[:-1],
+                                                           bounds[1:])]
+    return EdgeArrays(providers=providers,
+                      customers=customers,
+                      peers=peers.reshape(-1, 2),
+                      ixps=set(ixps.tolist()),
+                      input_clique=set(input_clique.tolist()))
+
+
+def _write_edge_cache(self,
+                      edge_cache_path: Optional[Path],
+                      edges: EdgeArrays):
+    """Writes the binary edge cache (see EDGE_CACHE_MAGIC for the layout)"""
+
+    if edge_cache_path:
+        header = [EDGE_CACHE_MAGIC,
+                  EDGE_CACHE_VERSION,
+                  len(edges.providers),
+                  len(edges.peers),
+                  len(edges.ixps),
+                  len(edges.input_clique)]
+        arr: np.ndarray = np.concatenate([
+            np.array(header, dtype=np.int64),
+            np.asarray(edges.providers, dtype=np.int64),
+            np.asarray(edges.customers, dtype=np.int64),
+            np.asarray(edges.peers, dtype=np.int64).ravel(),
+            np.array(sorted(edges.ixps), dtype=np.int64),
+            np.array(sorted(edges.input_clique), dtype=np.int64)])
+        # Write then move so that a failed write never leaves a bad cache.
+        # The tmp file is unique per writer, since jobs may write at once
+        with NamedTemporaryFile(dir=str(edge_cache_path.parent),
+                                prefix=edge_cache_path.name + ".",
+                                suffix=".tmp",
+                                delete=False) as f:
+            tmp_path: Path = Path(f.name)
+            try:
+                np.save(f, arr)
+            except BaseException:
+                f.close()
+                tmp_path.unlink()
+                raise
+        os.replace(str(tmp_path), str(edge_cache_path))
@@ -1,24 +1,146 @@
 from datetime import datetime
-from typing import List
+from html.parser import HTMLParser
+import json
+import logging
+import os
+from pathlib import Path
+import re
+from tempfile import NamedTemporaryFile
+import time
+from typing import Dict, List, Optional, Pattern, Tuple
 
-from bs4 import BeautifulSoup as Soup
 import requests
 
 
+# Api url
+SERIAL_2_URL: str = ("http://data.caida.org/datasets/as-relationships/"
+                     "serial-2/")
+# Relationship files in the serial-2 index, i.e. 20210901.as-rel2.txt.bz2
+_REL_FILE_RE: Pattern[str] = re.compile(r"^(\d{8})\.as-rel2\.txt\.bz2$")
+
+
+class _HrefParser(HTMLParser):
+    """Collects the hrefs of a tags. Lighter than a full soup"""
+
+    def __init__(self):
+        super().__init__()
+        self.hrefs: List[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "a":
+            for name, value in attrs:
+                if name == "href" and value is not None:
+                    self.hrefs.append(value)
+
+
 def _get_url(self, dl_time: datetime) -> str:
-    """Gets urls to download relationship files"""
-
-    # Api url
-    prepend: str = 'http://data.caida.org/datasets/as-relationships/serial-2/'
-    # Gets all URLs. Keeps only the link for the proper download time
-    urls = [prepend + x for x in self._get_hrefs(prepend)
-            if dl_time.strftime("%Y%m01") in x]
-    if len(urls) > 0:
-        return urls[0]  # type: ignore
+    """Gets urls to download relationship files
+
+    Looked up in the serial-2 index, which is cached (see _get_index)
+    """
+
+    key: str = dl_time.strftime("%Y%m01")
+    index: Dict[str, str] = self._get_index()
+    # A cached index may predate the file being published. It's fetched
+    # again, but at most once per index_ttl so that misses don't hammer
+    # the listing
+    if key not in index and (
+            self._index_downloaded is None
+            or time.time() - self._index_downloaded > self.index_ttl):
+        index = self._get_index(refresh=True)
+    if key in index:
+        return index[key]
     else:  # pragma: no cover
         raise Exception("No Urls")
 
 
+def _get_latest_dl_time(self) -> datetime:
+    """Returns the month of the newest published relationship file"""
+
+    self._get_index()
+    if self._latest_key is None:  # pragma: no cover
+        raise Exception("No Urls")
+    return datetime.strptime(self._latest_key, "%Y%m%d")
+
+
+def _get_index(self, refresh: bool = False) -> Dict[str, str]:
+    """Returns {"%Y%m01": url} for every month in the serial-2 index
+
+    The index is kept in memory, and on disk at index_cache_path, for
+    index_ttl seconds, so that the listing is fetched rarely
+    """
+
+    if (self._index is not None
+            and not refresh
+            and time.time() - self._index_fetched <= self.index_ttl):
+        return self._index  # type: ignore
+
+    cached: Optional[Tuple[Dict[str, str], float]] = None
+    if not refresh:
+        cached = self._read_index_cache()
+    if cached is None:
+        index: Dict[str, str] = self._fetch_index()
+        self._index_fetched = self._index_downloaded = time.time()
+        self._write_index_cache(index, self._index_fetched)
+    else:
+        index, self._index_fetched = cached
+    self._index = index
+    # Stored so that latest month lookups don't scan the index
+    self._latest_key = max(index) if index else None
+    return index
+
+
+def _fetch_index(self) -> Dict[str, str]:
+    """Downloads the serial-2 listing and maps each month to its url"""
+
+    index: Dict[str, str] = dict()
+    for href in self._get_hrefs(SERIAL_2_URL):
+        match = _REL_FILE_RE.match(href)
+        if match:
+            index[match.group(1)] = SERIAL_2_URL + href
+    return index
+
+
+def _read_index_cache(self) -> Optional[Tuple[Dict[str, str], float]]:
+    """Reads the on disk index and when it was fetched
+
+    Returns None if it doesn't exist or has expired
+    """
+
+    path: Optional[Path] = self.index_cache_path
+    if path is None or not path.exists():
+        return None
+    try:
+        with path.open(mode="r") as f:
+            cached = json.load(f)
+        fetched: float = float(cached["fetched"])
+        if time.time() - fetched > self.index_ttl:
+            return None
+        return ({str(k): str(v) for k, v in cached["urls"].items()},
+                fetched)
+    except (ValueError, KeyError, TypeError, AttributeError):
+        logging.warning(f"Ignoring corrupt serial-2 index cache {path}")
+        return None
+
+
+def _write_index_cache(self, index: Dict[str, str], fetched: float):
+    """Writes the index to disk along with the time it was fetched"""
+
+    path: Optional[Path] = self.index_cache_path
+    if path is not None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write then move so that readers never see a partial file. The
+        # tmp file is unique per writer since prefetching threads write
+        # at once
+        with NamedTemporaryFile(mode="w",
+                                dir=str(path.parent),
+                                prefix=path.name + ".",
+                                suffix=".tmp",
+                                delete=False) as f:
+            json.dump({"fetched": fetched, "urls": index}, f)
+        os.replace(f.name, str(path))
+
+
 def _get_hrefs(self, url: str) -> List[str]:
     """Returns hrefs from a tags at a given url"""
 
@@ -26,8 +148,7 @@ def _get_hrefs(self, url: str) -> List[str]:
     with requests.get(url, stream=True, timeout=30) as r:
         # Check for errors
         r.raise_for_status()
-        # Get soup
-        soup = Soup(r.text, "html.parser")
+        parser = _HrefParser()
+        parser.feed(r.text)
         # Extract hrefs from a tags
-        return [x.get("href") for x in soup.select("a")
-                if x.get("href") is not None]
+        return parser.hrefs
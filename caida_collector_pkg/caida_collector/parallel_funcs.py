@@ -0,0 +1,95 @@
+"""Functions to collect many months of Caida data in parallel"""
+
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import datetime
+import logging
+from pathlib import Path
+from typing import List, Optional, Sequence, Union
+
+from ..graph import BGPDAG
+
+# Result of a single month. Failed months hold their exception
+RUN_MANY_RESULT = Union[BGPDAG, Path, Exception]
+
+
+def run_many(self,
+             dates: Sequence[datetime],
+             jobs: Optional[int] = None,
+             cache_dir: Path = Path("/tmp/caida_collector_cache"),
+             return_paths: bool = False) -> List[RUN_MANY_RESULT]:
+    """Builds the BGPDAG of every date across a process pool
+
+    The serial-2 index is fetched once up front. Each worker downloads,
+    decompresses, parses and builds a single month and writes its
+    snapshot to the cache dir, which the parent then reloads (a snapshot
+    is far cheaper to pass between processes than a pickled graph).
+
+    Results are returned in the order of dates: BGPDAGs, or snapshot
+    paths if return_paths. A month that fails is logged and its result
+    is the exception, whether it failed in a worker or while reloading.
+    Only that month's cache files are removed
+    """
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    # Fetch the index once so that workers don't each request it
+    self._get_index()
+
+    results: List[RUN_MANY_RESULT] = []
+    if jobs == 1:
+        for dl_time in dates:
+            try:
+                results.append(_run_many_worker(self, dl_time, cache_dir))
+            except Exception as e:
+                results.append(e)
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            futures: List[Future[Path]] = [
+                executor.submit(_run_many_worker, self, dl_time, cache_dir)
+                for dl_time in dates]
+            for future in futures:
+                exception = future.exception()
+                results.append(future.result() if exception is None
+                               else exception)  # type: ignore
+
+    for i, dl_time in enumerate(dates):
+        if not isinstance(results[i], Exception) and not return_paths:
+            try:
+                results[i] = self._load_snapshot_or_run(dl_time, cache_dir)
+            except Exception as e:
+                # Don't throw away the other months, only this one
+                self._clear_month_cache(dl_time, cache_dir)
+                results[i] = e
+        if isinstance(results[i], Exception):
+            logging.error(f"Failed to collect {dl_time}: {results[i]}")
+    return results
+
+
+def _run_many_worker(self, dl_time: datetime, cache_dir: Path) -> Path:
+    """Builds and snapshots a single month. Runs in a worker process"""
+
+    snapshot_path: Path = self._get_snapshot_path(cache_dir, dl_time)
+    if not snapshot_path.exists():
+        try:
+            self._run(dl_time, cache_dir, None)
+        except Exception:
+            # Don't wipe out the other months, only this one
+            self._clear_month_cache(dl_time, cache_dir)
+            raise
+    return snapshot_path
+
+
+def _load_snapshot_or_run(self, dl_time: datetime, cache_dir: Path) -> BGPDAG:
+    """Reloads a month's snapshot, rebuilding it if it can't be reloaded"""
+
+    bgp_dag: Optional[BGPDAG] = self._read_from_snapshot(
+        self._get_snapshot_path(cache_dir, dl_time))
+    if bgp_dag is None:
+        bgp_dag = self._run(dl_time, cache_dir, None)
+    return bgp_dag
+
+
+def _clear_month_cache(self, dl_time: datetime, cache_dir: Path):
+    """Removes every cache file of a single month"""
+
+    for path in cache_dir.glob(dl_time.strftime("%Y.%m.%d") + "*"):
+        path.unlink()
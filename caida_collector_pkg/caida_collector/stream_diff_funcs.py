@@ -0,0 +1,134 @@
+"""Functions to stream the relationship changes between two months
+
+No graph is built. Each month's as-rel2 file is streamed once, and its
+links are hash partitioned by ASN pair into temporary files. Partitions
+are then compared one at a time, so only one partition of each month is
+ever in memory
+"""
+
+from datetime import datetime
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional
+from typing import Set, TextIO, Tuple
+
+
+# Multiplier to spread ASN pairs over the partitions
+_PARTITION_HASH = 2654435761
+
+
+class RelChange(NamedTuple):
+    """A change between two months
+
+    Links are added, removed or flipped. asn1 < asn2, and relationships
+    are from asn1's side: -1 if it's the provider, 1 if it's the
+    customer, 0 for peers, and None if there is no link
+
+    ixp_added, ixp_removed, input_clique_added and input_clique_removed
+    only have asn1
+    """
+
+    change: str
+    asn1: int
+    asn2: Optional[int] = None
+    old_rel: Optional[int] = None
+    new_rel: Optional[int] = None
+
+
+def stream_diff(self,
+                old_dl_time: datetime,
+                new_dl_time: datetime,
+                cache_dir: Path = Path("/tmp/caida_collector_cache"),
+                partitions: int = 64) -> Iterator[RelChange]:
+    """Yields every change from old_dl_time to new_dl_time
+
+    Reads the months' files from the cache (downloading them if they
+    aren't cached). IXP and input clique changes come first, then link
+    changes, sorted within each partition
+    """
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    fmt = "%Y.%m.%d"
+    yield from self._diff_lines(
+        self.read_file(cache_dir / old_dl_time.strftime(fmt), old_dl_time),
+        self.read_file(cache_dir / new_dl_time.strftime(fmt), new_dl_time),
+        partitions,
+        cache_dir)
+
+
+def _diff_lines(self,
+                old_lines: Iterable[str],
+                new_lines: Iterable[str],
+                partitions: int,
+                tmp_dir: Optional[Path] = None) -> Iterator[RelChange]:
+    """Yields the changes between two streams of as-rel2 lines"""
+
+    with TemporaryDirectory(dir=tmp_dir) as tmp_name:
+        old_paths: List[Path] = [Path(tmp_name) / f"old_{i}"
+                                 for i in range(partitions)]
+        new_paths: List[Path] = [Path(tmp_name) / f"new_{i}"
+                                 for i in range(partitions)]
+        old_ixps, old_clique = self._partition_lines(old_lines, old_paths)
+        new_ixps, new_clique = self._partition_lines(new_lines, new_paths)
+
+        for name, old, new in (("ixp", old_ixps, new_ixps),
+                               ("input_clique", old_clique, new_clique)):
+            for asn in sorted(new - old):
+                yield RelChange(f"{name}_added", asn)
+            for asn in sorted(old - new):
+                yield RelChange(f"{name}_removed", asn)
+
+        for old_path, new_path in zip(old_paths, new_paths):
+            old_rels = _read_partition(old_path)
+            new_rels = _read_partition(new_path)
+            for pair in sorted(old_rels.keys() | new_rels.keys()):
+                old_rel: Optional[int] = old_rels.get(pair)
+                new_rel: Optional[int] = new_rels.get(pair)
+                if old_rel is None:
+                    yield RelChange("added", *pair, None, new_rel)
+                elif new_rel is None:
+                    yield RelChange("removed", *pair, old_rel, None)
+                elif old_rel != new_rel:
+                    yield RelChange("flipped", *pair, old_rel, new_rel)
+
+
+def _partition_lines(self,
+                     lines: Iterable[str],
+                     paths: List[Path]) -> Tuple[Set[int], Set[int]]:
+    """Writes each link to a partition, and returns the IXPs/input clique
+
+    Links are written as asn1|asn2|rel with asn1 < asn2 (see RelChange)
+    """
+
+    ixps: Set[int] = set()
+    input_clique: Set[int] = set()
+    files: List[TextIO] = [x.open(mode="w") for x in paths]
+    try:
+        for line in lines:
+            if line.startswith("#"):
+                if line.startswith("# input clique"):
+                    self._extract_input_clique(line, input_clique)
+                elif line.startswith("# IXP ASes"):
+                    self._extract_ixp_ases(line, ixps)
+            elif line:
+                asn1_str, asn2_str, rel_str = line.split("|")[:3]
+                asn1, asn2, rel = int(asn1_str), int(asn2_str), int(rel_str)
+                if asn2 < asn1:
+                    asn1, asn2, rel = asn2, asn1, -rel
+                files[(asn1 * _PARTITION_HASH ^ asn2) % len(files)].write(
+                    f"{asn1}|{asn2}|{rel}\n")
+    finally:
+        for f in files:
+            f.close()
+    return ixps, input_clique
+
+
+def _read_partition(path: Path) -> Dict[Tuple[int, int], int]:
+    """Returns {(asn1, asn2): rel} of a partition"""
+
+    rels: Dict[Tuple[int, int], int] = dict()
+    with path.open(mode="r") as f:
+        for line in f:
+            asn1, asn2, rel = line.split("|")
+            rels[(int(asn1), int(asn2))] = int(rel)
+    return rels
@@ -78,17 +78,17 @@ def run_kwargs(tmp_path: Path) -> Generator[Dict[str, Any],
 
 
 @pytest.fixture(scope="function")
-def mock_caida_collector():
+def mock_caida_collector(tmp_path: Path):
     """Returns a CaidaCollector obj that has custom input files
 
     Clears cache and tsv before yielding"""
 
-    with patch(("lib_caida_collector.caida_collector."
+    with patch(("caida_collector_pkg.caida_collector."
                 "html_funcs.requests.get"), mocked_requests_get):
-        with patch(("lib_caida_collector.caida_collector."
+        with patch(("caida_collector_pkg.caida_collector."
                     "CaidaCollector._download_bz2_file"),
                    mocked_download_file):
-            yield CaidaCollector()
+            yield CaidaCollector(index_cache_path=tmp_path / "index.json")
 
 
 @pytest.fixture(scope="function")
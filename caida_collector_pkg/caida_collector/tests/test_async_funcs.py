@@ -0,0 +1,69 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+import pytest
+
+from ..caida_collector import CaidaCollector
+from ...graph import BGPDAG
+
+
+@pytest.mark.async_funcs
+class TestAsyncFuncs:
+    """Tests collecting months in the background"""
+
+    @pytest.mark.parametrize("executor", [None, ThreadPoolExecutor(1)])
+    def test_run_async(self,
+                       mock_caida_collector: CaidaCollector,
+                       tmp_path: Path,
+                       executor: Optional[ThreadPoolExecutor]):
+        """Builds the graph in an executor and writes the TSV"""
+
+        dl_time = datetime(2021, 9, 20)
+        tsv_path = tmp_path / "test.tsv"
+        loop = asyncio.new_event_loop()
+        try:
+            bgp_dag = loop.run_until_complete(
+                mock_caida_collector.run_async(dl_time,
+                                               cache_dir=tmp_path,
+                                               tsv_path=tsv_path,
+                                               executor=executor))
+        finally:
+            loop.close()
+        assert isinstance(bgp_dag, BGPDAG)
+        assert len(bgp_dag) == 77
+        assert tsv_path.exists()
+        assert mock_caida_collector._get_snapshot_path(tmp_path,
+                                                       dl_time).exists()
+
+    def test_prefetch_and_wait(self,
+                               mock_caida_collector: CaidaCollector,
+                               tmp_path: Path):
+        """Prefetches are picked up in order, and only once"""
+
+        dates = [datetime(2021, 10, 5), datetime(2021, 9, 20)]
+        futures = [mock_caida_collector.prefetch(x, cache_dir=tmp_path)
+                   for x in dates]
+        # The same month isn't prefetched twice
+        assert mock_caida_collector.prefetch(dates[0],
+                                             cache_dir=tmp_path) is futures[0]
+        assert len(mock_caida_collector.wait(dates[1], timeout=60)) == 77
+        assert len(mock_caida_collector.wait(timeout=60)) == 77
+        with pytest.raises(Exception):
+            mock_caida_collector.wait()
+
+    def test_prefetch_failure(self,
+                              mock_caida_collector: CaidaCollector,
+                              tmp_path: Path):
+        """The example index has no file for 1990, so that month fails"""
+
+        dl_time = datetime(1990, 1, 1)
+        mock_caida_collector.prefetch(dl_time, cache_dir=tmp_path)
+        with pytest.raises(Exception):
+            mock_caida_collector.wait(dl_time, timeout=60)
+        assert not list(tmp_path.glob("1990*"))
+        # Failures are only raised once
+        with pytest.raises(Exception, match="Nothing has been prefetched"):
+            mock_caida_collector.wait()
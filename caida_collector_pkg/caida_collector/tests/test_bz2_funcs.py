@@ -0,0 +1,145 @@
+import bz2
+from pathlib import Path
+import random
+from typing import Any, Dict
+from unittest.mock import patch
+
+import pytest
+
+from ..caida_collector import CaidaCollector
+from .. import bz2_funcs
+from ..bz2_funcs import decompress_parallel, iter_lines
+
+
+def _relationship_bytes(num_lines: int) -> bytes:
+    """Returns random as-rel2 style lines, so that they compress poorly"""
+
+    rand = random.Random(0)
+    lines = [f"{rand.randint(1, 400000)}|{rand.randint(1, 400000)}|"
+             f"{rand.choice(('-1', '0'))}|bgp" for _ in range(num_lines)]
+    return ("\n".join(lines) + "\n").encode()
+
+
+@pytest.fixture(scope="module")
+def multi_block_path(tmp_path_factory) -> Path:
+    """bz2 file with many blocks (level 1 blocks are 100k)"""
+
+    path: Path = tmp_path_factory.mktemp("bz2") / "multi_block.bz2"
+    path.write_bytes(bz2.compress(_relationship_bytes(60000),
+                                  compresslevel=1))
+    return path
+
+
+@pytest.mark.bz2_funcs
+class TestBz2Funcs:
+    def test_single_block(self, bz2_path: Path):
+        """The example file has a single block"""
+
+        assert (b"".join(decompress_parallel(bz2_path, 2))
+                == bz2.decompress(bz2_path.read_bytes()))
+
+    def test_multi_block(self, multi_block_path: Path):
+        """Blocks are split into chunks and rejoined in order"""
+
+        data = multi_block_path.read_bytes()
+        assert len(list(bz2_funcs._get_chunks(data, 4))) == 4
+        assert (b"".join(decompress_parallel(multi_block_path, 2))
+                == bz2.decompress(data))
+
+    def test_multi_stream(self, multi_block_path: Path, tmp_path: Path):
+        """Concatenated streams (i.e. from pbzip2) are each split"""
+
+        data = (multi_block_path.read_bytes()
+                + bz2.compress(b"1|2|-1|bgp\n" * 1000))
+        path = tmp_path / "multi_stream.bz2"
+        path.write_bytes(data)
+        assert (b"".join(decompress_parallel(path, 2))
+                == bz2.decompress(data))
+
+    def test_not_bz2(self, tmp_path: Path):
+        """Files that can't be split are decompressed serially"""
+
+        path = tmp_path / "not.bz2"
+        path.write_bytes(b"not a bz2 file")
+        with pytest.raises(OSError):
+            b"".join(decompress_parallel(path, 2))
+
+    def test_bad_chunk(self, multi_block_path: Path):
+        """A bad chunk falls back to serial from where it left off"""
+
+        data = multi_block_path.read_bytes()
+        chunks = list(bz2_funcs._get_chunks(data, 4))
+        # Corrupt the last chunk, as a spurious magic would
+        chunks[-1] = chunks[-1][:-20] + bytes(20)
+        with patch.object(bz2_funcs, "_get_chunks", return_value=chunks):
+            assert (b"".join(decompress_parallel(multi_block_path, 2))
+                    == bz2.decompress(data))
+
+    def test_max_chunk_blocks(self, multi_block_path: Path):
+        """Chunks stay small however few are asked for"""
+
+        data = multi_block_path.read_bytes()
+        num_blocks = len(bz2_funcs._find_magic(data, bz2_funcs.BLOCK_MAGIC))
+        assert (len(list(bz2_funcs._get_chunks(data, 1)))
+                == -(-num_blocks // bz2_funcs.MAX_CHUNK_BLOCKS))
+
+    def test_chunks_in_flight(self, multi_block_path: Path):
+        """Only a few chunks per job are submitted ahead of the reader"""
+
+        data = multi_block_path.read_bytes()
+        chunks = list(bz2_funcs._get_chunks(data, 12))
+        submitted = []
+
+        def get_chunks(*args):
+            for chunk in chunks:
+                submitted.append(chunk)
+                yield chunk
+
+        with patch.object(bz2_funcs, "_get_chunks", side_effect=get_chunks):
+            decompressed = decompress_parallel(multi_block_path, 1)
+            next(decompressed)
+            assert len(submitted) == bz2_funcs.CHUNKS_IN_FLIGHT
+            assert (b"".join(decompressed)
+                    == bz2.decompress(data)[len(bz2.decompress(chunks[0])):])
+        assert len(submitted) == len(chunks)
+
+    @pytest.mark.parametrize("skip", [0, 1, 250000, 10**9])
+    def test_decompress_serially(self,
+                                 multi_block_path: Path,
+                                 tmp_path: Path,
+                                 skip: int):
+        """Serial decompression streams, and skips what was yielded"""
+
+        data = (multi_block_path.read_bytes()
+                + bz2.compress(b"1|2|-1|bgp\n" * 1000))
+        path = tmp_path / "multi_stream.bz2"
+        path.write_bytes(data)
+        with patch.object(bz2_funcs, "SERIAL_READ_SIZE", 4096):
+            pieces = list(bz2_funcs._decompress_serially(path, skip=skip))
+        assert b"".join(pieces) == bz2.decompress(data)[skip:]
+        if not skip:
+            assert len(pieces) > 1
+
+    def test_truncated(self, multi_block_path: Path, tmp_path: Path):
+        path = tmp_path / "truncated.bz2"
+        path.write_bytes(multi_block_path.read_bytes()[:-100])
+        with pytest.raises(EOFError):
+            b"".join(bz2_funcs._decompress_serially(path))
+
+    def test_iter_lines(self):
+        """Lines that span chunks are rejoined"""
+
+        chunks = [b"1|2|-1", b"|bgp\n3|4|0|bgp\n5", b"|6|0|bgp"]
+        expected = [b"1|2|-1|bgp", b"3|4|0|bgp", b"5|6|0|bgp"]
+        assert list(iter_lines(iter(chunks))) == expected
+
+    def test_read_from_caida(self,
+                             mock_caida_collector: CaidaCollector,
+                             decoded_path: Path,
+                             run_kwargs: Dict[str, Any]):
+        """Lines are the same when decompressed in parallel"""
+
+        mock_caida_collector.decompress_jobs = 2
+        lines = mock_caida_collector._read_from_caida(run_kwargs["dl_time"])
+        with decoded_path.open(mode="r") as f:
+            assert tuple(lines) == tuple([x.strip() for x in f])
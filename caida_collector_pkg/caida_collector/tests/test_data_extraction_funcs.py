@@ -1,5 +1,6 @@
+import bz2
 from pathlib import Path
-from typing import Set
+from typing import Set, Tuple
 
 import pytest
 
@@ -129,3 +130,41 @@ class TestDataExtractionFuncs:
         # This is from the test bz2 file
         mock_caida_collector._extract_peers(line, test_peers)
         assert ground_truth_peers == test_peers
+
+    def test_get_edge_arrays_parity(self,
+                                    caida_collector: CaidaCollector,
+                                    bz2_path: Path):
+        """Tests that the numpy engine matches _get_ases on the bz2 file"""
+
+        with bz2.open(bz2_path, mode="rb") as f:
+            lines: Tuple[str, ...] = tuple([x.decode().strip() for x in f])
+
+        (cp_links,
+         peer_links,
+         ixps,
+         input_clique) = caida_collector._get_ases(iter(lines))
+        edges = caida_collector._get_edge_arrays(iter(lines))
+        (np_cp_links,
+         np_peer_links) = caida_collector._links_from_edge_arrays(edges)
+
+        assert len(cp_links) > 0 and len(peer_links) > 0
+        assert np_cp_links == cp_links
+        assert np_peer_links == peer_links
+        assert edges.ixps == ixps
+        assert edges.input_clique == input_clique
+
+    def test_get_edge_arrays_no_relationships(
+            self, caida_collector: CaidaCollector):
+        """Tests that a file of only comments parses to empty arrays"""
+
+        edges = caida_collector._get_edge_arrays(iter(["# IXP ASes: 1 2"]))
+        assert len(edges.providers) == len(edges.customers) == 0
+        assert edges.peers.shape == (0, 2)
+        assert edges.ixps == {1, 2}
+
+    def test_parse_engine(self):
+        """Tests that only known parse engines are accepted"""
+
+        assert CaidaCollector(parse_engine="numpy").parse_engine == "numpy"
+        with pytest.raises(Exception):
+            CaidaCollector(parse_engine="fortran")
@@ -0,0 +1,64 @@
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from ..caida_collector import CaidaCollector
+from ...links import CustomerProviderLink as CPLink
+from ...links import PeerLink
+
+_example_path: Path = Path(__file__).parent / "examples" / \
+    "20210901.as-rel2.decoded"
+
+
+@pytest.mark.diff_funcs
+class TestDiffFuncs:
+    """Tests updating a graph from one cached month to the next"""
+
+    def _cache_months(self, cache_dir: Path):
+        """Caches the example file, and a next month that differs a bit
+
+        1-1898 becomes a peer link, 1-5401 is removed, 5401 becomes a
+        new AS's customer, and 1 and 2 peer
+        """
+
+        lines = _example_path.read_text().splitlines()
+        new_lines = [x for x in lines
+                     if not x.startswith(("1|1898|", "1|5401|"))]
+        new_lines += ["1|1898|0|bgp", "9999999|5401|-1|bgp", "1|2|0|bgp"]
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        (cache_dir / "2021.09.01").write_text("\n".join(lines) + "\n")
+        (cache_dir / "2021.10.01").write_text("\n".join(new_lines) + "\n")
+
+    def test_diff_months(self, tmp_path: Path):
+        self._cache_months(tmp_path)
+        diff = CaidaCollector(index_cache_path=None).diff_months(
+            datetime(2021, 9, 1), datetime(2021, 10, 1), cache_dir=tmp_path)
+        assert diff.added_cp == {CPLink(provider_asn=9999999,
+                                        customer_asn=5401)}
+        assert diff.removed_cp == {CPLink(provider_asn=1, customer_asn=1898),
+                                   CPLink(provider_asn=1, customer_asn=5401)}
+        assert diff.added_peers == {PeerLink(1, 1898), PeerLink(1, 2)}
+        assert diff.removed_peers == set()
+        assert 174 in diff.input_clique and 1200 in diff.ixps
+
+    def test_run_diff(self, tmp_path: Path):
+        """The updated graph writes the same TSV as building the month"""
+
+        self._cache_months(tmp_path)
+        collector = CaidaCollector(index_cache_path=None)
+        bgp_dag = collector.run(datetime(2021, 9, 1),
+                                cache_dir=tmp_path,
+                                tsv_path=None)
+        updated = collector.run_diff(bgp_dag,
+                                     datetime(2021, 9, 1),
+                                     datetime(2021, 10, 1),
+                                     cache_dir=tmp_path,
+                                     tsv_path=tmp_path / "updated.tsv")
+        assert updated is bgp_dag
+        collector.run(datetime(2021, 10, 1),
+                      cache_dir=tmp_path,
+                      tsv_path=tmp_path / "rebuilt.tsv")
+        assert ((tmp_path / "updated.tsv").read_text()
+                == (tmp_path / "rebuilt.tsv").read_text())
+        assert 9999999 in bgp_dag.as_dict
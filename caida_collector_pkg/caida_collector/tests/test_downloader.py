@@ -0,0 +1,174 @@
+from http.server import BaseHTTPRequestHandler, HTTPServer
+import hashlib
+import os
+from pathlib import Path
+from threading import Thread
+import time
+from typing import Iterator, List
+
+import pytest
+import requests
+
+from ..downloader import Downloader
+
+
+# Contents served by the stand in server
+_DATA: bytes = os.urandom(100_000)
+
+
+class _RangeHandler(BaseHTTPRequestHandler):
+    """Stand in for Caida's server that supports Range requests
+
+    Misbehavior for the tests is set on the server:
+    drop_after: number of requests that send half their body and hang up
+    fail_first: number of requests that get a fail_status (500)
+    missing: every request gets a 404
+    """
+
+    def log_message(self, *args, **kwargs):
+        pass
+
+    def _range(self):
+        start, end = 0, len(_DATA)
+        header = self.headers.get("Range")
+        if header:
+            first, last = header.split("=")[1].split("-")
+            start = int(first)
+            end = int(last) + 1 if last else len(_DATA)
+        return header is not None, start, end
+
+    def _send_status(self, status: int):
+        self.send_response(status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_HEAD(self):
+        if self.server.missing:  # type: ignore
+            self._send_status(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(_DATA)))
+        self.send_header("Accept-Ranges", "bytes")
+        self.end_headers()
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append(self.headers.get("Range"))  # type: ignore
+        if server.missing:  # type: ignore
+            self._send_status(404)
+            return
+        if server.fail_first > 0:  # type: ignore
+            server.fail_first -= 1  # type: ignore
+            self._send_status(server.fail_status)  # type: ignore
+            return
+        is_range, start, end = self._range()
+        body = _DATA[start:end]
+        self.send_response(206 if is_range else 200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if server.drop_after > 0:  # type: ignore
+            server.drop_after -= 1  # type: ignore
+            self.wfile.write(body[:len(body) // 2])
+            self.wfile.flush()
+            self.close_connection = True
+            return
+        self.wfile.write(body)
+
+
+@pytest.fixture(scope="function")
+def server() -> Iterator[HTTPServer]:
+    httpd = HTTPServer(("127.0.0.1", 0), _RangeHandler)
+    httpd.requests: List[str] = []  # type: ignore
+    httpd.drop_after = 0  # type: ignore
+    httpd.fail_first = 0  # type: ignore
+    httpd.fail_status = 500  # type: ignore
+    httpd.missing = False  # type: ignore
+    thread = Thread(target=httpd.serve_forever,
+                    kwargs={"poll_interval": 0.05},
+                    daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _url(server: HTTPServer) -> str:
+    return f"http://127.0.0.1:{server.server_address[1]}/file.bz2"
+
+
+@pytest.mark.downloader
+class TestDownloader:
+    """Tests the downloader against a local http.server"""
+
+    def test_download(self, server: HTTPServer, tmp_path: Path):
+        path = tmp_path / "file.bz2"
+        md5 = hashlib.md5(_DATA).hexdigest()
+        Downloader().download(_url(server), path, checksum=("md5", md5))
+        assert path.read_bytes() == _DATA
+
+    def test_resume(self, server: HTTPServer, tmp_path: Path):
+        """A dropped connection resumes where it left off"""
+
+        server.drop_after = 1  # type: ignore
+        path = tmp_path / "file.bz2"
+        Downloader(backoff=0).download(_url(server), path)
+        assert path.read_bytes() == _DATA
+        # The second request only asked for the missing bytes
+        resumed: str = server.requests[1]  # type: ignore
+        assert resumed == f"bytes={len(_DATA) // 2}-{len(_DATA) - 1}"
+
+    def test_retries(self, server: HTTPServer, tmp_path: Path):
+        """Server errors are retried, and raised once out of retries"""
+
+        server.fail_first = 2  # type: ignore
+        path = tmp_path / "file.bz2"
+        Downloader(retries=2, backoff=0).download(_url(server), path)
+        assert path.read_bytes() == _DATA
+
+        server.fail_first = 2  # type: ignore
+        with pytest.raises(Exception):
+            Downloader(retries=1, backoff=0).download(_url(server), path)
+
+    def test_retries_too_many_requests(self,
+                                       server: HTTPServer,
+                                       tmp_path: Path):
+        """429s are retried like server errors"""
+
+        server.fail_first = 2  # type: ignore
+        server.fail_status = 429  # type: ignore
+        path = tmp_path / "file.bz2"
+        Downloader(retries=2, backoff=0).download(_url(server), path)
+        assert path.read_bytes() == _DATA
+
+    def test_not_found(self, server: HTTPServer, tmp_path: Path):
+        """A 404 is raised at once instead of being retried"""
+
+        server.missing = True  # type: ignore
+        start = time.perf_counter()
+        with pytest.raises(requests.HTTPError):
+            Downloader(backoff=10).download(_url(server),
+                                            tmp_path / "file.bz2")
+        assert time.perf_counter() - start < 5
+        assert len(server.requests) == 1  # type: ignore
+
+    def test_chunks(self, server: HTTPServer, tmp_path: Path):
+        """Large files are downloaded as parallel ranged chunks"""
+
+        server.drop_after = 1  # type: ignore
+        path = tmp_path / "file.bz2"
+        Downloader(chunks=4, min_chunk_size=1000, backoff=0).download(
+            _url(server), path)
+        assert path.read_bytes() == _DATA
+        # 4 chunks plus the one that was resumed
+        assert len(server.requests) == 5  # type: ignore
+
+    def test_verify(self, server: HTTPServer, tmp_path: Path):
+        """Wrong sizes and checksums raise"""
+
+        path = tmp_path / "file.bz2"
+        with pytest.raises(Exception):
+            Downloader().download(_url(server), path, size=len(_DATA) + 1)
+        with pytest.raises(Exception):
+            Downloader().download(_url(server),
+                                  path,
+                                  checksum=("md5", "0" * 32))
@@ -1,4 +1,6 @@
-from datetime import date
+from datetime import datetime
+import json
+from pathlib import Path
 from typing import Any, Dict
 
 import pytest
@@ -11,7 +13,6 @@ class TestHTMLFuncs:
     """Tests funcs related to html"""
 
     def test_get_url(self,
-                     caida_collector: CaidaCollector,
                      mock_caida_collector: CaidaCollector,
                      run_kwargs: Dict[str, Any]):
         """Tests that the URL collected from Caida is accurate
@@ -26,8 +27,88 @@ class TestHTMLFuncs:
 
         # This is from the test html file
         assert mock_caida_collector._get_url(dl_time) == test_url
-        # This is from their website. Just to make sure their website
-        # format hasn't changed
-        dl_time = date.today().replace(day=1)
-        dl_time.replace(month=dl_time.month - 1)
-        caida_collector._get_url(dl_time)
+
+    @pytest.mark.slow
+    def test_get_url_live(self, caida_collector: CaidaCollector):
+        """This is from their website.
+
+        Just to make sure their website format hasn't changed
+        """
+
+        dl_time = caida_collector._get_latest_dl_time()
+        assert dl_time.strftime("%Y%m01") in caida_collector._get_url(dl_time)
+
+    def test_latest_dl_time(self, mock_caida_collector: CaidaCollector):
+        """The default dl time is the newest file in the index"""
+
+        latest = max(mock_caida_collector._get_index())
+        assert (mock_caida_collector.default_dl_time()
+                == datetime.strptime(latest, "%Y%m%d"))
+
+    def test_index_cache(self,
+                         mock_caida_collector: CaidaCollector,
+                         run_kwargs: Dict[str, Any]):
+        """The index is written to disk and reused by other collectors"""
+
+        index = mock_caida_collector._get_index()
+        path = mock_caida_collector.index_cache_path
+        assert path is not None and path.exists()
+
+        collector = CaidaCollector(index_cache_path=path)
+        # Fails if anything tries to fetch the listing
+        collector._get_hrefs = None  # type: ignore
+        assert collector._get_index() == index
+        assert (collector._get_url(run_kwargs["dl_time"])
+                == index["20210901"])
+
+    def test_index_cache_expired(self,
+                                 mock_caida_collector: CaidaCollector,
+                                 tmp_path: Path):
+        """Expired or corrupt indexes are fetched again"""
+
+        path = tmp_path / "expired_index.json"
+        with path.open(mode="w") as f:
+            json.dump({"fetched": 0, "urls": {"19900101": "old"}}, f)
+        mock_caida_collector.index_cache_path = path
+        assert "19900101" not in mock_caida_collector._get_index()
+
+        with path.open(mode="w") as f:
+            f.write("not json")
+        mock_caida_collector._index = None
+        assert "20210901" in mock_caida_collector._get_index()
+
+    def test_index_expires_in_memory(self,
+                                     mock_caida_collector: CaidaCollector):
+        """A long running collector sees months published after it started
+
+        Misses refetch the index at most once per index_ttl
+        """
+
+        collector = mock_caida_collector
+        collector.index_cache_path = None
+        index = collector._get_index()
+        new_month = datetime(2100, 1, 1)
+        new_index = {**index, "21000101": "new"}
+        fetches = []
+
+        def fetch_new_index():
+            fetches.append(True)
+            return new_index
+
+        collector._fetch_index = fetch_new_index  # type: ignore
+        # Just downloaded, so neither expiry nor a miss refetches it
+        with pytest.raises(Exception, match="No Urls"):
+            collector._get_url(new_month)
+        assert collector._get_latest_dl_time() != new_month
+        assert not fetches
+
+        # Once index_ttl passes, the index in memory expires
+        collector._index_fetched -= collector.index_ttl + 1
+        assert collector._get_latest_dl_time() == new_month
+        assert len(fetches) == 1
+
+        # And once it passes since the last download, a miss refetches
+        collector._index = index
+        collector._index_downloaded -= collector.index_ttl + 1  # type: ignore
+        assert collector._get_url(new_month) == "new"
+        assert len(fetches) == 2
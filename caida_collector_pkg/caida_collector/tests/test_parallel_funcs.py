@@ -0,0 +1,76 @@
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from ..caida_collector import CaidaCollector
+from ...graph import BGPDAG
+
+
+@pytest.mark.parallel_funcs
+class TestParallelFuncs:
+    """Tests collecting many months at once"""
+
+    @pytest.mark.parametrize("jobs", [1, 2])
+    def test_run_many(self,
+                      mock_caida_collector: CaidaCollector,
+                      tmp_path: Path,
+                      jobs: int):
+        """Results are in date order and failures don't clear other months
+
+        The example index has no file for 1990, so that month fails
+        """
+
+        dates = [datetime(2021, 10, 5), datetime(1990, 1, 1),
+                 datetime(2021, 9, 20)]
+        results = mock_caida_collector.run_many(dates,
+                                                jobs=jobs,
+                                                cache_dir=tmp_path)
+        assert len(results) == 3
+        assert isinstance(results[0], BGPDAG)
+        assert isinstance(results[1], Exception)
+        assert isinstance(results[2], BGPDAG)
+        assert len(results[0]) == len(results[2]) == 77
+
+        # The successful months are still cached
+        for dl_time in (dates[0], dates[2]):
+            assert mock_caida_collector._get_snapshot_path(tmp_path,
+                                                           dl_time).exists()
+        assert not list(tmp_path.glob("1990*"))
+
+    def test_run_many_reload_fails(self,
+                                   mock_caida_collector: CaidaCollector,
+                                   tmp_path: Path):
+        """A month that fails to reload doesn't throw away the others"""
+
+        dates = [datetime(2021, 10, 5), datetime(2021, 9, 20)]
+        load = CaidaCollector._load_snapshot_or_run
+
+        def load_or_fail(self, dl_time, cache_dir):
+            if dl_time == dates[0]:
+                raise Exception("Corrupt snapshot")
+            return load(self, dl_time, cache_dir)
+
+        with patch.object(CaidaCollector, "_load_snapshot_or_run",
+                          autospec=True, side_effect=load_or_fail):
+            results = mock_caida_collector.run_many(dates,
+                                                    jobs=1,
+                                                    cache_dir=tmp_path)
+        assert isinstance(results[0], Exception)
+        assert isinstance(results[1], BGPDAG)
+        assert not mock_caida_collector._get_snapshot_path(
+            tmp_path, dates[0]).exists()
+
+    def test_run_many_paths(self,
+                            mock_caida_collector: CaidaCollector,
+                            tmp_path: Path):
+        """Snapshot paths can be returned instead of graphs"""
+
+        dl_time = datetime(2021, 9, 20)
+        results = mock_caida_collector.run_many([dl_time],
+                                                jobs=1,
+                                                cache_dir=tmp_path,
+                                                return_paths=True)
+        assert results == [mock_caida_collector._get_snapshot_path(
+            tmp_path, dl_time)]
@@ -1,37 +1,62 @@
-from typing import Any, Dict, Tuple
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+from unittest.mock import patch
 
+import numpy as np
 import pytest
 
 from ..caida_collector import CaidaCollector
+from .. import file_reading_funcs
 
 COLLECTOR_AND_KWARGS = Tuple[CaidaCollector, Dict[str, Any]]
 
 
-@pytest.mark.read_file_funcs
-class TestReadFileFuncs:
-    @pytest.mark.skip(reason="Will come back to it later")
-    def test_read_file(self, cache_path, dl_time):
-        """Tests reading a file with all possible parameters"""
+def _decoded_lines(decoded_path: Path) -> Tuple[str, ...]:
+    """Returns the stripped lines of the decoded example file"""
 
-        raise NotImplementedError
+    with decoded_path.open(mode="r") as f:
+        return tuple([x.strip() for x in f])
 
-    @pytest.mark.skip(reason="Will come back to it later")
-    def test_read_from_cache(self, cache_path):
+
+@pytest.mark.read_file_funcs
+class TestReadFileFuncs:
+    def test_read_file(self,
+                       mock_caida_collector: CaidaCollector,
+                       decoded_path: Path,
+                       run_kwargs: Dict[str, Any],
+                       tmp_path: Path):
+        """Tests reading a file both without and with a cache"""
+
+        cache_path = tmp_path / "cache"
+        dl_time = run_kwargs["dl_time"]
+        lines = mock_caida_collector.read_file(cache_path, dl_time)
+        # Lines are streamed, nothing is cached until they are consumed
+        assert not isinstance(lines, tuple)
+        assert tuple(lines) == _decoded_lines(decoded_path)
+        assert cache_path.exists()
+        # Second read comes from the cache
+        lines = mock_caida_collector.read_file(cache_path, dl_time)
+        assert tuple(lines) == _decoded_lines(decoded_path)
+
+    def test_read_from_cache(self,
+                             mock_caida_collector: CaidaCollector,
+                             decoded_path: Path):
         """Tests that reading from the cache
 
         Should result in the same format as reading from raw
         """
 
-        raise NotImplementedError
-
-    @pytest.mark.skip(reason="Will come back to it later")
-    def test_read_from_caida(self):
-        """Tests reading file from caida
+        lines = mock_caida_collector._read_from_cache(decoded_path)
+        assert tuple(lines) == _decoded_lines(decoded_path)
 
-        Both mock and not mocked
-        """
+    def test_read_from_caida(self,
+                             mock_caida_collector: CaidaCollector,
+                             decoded_path: Path,
+                             run_kwargs: Dict[str, Any]):
+        """Tests reading file from caida (mocked)"""
 
-        raise NotImplementedError
+        lines = mock_caida_collector._read_from_caida(run_kwargs["dl_time"])
+        assert tuple(lines) == _decoded_lines(decoded_path)
 
     @pytest.mark.skip(reason="Will come back to it later")
     def test_download_bz2_file(self):
@@ -39,8 +64,145 @@ class TestReadFileFuncs:
 
         raise NotImplementedError
 
-    @pytest.mark.skip(reason="Will come back to it later")
-    def test_copy_to_cache(self):
-        """Tests that you can copy to cache correctly"""
-
-        raise NotImplementedError
+    def test_copy_to_cache(self,
+                           caida_collector: CaidaCollector,
+                           tmp_path: Path):
+        """Tests that the cache is a tee of the stream"""
+
+        cache_path = tmp_path / "cache"
+        lines = ("# comment", "1|2|-1|bgp", "3|4|0|mlp")
+        teed = caida_collector._copy_to_cache(cache_path, iter(lines))
+        assert next(teed) == lines[0]
+        # Partially consumed streams don't leave a cache behind
+        assert not cache_path.exists()
+        assert tuple(teed) == lines[1:]
+        assert tuple(caida_collector._read_from_cache(cache_path)) == lines
+
+    def test_copy_to_cache_closed_early(self,
+                                        caida_collector: CaidaCollector,
+                                        tmp_path: Path):
+        """Tests that an abandoned stream doesn't write a truncated cache"""
+
+        cache_path = tmp_path / "cache"
+        teed = caida_collector._copy_to_cache(cache_path, iter(("a", "b")))
+        next(teed)
+        teed.close()  # type: ignore
+        assert list(tmp_path.iterdir()) == []
+
+    def test_copy_to_cache_concurrent(self,
+                                      caida_collector: CaidaCollector,
+                                      tmp_path: Path):
+        """Tests that writers of the same cache don't share a tmp file"""
+
+        cache_path = tmp_path / "cache"
+        lines = ("a", "b", "c")
+        teeds = [caida_collector._copy_to_cache(cache_path, iter(lines))
+                 for _ in range(2)]
+        # Interleaved, as two jobs streaming the same month would be
+        for _ in lines:
+            for teed in teeds:
+                next(teed)
+        for teed in teeds:
+            assert tuple(teed) == tuple()
+        assert tuple(caida_collector._read_from_cache(cache_path)) == lines
+        assert list(tmp_path.iterdir()) == [cache_path]
+
+    def test_read_edges_warm_start(self,
+                                   mock_caida_collector: CaidaCollector,
+                                   run_kwargs: Dict[str, Any],
+                                   tmp_path: Path):
+        """A warm read comes from the binary cache without any parsing"""
+
+        cache_path = tmp_path / "cache"
+        dl_time = run_kwargs["dl_time"]
+        cold = mock_caida_collector.read_edges(cache_path, dl_time)
+        edge_cache_path = tmp_path / ("cache"
+                                      + file_reading_funcs.EDGE_CACHE_SUFFIX)
+        assert edge_cache_path.exists()
+
+        with patch.object(CaidaCollector, "_get_edges",
+                          side_effect=AssertionError("parsed")):
+            warm = mock_caida_collector.read_edges(cache_path, dl_time)
+
+        assert isinstance(warm.providers, np.memmap)
+        assert np.array_equal(warm.providers, cold.providers)
+        assert np.array_equal(warm.customers, cold.customers)
+        assert np.array_equal(warm.peers, cold.peers)
+        assert warm.ixps == cold.ixps
+        assert warm.input_clique == cold.input_clique
+
+    def test_write_edge_cache_concurrent(self,
+                                         mock_caida_collector: CaidaCollector,
+                                         run_kwargs: Dict[str, Any],
+                                         tmp_path: Path):
+        """Tests that writers of the same edge cache don't share a tmp file"""
+
+        cache_path = tmp_path / "cache"
+        edges = mock_caida_collector.read_edges(cache_path,
+                                                run_kwargs["dl_time"])
+        edge_cache_path = tmp_path / ("cache"
+                                      + file_reading_funcs.EDGE_CACHE_SUFFIX)
+        edge_cache_path.unlink()
+        save = np.save
+        nested: List[bool] = []
+
+        def save_during_another_write(f, arr):
+            save(f, arr)
+            # Another job writes the whole cache in the middle of this one
+            if not nested:
+                nested.append(True)
+                mock_caida_collector._write_edge_cache(edge_cache_path,
+                                                       edges)
+
+        with patch.object(np, "save",
+                          side_effect=save_during_another_write):
+            mock_caida_collector._write_edge_cache(edge_cache_path, edges)
+        assert mock_caida_collector._read_from_edge_cache(
+            edge_cache_path) is not None
+        assert list(tmp_path.glob("*.tmp")) == []
+
+    def test_read_edges_version_mismatch(self,
+                                         mock_caida_collector: CaidaCollector,
+                                         run_kwargs: Dict[str, Any],
+                                         tmp_path: Path):
+        """An edge cache from another version is rebuilt"""
+
+        cache_path = tmp_path / "cache"
+        dl_time = run_kwargs["dl_time"]
+        cold = mock_caida_collector.read_edges(cache_path, dl_time)
+        edge_cache_path = tmp_path / ("cache"
+                                      + file_reading_funcs.EDGE_CACHE_SUFFIX)
+        arr = np.load(str(edge_cache_path))
+        arr[1] = file_reading_funcs.EDGE_CACHE_VERSION + 1
+        np.save(str(edge_cache_path), arr)
+        assert mock_caida_collector._read_from_edge_cache(
+            edge_cache_path) is None
+
+        rebuilt = mock_caida_collector.read_edges(cache_path, dl_time)
+        assert np.array_equal(rebuilt.peers, cold.peers)
+        # The cache was rewritten with the current version
+        assert mock_caida_collector._read_from_edge_cache(
+            edge_cache_path) is not None
+
+    @pytest.mark.parametrize("size", [0, 10, 200, -8])
+    def test_read_edges_truncated(self,
+                                  mock_caida_collector: CaidaCollector,
+                                  run_kwargs: Dict[str, Any],
+                                  tmp_path: Path,
+                                  size: int):
+        """A truncated edge cache is rebuilt rather than raising"""
+
+        cache_path = tmp_path / "cache"
+        dl_time = run_kwargs["dl_time"]
+        cold = mock_caida_collector.read_edges(cache_path, dl_time)
+        edge_cache_path = tmp_path / ("cache"
+                                      + file_reading_funcs.EDGE_CACHE_SUFFIX)
+        data = edge_cache_path.read_bytes()
+        edge_cache_path.write_bytes(data[:size])
+        assert mock_caida_collector._read_from_edge_cache(
+            edge_cache_path) is None
+
+        rebuilt = mock_caida_collector.read_edges(cache_path, dl_time)
+        assert np.array_equal(rebuilt.peers, cold.peers)
+        assert mock_caida_collector._read_from_edge_cache(
+            edge_cache_path) is not None
@@ -0,0 +1,82 @@
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from ..caida_collector import CaidaCollector
+from ..stream_diff_funcs import RelChange
+from ...__main__ import diff_main
+
+_example_path: Path = Path(__file__).parent / "examples" / \
+    "20210901.as-rel2.decoded"
+
+# 1-1898 becomes a peer link, 1-5401 is removed, 5401 becomes a new AS's
+# customer, 1 and 2 peer, 3 becomes 4's provider. 1200 isn't an IXP,
+# and 9999999 joins the input clique
+_expected = [RelChange("ixp_removed", 1200),
+             RelChange("input_clique_added", 9999999),
+             RelChange("added", 1, 2, None, 0),
+             RelChange("added", 3, 4, None, -1),
+             RelChange("added", 5401, 9999999, None, 1),
+             RelChange("flipped", 1, 1898, -1, 0),
+             RelChange("removed", 1, 5401, -1, None)]
+
+
+def _cache_months(cache_dir: Path):
+    lines = _example_path.read_text().splitlines()
+    new_lines = []
+    for line in lines:
+        if line.startswith("# input clique"):
+            line += " 9999999"
+        elif line.startswith("# IXP ASes"):
+            line = line.replace(" 1200", "")
+        elif line.startswith(("1|1898|", "1|5401|")):
+            continue
+        new_lines.append(line)
+    new_lines += ["1|1898|0|bgp", "9999999|5401|-1|bgp", "2|1|0|bgp",
+                  "3|4|-1|mlp"]
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    (cache_dir / "2021.09.01").write_text("\n".join(lines) + "\n")
+    (cache_dir / "2021.10.01").write_text("\n".join(new_lines) + "\n")
+
+
+@pytest.mark.stream_diff_funcs
+class TestStreamDiffFuncs:
+    """Tests streaming the changes between two cached months"""
+
+    @pytest.mark.parametrize("partitions", [1, 7, 64])
+    def test_stream_diff(self, tmp_path: Path, partitions: int):
+        """Every partitioning finds the same changes"""
+
+        _cache_months(tmp_path)
+        changes = list(CaidaCollector(index_cache_path=None).stream_diff(
+            datetime(2021, 9, 1),
+            datetime(2021, 10, 1),
+            cache_dir=tmp_path,
+            partitions=partitions))
+        # Link changes are only sorted within partitions
+        assert changes[:2] == _expected[:2]
+        assert sorted(changes[2:]) == sorted(_expected[2:])
+        # Temporary partitions are removed
+        assert sorted(x.name for x in tmp_path.iterdir()) == [
+            "2021.09.01", "2021.10.01"]
+
+    def test_same_month(self, tmp_path: Path):
+        _cache_months(tmp_path)
+        assert list(CaidaCollector(index_cache_path=None).stream_diff(
+            datetime(2021, 9, 1),
+            datetime(2021, 9, 1),
+            cache_dir=tmp_path)) == []
+
+    def test_cli(self, tmp_path: Path):
+        _cache_months(tmp_path)
+        out_path = tmp_path / "changes.tsv"
+        diff_main(["2021.09.01", "2021.10.01",
+                   "--cache-dir", str(tmp_path),
+                   "--partitions", "1",
+                   "--output", str(out_path)])
+        lines = out_path.read_text().splitlines()
+        assert lines[0] == "change\tasn1\tasn2\told_rel\tnew_rel"
+        assert lines[1] == "ixp_removed\t1200\t\t\t"
+        assert "flipped\t1\t1898\t-1\t0" in lines
+        assert len(lines) == len(_expected) + 1
@@ -0,0 +1,68 @@
+from pathlib import Path
+from typing import Type
+
+import pytest
+
+from .. import tsv_funcs
+from ..caida_collector import CaidaCollector
+from ...graph import AS, BGPDAG
+
+
+class RowTestAS(AS):
+    @property
+    def stub(self) -> bool:
+        return False
+
+
+def _gen_bgp_dag(decoded_path: Path, BaseASCls: Type[AS] = AS) -> BGPDAG:
+    collector = CaidaCollector()
+    with decoded_path.open(mode="r") as f:
+        edges = collector._get_edges(x.strip() for x in f)
+    cp_links, peer_links = collector._links_from_edge_arrays(edges)
+    return BGPDAG(cp_links,
+                  peer_links,
+                  ixps=edges.ixps,
+                  input_clique=edges.input_clique,
+                  BaseASCls=BaseASCls)
+
+
+def _tsvs(bgp_dag: BGPDAG, tmp_path: Path, jobs: int):
+    """Returns the TSV written row by row and written by columns"""
+
+    collector = CaidaCollector()
+    rows_path, cols_path = tmp_path / "rows.tsv", tmp_path / "cols.tsv"
+    collector._write_tsv_rows(bgp_dag, rows_path)
+    collector._write_tsv(bgp_dag, cols_path, jobs)
+    return rows_path.read_bytes(), cols_path.read_bytes()
+
+
+@pytest.mark.tsv_funcs
+class TestTSVFuncs:
+    @pytest.mark.parametrize("jobs", [1, 2])
+    def test_byte_identical(self,
+                            decoded_path: Path,
+                            tmp_path: Path,
+                            monkeypatch: pytest.MonkeyPatch,
+                            jobs: int):
+        """Columns give the same bytes as a DictWriter of db_rows"""
+
+        # Several chunks, so that workers are used
+        monkeypatch.setattr(tsv_funcs, "TSV_CHUNK_ROWS", 10)
+        bgp_dag = _gen_bgp_dag(decoded_path)
+        # Values that csv quotes
+        bgp_dag.ases[0].rov_source = 'quote"d'
+        bgp_dag.ases[1].rov_filtering = "tab\tbed"
+        rows_tsv, cols_tsv = _tsvs(bgp_dag, tmp_path, jobs)
+        assert rows_tsv == cols_tsv
+        assert b"\r\n" in cols_tsv and b"{}" in cols_tsv
+        assert any(x.stubs for x in bgp_dag)
+
+    def test_overridden_properties(self, decoded_path: Path, tmp_path: Path):
+        """ASes that change db_row's properties are written row by row"""
+
+        bgp_dag = _gen_bgp_dag(decoded_path, RowTestAS)
+        rows_tsv, cols_tsv = _tsvs(bgp_dag, tmp_path, 1)
+        assert rows_tsv == cols_tsv
+        header = cols_tsv.splitlines()[0].split(b"\t")
+        assert all(line.split(b"\t")[header.index(b"stub")] == b"False"
+                   for line in cols_tsv.splitlines()[1:])
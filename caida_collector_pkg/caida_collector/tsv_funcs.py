@@ -0,0 +1,185 @@
+"""Functions to write the BGPDAG to a TSV
+
+The TSV has a row of AS.db_row per AS. Rather than building a dict per
+AS, every column is formatted up front: scalar columns from the AS
+attributes, and neighbor columns ({asn,asn,...}) from the graph's CSR
+arrays sorted by ASN. Rows are then written in large chunks with the
+same csv dialect as DictWriter, so the output is byte identical.
+Chunks can be formatted across worker processes
+
+Graphs of ASes that override db_row or the properties in it are written
+row by row with db_row
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from csv import DictWriter, writer
+from io import StringIO
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from ..graph import AS, BGPDAG
+from ..graph.base_as import SLOTS, STUB_FLAG, MULTIHOMED_FLAG, TRANSIT_FLAG
+
+
+# Rows formatted and written at a time
+TSV_CHUNK_ROWS = 20000
+# AS.db_row columns
+TSV_COLS = SLOTS + ("stubs", "stub", "multihomed", "transit")
+# Columns of ASNs
+TSV_REL_COLS = ("peers", "customers", "providers", "stubs")
+# AS attributes that change the TSV if they're overridden
+_TSV_ATTRS = ("db_row", "stubs", "stub", "multihomed", "transit",
+              "rov_filtering", "rov_confidence", "rov_source")
+
+# {col: formatted column} or {rel col: (indptr, ASN strs sorted per row)}
+TSV_DATA_TYPE = Dict[str, Union[List[str], Tuple[List[int], List[str]]]]
+
+# Set in each worker process, see _init_tsv_worker
+_worker_data: Optional[TSV_DATA_TYPE] = None
+
+
+def _write_tsv(self,
+               dag: BGPDAG,
+               tsv_path: Path,
+               jobs: Optional[int] = None):
+    """Writes BGP DAG info to a TSV
+
+    jobs defaults to self.tsv_jobs. Over 1 formats across processes
+    """
+
+    logging.info("Made graph. Now writing to TSV")
+    jobs = self.tsv_jobs if jobs is None else jobs
+    as_clses = set(type(x) for x in dag.ases)
+    if not dag.ases or any(getattr(cls, attr) is not getattr(AS, attr)
+                           for cls in as_clses for attr in _TSV_ATTRS):
+        self._write_tsv_rows(dag, tsv_path)
+        return
+
+    data: TSV_DATA_TYPE = _get_tsv_data(dag)
+    ranges: List[Tuple[int, int]] = [
+        (x, min(x + TSV_CHUNK_ROWS, len(dag.ases)))
+        for x in range(0, len(dag.ases), TSV_CHUNK_ROWS)]
+    # Opened the same way as the row by row path, for the same newlines
+    with tsv_path.open(mode="w") as f:
+        writer(f, delimiter="\t").writerow(TSV_COLS)
+        if jobs > 1 and len(ranges) > 1:
+            with ProcessPoolExecutor(max_workers=jobs,
+                                     initializer=_init_tsv_worker,
+                                     initargs=(data,)) as executor:
+                for chunk in executor.map(_format_tsv_worker_chunk,
+                                          *zip(*ranges)):
+                    f.write(chunk)
+        else:
+            for start, end in ranges:
+                f.write(_format_tsv_chunk(data, start, end))
+    logging.debug("Wrote TSV")
+
+
+def _write_tsv_rows(self, dag: BGPDAG, tsv_path: Path):
+    """Writes the TSV with a DictWriter, one db_row at a time"""
+
+    with tsv_path.open(mode="w") as f:
+        # Get columns
+        cols: List[str] = list(next(iter(dag.as_dict.values())
+                                    ).db_row.keys())
+        dict_writer = DictWriter(f, fieldnames=cols, delimiter="\t")
+        dict_writer.writeheader()
+        for x in dag.as_dict.values():
+            dict_writer.writerow(x.db_row)
+
+
+def _get_tsv_data(dag: BGPDAG) -> TSV_DATA_TYPE:
+    """Formats every scalar column, and sorts every neighbor column"""
+
+    ases = dag.ases
+    flags: List[int] = dag.as_flags.tolist()
+    bools = ("False", "True")
+
+    def optional_ints(values: List[Optional[int]]) -> List[str]:
+        return ["" if x is None else str(x) for x in values]
+
+    def attr_strs(name: str) -> List[str]:
+        # Columns store the default as their dtype, i.e. -1.0 for -1
+        default: Any = dag.attrs.default(name)
+        return [str(default) if x == default else str(x)
+                for x in dag.attrs.tolist(name)]
+
+    data: TSV_DATA_TYPE = {
+        "asn": [str(x.asn) for x in ases],
+        "input_clique": [bools[x.input_clique] for x in ases],
+        "ixp": [bools[x.ixp] for x in ases],
+        "customer_cone_size": optional_ints([x.customer_cone_size
+                                             for x in ases]),
+        "propagation_rank": optional_ints([x.propagation_rank
+                                           for x in ases]),
+        "rov_filtering": attr_strs("rov_filtering"),
+        "rov_confidence": attr_strs("rov_confidence"),
+        "rov_source": attr_strs("rov_source"),
+        "stub": [bools[bool(x & STUB_FLAG)] for x in flags],
+        "multihomed": [bools[bool(x & MULTIHOMED_FLAG)] for x in flags],
+        "transit": [bools[bool(x & TRANSIT_FLAG)] for x in flags]}
+
+    # ASN strs of each index as an object array, and each index's position
+    # in ASN order, so that rows are sorted and formatted without loops
+    asn_strs: np.ndarray = np.array(data["asn"], dtype=object)
+    asn_order: np.ndarray = np.argsort(dag.idx_to_asn, kind="stable")
+    asn_ranks: np.ndarray = np.empty(len(ases), dtype=np.int64)
+    asn_ranks[asn_order] = np.arange(len(ases))
+
+    def sort_rows(indptr: np.ndarray,
+                  indices: np.ndarray) -> Tuple[List[int], List[str]]:
+        """Returns (indptr, ASN strs) with the ASNs of each row sorted"""
+
+        rows: np.ndarray = np.repeat(np.arange(len(ases), dtype=np.int64),
+                                     np.diff(indptr))
+        keys: np.ndarray = (rows << 32) | asn_ranks[indices]
+        keys.sort()
+        return (indptr.tolist(),
+                asn_strs[asn_order[keys & 0xFFFFFFFF]].tolist())
+
+    for rel in ("peers", "customers", "providers"):
+        data[rel] = sort_rows(*dag.csr(rel))
+    # Stubs are the customers that are stubs
+    indptr, indices = dag.csr("customers")
+    is_stub: np.ndarray = (dag.as_flags[indices] & STUB_FLAG) != 0
+    rows: np.ndarray = np.repeat(np.arange(len(ases)), np.diff(indptr))
+    stub_indptr: np.ndarray = np.zeros(len(ases) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows[is_stub], minlength=len(ases)),
+              out=stub_indptr[1:])
+    data["stubs"] = sort_rows(stub_indptr, indices[is_stub])
+    return data
+
+
+def _format_tsv_chunk(data: TSV_DATA_TYPE, start: int, end: int) -> str:
+    """Returns rows start to end as TSV text"""
+
+    cols: List[Any] = []
+    for col in TSV_COLS:
+        if col in TSV_REL_COLS:
+            indptr: List[int]
+            asn_strs: List[str]
+            indptr, asn_strs = data[col]  # type: ignore
+            cols.append(["{" + ",".join(asn_strs[indptr[i]:indptr[i + 1]])
+                         + "}" for i in range(start, end)])
+        else:
+            cols.append(data[col][start:end])  # type: ignore
+    buf = StringIO()
+    writer(buf, delimiter="\t").writerows(zip(*cols))
+    return buf.getvalue()
+
+
+def _init_tsv_worker(data: TSV_DATA_TYPE):
+    """Keeps the data in the worker, so it's only sent once"""
+
+    global _worker_data
+    _worker_data = data
+
+
+def _format_tsv_worker_chunk(start: int, end: int) -> str:
+    """Formats a chunk in a worker process"""
+
+    assert _worker_data is not None
+    return _format_tsv_chunk(_worker_data, start, end)
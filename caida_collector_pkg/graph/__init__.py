@@ -1,4 +1,5 @@
 from .base_as import AS
 from .bgp_dag import BGPDAG  # type: ignore
+from .bgp_dag_view import BGPDAGView
 
-__all__ = ["AS", "BGPDAG"]
+__all__ = ["AS", "BGPDAG", "BGPDAGView"]
@@ -0,0 +1,59 @@
+"""Functions to keep per AS attrs as columns of the graph's AttrTable
+
+Attrs in AS.attr_columns (ROV info, and whatever subclasses add) are
+NumPy columns of dag.attrs rather than attributes of each AS, so they
+can be updated and reduced in bulk, i.e. ROV filtering ASes per rank:
+
+    ranks = dag.to_columnar().ases["propagation_rank"]
+    np.bincount(ranks[dag.attrs["rov_filtering"] != ""])
+
+Each AS's properties read and write its row of the columns
+"""
+
+from typing import Dict, List, Set, Tuple
+
+import numpy as np
+
+from .attr_table import AttrTable
+from .base_as import AS
+
+
+def _attach_attrs(self):
+    """Builds self.attrs from the ASes' values, and points them to it
+
+    Called whenever self.ases changes. Values of ASes that were already
+    in a table are copied over by column
+    """
+
+    attrs = AttrTable(len(self.ases))
+    for as_cls in [AS] + sorted(set(type(x) for x in self.ases),
+                                key=lambda x: x.__name__):
+        for attr, (dtype, default) in as_cls.attr_columns.items():
+            if attr not in attrs:
+                attrs.add(attr, dtype, default)
+
+    # {id of old table: (old table, new indexes, old indexes)}
+    old_tables: Dict[int, Tuple[AttrTable, List[int], List[int]]] = dict()
+    for idx, as_obj in enumerate(self.ases):
+        if as_obj._attrs is not None:
+            old_table: AttrTable = as_obj._attrs
+            _, new_idxs, old_idxs = old_tables.setdefault(
+                id(old_table), (old_table, [], []))
+            new_idxs.append(idx)
+            old_idxs.append(as_obj._idx)
+        elif as_obj._attr_values is not None:
+            for attr, value in as_obj._attr_values.items():
+                if attr in attrs:
+                    attrs.set_value(attr, idx, value)
+    for old_table, new_idxs, old_idxs in old_tables.values():
+        new_idx_arr: np.ndarray = np.array(new_idxs, dtype=np.int64)
+        old_idx_arr: np.ndarray = np.array(old_idxs, dtype=np.int64)
+        shared: Set[str] = set(attrs).intersection(old_table)
+        for attr in shared:
+            attrs[attr][new_idx_arr] = old_table[attr][old_idx_arr]
+
+    for idx, as_obj in enumerate(self.ases):
+        as_obj._attrs = attrs
+        as_obj._idx = idx
+        as_obj._attr_values = None
+    self.attrs = attrs
@@ -0,0 +1,78 @@
+from typing import Any, Dict, Iterator, List, Tuple
+
+import numpy as np
+
+
+class AttrTable:
+    """Per AS attributes of a graph, as a column per attribute
+
+    Columns are NumPy arrays in dense index order (see csr_funcs), so
+    attrs["rov_confidence"][idxs] = values updates many ASes at once.
+    The AS properties of these attributes read and write the columns.
+
+    Columns hold the default as their dtype, i.e. rov_confidence's -1 is
+    -1.0, so reductions over them work as is. Writers format values equal
+    to the default as the default (see tsv_funcs)
+    """
+
+    __slots__ = ("_len", "_columns", "_defaults")
+
+    def __init__(self, length: int):
+        self._len: int = length
+        self._columns: Dict[str, np.ndarray] = dict()
+        self._defaults: Dict[str, Any] = dict()
+
+    def add(self, name: str, dtype: Any, default: Any):
+        """Adds a column with every AS set to the default"""
+
+        if name in self._columns:
+            raise Exception(f"{name} is already a column")
+        self._columns[name] = np.empty(self._len, dtype=dtype)
+        self._defaults[name] = default
+        self.reset(name)
+
+    def reset(self, name: str):
+        """Sets every AS back to the default"""
+
+        self._columns[name][:] = self._defaults[name]
+
+    def default(self, name: str) -> Any:
+        """Returns the default of a column, as it was added"""
+
+        return self._defaults[name]
+
+    def get_value(self, name: str, idx: int) -> Any:
+        """Returns the value of the AS at idx"""
+
+        return self._columns[name].item(idx)
+
+    def set_value(self, name: str, idx: int, value: Any):
+        """Sets the value of the AS at idx"""
+
+        self._columns[name][idx] = value
+
+    def tolist(self, name: str) -> List[Any]:
+        """Returns the value of every AS, as AS properties would"""
+
+        values: List[Any] = self._columns[name].tolist()
+        return values
+
+    def items(self) -> Iterator[Tuple[str, np.ndarray]]:
+        return iter(self._columns.items())
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self._columns[name]
+
+    def __setitem__(self, name: str, values: Any):
+        """Overwrites every value of a column, keeping its dtype"""
+
+        self._columns[name][:] = values
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._columns
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._columns)
+
+    def __len__(self) -> int:
+        return len(self._columns)
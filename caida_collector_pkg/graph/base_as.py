@@ -1,26 +1,56 @@
-from typing import Any, Dict, List, Optional, Set
+from typing import Any, Dict, List, Optional
 from typing import Tuple, Type, TYPE_CHECKING, Union
 
-from yamlable import yaml_info, YamlAble, yaml_info_decorate
+import numpy as np
+import yaml
+from yamlable import YamlAble, YAMLABLE_PREFIX, yaml_info_decorate
+
+from .attr_table import AttrTable
 
 if TYPE_CHECKING:
     from .base_as import AS as ASTypeHint
 else:
     ASTypeHint = "AS"
 
-SETUP_REL = Optional[Set[ASTypeHint]]
 REL = Tuple[ASTypeHint, ...]
 
 SLOTS = ("asn", "peers", "customers", "providers", "input_clique",
          "ixp", "customer_cone_size", "propagation_rank",
          "rov_filtering", "rov_confidence", "rov_source")
 
+# Classifications the graph caches on each AS, see classification_funcs
+CLASSIFICATION_SLOTS = ("_flags", "_neighbors", "_stubs")
+
+# {attr: (dtype, default)} of attrs that a graph keeps in its AttrTable
+ATTR_COLUMNS: Dict[str, Tuple[Any, Any]] = {
+    "rov_filtering": (object, ""),
+    "rov_confidence": (np.float64, -1),
+    "rov_source": (object, "")}
+# Where an AS finds its attrs, see attr_funcs
+ATTR_SLOTS = ("_attrs", "_idx", "_attr_values")
+
+# Bits of AS._flags
+STUB_FLAG = 1
+MULTIHOMED_FLAG = 2
+TRANSIT_FLAG = 4
+INPUT_CLIQUE_FLAG = 8
+
 
-@yaml_info(yaml_tag='AS')
-class AS(YamlAble):
-    """Autonomous System class. Contains attributes of an AS"""
+class AS:
+    """Autonomous System class. Contains attributes of an AS
+
+    Slotted, since there are ~75k+ per graph. YamlAble has no __slots__,
+    so AS is registered as a virtual YamlAble subclass instead of
+    inheriting from it (see the yaml funcs at the bottom)
+    """
+
+    __slots__ = (tuple([x for x in SLOTS if x not in ATTR_COLUMNS])
+                 + CLASSIFICATION_SLOTS + ATTR_SLOTS)
 
     base_slots = SLOTS
+    # Subclasses add attrs to this to keep them as columns. They get
+    # properties for them, so they mustn't be in the subclass's slots
+    attr_columns: Dict[str, Tuple[Any, Any]] = ATTR_COLUMNS
     subclass_to_name_dict: Dict[Type[ASTypeHint], str] = {}
     name_to_subclass_dict: Dict[str, Type[ASTypeHint]] = {}
 
@@ -30,17 +60,17 @@ class AS(YamlAble):
         """
 
         super().__init_subclass__(*args, **kwargs)
-        yaml_info_decorate(cls, yaml_tag=cls.__name__)
+        yaml_info_decorate(cls, yaml_tag=cls.__name__)  # type: ignore
         cls.subclass_to_name_dict[cls] = cls.__name__
         cls.name_to_subclass_dict[cls.__name__] = cls
+        for attr in cls.attr_columns:
+            if not hasattr(cls, attr):
+                setattr(cls, attr, _attr_property(attr))
 
     def __init__(self,
                  asn: Optional[int] = None,
                  input_clique: bool = False,
                  ixp: bool = False,
-                 peers_setup_set: SETUP_REL = None,
-                 providers_setup_set: SETUP_REL = None,
-                 customers_setup_set: SETUP_REL = None,
                  peers: REL = tuple(),
                  providers: REL = tuple(),
                  customers: REL = tuple(),
@@ -52,13 +82,7 @@ class AS(YamlAble):
         else:
             raise Exception("ASN must be int")
 
-        # While setting up, use sets for speed
-        self.peers_setup_set: SETUP_REL = peers_setup_set
-        self.customers_setup_set: SETUP_REL = customers_setup_set
-        self.providers_setup_set: SETUP_REL = providers_setup_set
-
-        # Afterwards convert to tuples
-        # Copy over to a new attr due to mypy and readability
+        # While setting up, the graph builds these from sets for speed
         self.peers: REL = peers
         self.providers: REL = providers
         self.customers: REL = customers
@@ -70,9 +94,18 @@ class AS(YamlAble):
         # Propagation rank. Rank leaves to clique
         self.propagation_rank: Optional[int] = propagation_rank
 
-        self.rov_filtering: str = ""
-        self.rov_confidence: float = -1
-        self.rov_source: str = ""
+        # ROV info and other attr_columns. Defaults until they're set.
+        # Kept in _attr_values until the AS is in a graph, then in the
+        # graph's AttrTable at _idx
+        self._attrs: Optional[AttrTable] = None
+        self._idx: int = -1
+        self._attr_values: Optional[Dict[str, Any]] = None
+
+        # Set by the graph once relationships are final. Until then
+        # (i.e. for ASes outside of a graph) properties are computed
+        self._flags: Optional[int] = None
+        self._neighbors: Optional[Tuple[ASTypeHint, ...]] = None
+        self._stubs: Optional[Tuple[ASTypeHint, ...]] = None
 
     def __lt__(self, as_obj: Any) -> bool:
         if isinstance(as_obj, AS):
@@ -99,8 +132,17 @@ class AS(YamlAble):
             else:
                 raise Exception(f"improper format type: {type(x)} {x}")
 
+        def _get(attr: str) -> Any:
+            value: Any = getattr(self, attr)
+            # Columns store the default as their dtype, i.e. -1.0 for -1
+            if attr in self.attr_columns:
+                default: Any = self.attr_columns[attr][1]
+                if value == default:
+                    return default
+            return value
+
         attrs = SLOTS + ("stubs", "stub", "multihomed", "transit")
-        return {attr: _format(getattr(self, attr)) for attr in attrs}
+        return {attr: _format(_get(attr)) for attr in attrs}
 
     def __str__(self):
         return "\n".join(str(x) for x in self.db_row.items())
@@ -109,32 +151,96 @@ class AS(YamlAble):
     def stub(self) -> bool:
         """Returns True if AS is a stub by RFC1772"""
 
-        return len(self.neighbors) == 1
+        if self._flags is None:
+            return len(self.neighbors) == 1
+        return bool(self._flags & STUB_FLAG)
 
     @property
     def multihomed(self) -> bool:
         """Returns True if AS is multihomed by RFC1772"""
 
-        return (len(self.customers) == 0
-                and len(self.peers) + len(self.providers) > 1)
+        if self._flags is None:
+            return (len(self.customers) == 0
+                    and len(self.peers) + len(self.providers) > 1)
+        return bool(self._flags & MULTIHOMED_FLAG)
 
     @property
     def transit(self) -> bool:
         """Returns True if AS is a transit AS by RFC1772"""
 
-        return len(self.customers) > 1
+        if self._flags is None:
+            return len(self.customers) > 1
+        return bool(self._flags & TRANSIT_FLAG)
 
     @property
     def stubs(self) -> Tuple[ASTypeHint, ...]:
         """Returns a list of any stubs connected to that AS"""
 
-        return tuple([x for x in self.customers if x.stub])
+        if self._stubs is None:
+            return tuple([x for x in self.customers if x.stub])
+        return self._stubs
 
     @property
     def neighbors(self) -> Tuple[ASTypeHint, ...]:
         """Returns customers + peers + providers"""
 
-        return self.customers + self.peers + self.providers
+        if self._neighbors is None:
+            return self.customers + self.peers + self.providers
+        return self._neighbors
+
+    @property
+    def rov_filtering(self) -> str:
+        rov_filtering: str = self._get_attr("rov_filtering")
+        return rov_filtering
+
+    @rov_filtering.setter
+    def rov_filtering(self, value: str):
+        self._set_attr("rov_filtering", value)
+
+    @property
+    def rov_confidence(self) -> float:
+        rov_confidence: float = self._get_attr("rov_confidence")
+        return rov_confidence
+
+    @rov_confidence.setter
+    def rov_confidence(self, value: float):
+        self._set_attr("rov_confidence", value)
+
+    @property
+    def rov_source(self) -> str:
+        rov_source: str = self._get_attr("rov_source")
+        return rov_source
+
+    @rov_source.setter
+    def rov_source(self, value: str):
+        self._set_attr("rov_source", value)
+
+    def _get_attr(self, attr: str) -> Any:
+        """Returns an attr_columns attr"""
+
+        if self._attrs is not None and attr in self._attrs:
+            return self._attrs.get_value(attr, self._idx)
+        elif self._attr_values is not None and attr in self._attr_values:
+            return self._attr_values[attr]
+        else:
+            return self.attr_columns[attr][1]
+
+    def _set_attr(self, attr: str, value: Any):
+        """Sets an attr_columns attr"""
+
+        if self._attrs is not None and attr in self._attrs:
+            self._attrs.set_value(attr, self._idx, value)
+        else:
+            if self._attr_values is None:
+                self._attr_values = dict()
+            self._attr_values[attr] = value
+
+    def _clear_classification(self):
+        """Drops the cached flags, i.e. after relationships change"""
+
+        self._flags = None
+        self._neighbors = None
+        self._stubs = None
 
 ##############
 # Yaml funcs #
@@ -143,9 +249,9 @@ class AS(YamlAble):
     def __to_yaml_dict__(self) -> Dict[str, Any]:
         """ This optional method is called when you call yaml.dump()"""
         return {"asn": self.asn,
-                "customers": tuple([x.asn for x in self.customers]),
-                "peers": tuple([x.asn for x in self.peers]),
-                "providers": tuple([x.asn for x in self.providers]),
+                "customers": [x.asn for x in self.customers],
+                "peers": [x.asn for x in self.peers],
+                "providers": [x.asn for x in self.providers],
                 "input_clique": self.input_clique,
                 "ixp": self.ixp,
                 "customer_cone_size": self.customer_cone_size,
@@ -154,7 +260,83 @@ class AS(YamlAble):
     @classmethod
     def __from_yaml_dict__(cls, dct: Dict[Any, Any], yaml_tag: str):
         """ This optional method is called when you call yaml.load()"""
-        return cls(**dct)
+        # Relationships are ASNs until a graph converts them to refs
+        kwargs: Dict[str, Any] = {k: tuple(v) if isinstance(v, list) else v
+                                  for k, v in dct.items()}
+        return cls(**kwargs)
+
+    # YamlAble's methods, since AS can't inherit them (see the class)
+    def dump_yaml(self, file_path_or_stream, safe: bool = True, **kwargs):
+        """Dumps this AS to a yaml file or stream"""
+
+        YamlAble.dump_yaml(self,  # type: ignore
+                           file_path_or_stream,
+                           safe,
+                           **kwargs)
+
+    def dumps_yaml(self, safe: bool = True, **kwargs) -> str:
+        """Dumps this AS to a yaml string"""
+
+        dumped: str = YamlAble.dumps_yaml(self, safe, **kwargs)  # type: ignore
+        return dumped
+
+    @classmethod
+    def load_yaml(cls, file_path_or_stream, safe: bool = True) -> Any:
+        """Loads an AS of this class from a yaml file or stream"""
+
+        return YamlAble.load_yaml.__func__(  # type: ignore
+            cls, file_path_or_stream, safe)
+
+    @classmethod
+    def loads_yaml(cls, yaml_str: str, safe: bool = True) -> Any:
+        """Loads an AS of this class from a yaml string"""
+
+        return YamlAble.loads_yaml.__func__(  # type: ignore
+            cls, yaml_str, safe)
+
+
+def _attr_property(attr: str) -> property:
+    """Returns a property for an attr that subclasses add to attr_columns"""
+
+    def fget(self: AS) -> Any:
+        return self._get_attr(attr)
+
+    def fset(self: AS, value: Any):
+        self._set_attr(attr, value)
+
+    return property(fget, fset)
+
+
+def _represent_as(dumper: yaml.Dumper, as_obj: AS) -> yaml.MappingNode:
+    """Writes an AS with the same tag that a YamlAble would get"""
+
+    return dumper.represent_mapping(
+        YAMLABLE_PREFIX + as_obj.__yaml_tag_suffix__,  # type: ignore
+        as_obj.__to_yaml_dict__())
+
+
+# AS can't inherit from YamlAble without getting a __dict__, so:
+# Virtually inherit, so that yaml_info works and isinstance is True
+YamlAble.register(AS)
+yaml_info_decorate(AS, yaml_tag="AS")  # type: ignore
+# PyYAML finds representers by the real MRO, so register AS directly
+for _dumper in (yaml.Dumper, yaml.SafeDumper):
+    yaml.add_multi_representer(AS, _represent_as, Dumper=_dumper)
+
+
+class _ASYamlDecoder(YamlAble):
+    """Decodes AS tags, since yamlable only decodes real subclasses"""
+
+    __yaml_tag_suffix__ = "_ASYamlDecoder"  # type: ignore
+
+    @classmethod
+    def is_yaml_tag_supported(cls, yaml_tag: str) -> bool:
+        return yaml_tag == "AS" or yaml_tag in AS.name_to_subclass_dict
+
+    @classmethod
+    def __from_yaml_dict__(cls, dct: Dict[Any, Any], yaml_tag: str):
+        as_cls: Type[AS] = AS.name_to_subclass_dict.get(yaml_tag, AS)
+        return as_cls.__from_yaml_dict__(dct, yaml_tag)
 
 
 # Needed for mypy type hinting
@@ -1,12 +1,16 @@
+from collections import OrderedDict
 import logging
 from pathlib import Path
-from typing import Any, Dict, Optional, Set, Tuple, Type
+from typing import Any, Dict, FrozenSet, Iterable, Optional, Set, Tuple
+from typing import Type, Union
 
+import numpy as np
 from yamlable import yaml_info, YamlAble, yaml_info_decorate
 
 from .base_as import AS
 
 from ..links import CustomerProviderLink as CPLink
+from ..links import LinkSet
 from ..links import PeerLink
 
 
@@ -16,16 +20,73 @@ from ..links import PeerLink
 from .graph_building_funcs import _gen_graph
 from .graph_building_funcs import _add_relationships
 from .graph_building_funcs import _make_relationships_tuples
-from .graph_building_funcs import _add_extra_csv_info
 
 # propagation rank building funcs
 from .propagation_rank_funcs import _assign_propagation_ranks
-from .propagation_rank_funcs import _assign_ranks_helper
+from .propagation_rank_funcs import _update_propagation_ranks
+from .propagation_rank_funcs import _rank_asns
+from .propagation_rank_funcs import _get_cycle_asns
 from .propagation_rank_funcs import _get_propagation_ranks
 
+# Attr funcs
+from .attr_funcs import _attach_attrs
+
+# Classification funcs
+from .classification_funcs import _classify_ases
+from .classification_funcs import _reclassify_ases
+
 # Customer cone funcs
 from .customer_cone_funcs import _get_customer_cone_size
-from .customer_cone_funcs import _get_cone_size_helper
+from .customer_cone_funcs import _get_customer_closure
+from .customer_cone_funcs import _get_customer_sccs
+
+# Cone query funcs
+from .cone_query_funcs import customer_cone
+from .cone_query_funcs import in_cone
+from .cone_query_funcs import customer_cones
+from .cone_query_funcs import _get_customer_cone
+from .cone_query_funcs import _get_cached_cone
+from .cone_query_funcs import _cache_cone
+from .cone_query_funcs import clear_cone_cache
+
+# CSR funcs
+from .csr_funcs import idx_to_asn
+from .csr_funcs import asn_to_idx
+from .csr_funcs import csr
+from .csr_funcs import _set_csr
+from .csr_funcs import customers_csr
+from .csr_funcs import providers_csr
+from .csr_funcs import peers_csr
+from .csr_funcs import _clear_csr
+
+# Diff funcs
+from .diff_funcs import apply_diff
+from .diff_funcs import _update_ixps_and_input_clique
+from .diff_funcs import _get_provider_closure
+
+# Snapshot funcs
+from .snapshot_funcs import to_snapshot
+from .snapshot_funcs import from_snapshot
+
+# Columnar funcs
+from .columnar_funcs import to_columnar
+from .columnar_funcs import read_columnar
+
+# Shared funcs
+from .shared_funcs import to_shared
+
+# Subgraph funcs
+from .subgraph_funcs import subgraph
+from .subgraph_funcs import cone_subgraph
+from .subgraph_funcs import khop
+
+# Collapse funcs
+from .collapse_funcs import collapse_stubs
+
+# ROV funcs
+from .rov_funcs import _add_extra_csv_info
+from .rov_funcs import reannotate
+from .rov_funcs import _join_rov_table
 
 
 @yaml_info(yaml_tag="BGPDAG")
@@ -36,22 +97,82 @@ class BGPDAG(YamlAble):
     # And also because it allows others to easily see the instance attrs
     __slots__ = ("as_dict", "propagation_ranks", "ases",
                  "stub_asns", "mh_asns", "input_clique_asns", "etc_asns",
-                 "stub_ases", "mh_ases", "input_clique_ases", "etc_ases")
+                 "stub_ases", "mh_ases", "input_clique_ases", "etc_ases",
+                 "as_flags", "attrs",
+                 "cone_cache_size", "_cone_cache", "_cone_cache_total",
+                 "_csr", "_asn_to_idx", "_idx_to_asn")
 
     # Graph building functionality
     _gen_graph = _gen_graph
     _add_relationships = _add_relationships
     _make_relationships_tuples = _make_relationships_tuples
-    _add_extra_csv_info = _add_extra_csv_info
 
     # propagation rank building funcs
     _assign_propagation_ranks = _assign_propagation_ranks
-    _assign_ranks_helper = _assign_ranks_helper
+    _update_propagation_ranks = _update_propagation_ranks
+    _rank_asns = _rank_asns
+    _get_cycle_asns = _get_cycle_asns
     _get_propagation_ranks = _get_propagation_ranks
 
+    # Attr funcs
+    _attach_attrs = _attach_attrs
+
+    # Classification funcs
+    _classify_ases = _classify_ases
+    _reclassify_ases = _reclassify_ases
+
     # Customer cone funcs
     _get_customer_cone_size = _get_customer_cone_size
-    _get_cone_size_helper = _get_cone_size_helper
+    _get_customer_closure = _get_customer_closure
+    _get_customer_sccs = _get_customer_sccs
+
+    # Cone query funcs
+    customer_cone = customer_cone
+    in_cone = in_cone
+    customer_cones = customer_cones
+    _get_customer_cone = _get_customer_cone
+    _get_cached_cone = _get_cached_cone
+    _cache_cone = _cache_cone
+    clear_cone_cache = clear_cone_cache
+
+    # CSR funcs
+    idx_to_asn = idx_to_asn
+    asn_to_idx = asn_to_idx
+    csr = csr
+    _set_csr = _set_csr
+    customers_csr = customers_csr
+    providers_csr = providers_csr
+    peers_csr = peers_csr
+    _clear_csr = _clear_csr
+
+    # Diff funcs
+    apply_diff = apply_diff
+    _update_ixps_and_input_clique = _update_ixps_and_input_clique
+    _get_provider_closure = _get_provider_closure
+
+    # Snapshot funcs
+    to_snapshot = to_snapshot
+    from_snapshot = from_snapshot
+
+    # Columnar funcs
+    to_columnar = to_columnar
+    read_columnar = read_columnar
+
+    # Shared funcs
+    to_shared = to_shared
+
+    # Subgraph funcs
+    subgraph = subgraph
+    cone_subgraph = cone_subgraph
+    khop = khop
+
+    # Collapse funcs
+    collapse_stubs = collapse_stubs
+
+    # ROV funcs
+    _add_extra_csv_info = _add_extra_csv_info
+    reannotate = reannotate
+    _join_rov_table = _join_rov_table
 
     def __init_subclass__(cls, *args, **kwargs):
         """This method essentially creates a list of all subclasses
@@ -63,52 +184,78 @@ class BGPDAG(YamlAble):
         yaml_info_decorate(cls, yaml_tag=cls.__name__)
 
     def __init__(self,
-                 cp_links: Set[CPLink],
-                 peer_links: Set[PeerLink],
+                 cp_links: Union[LinkSet, Iterable[CPLink]],
+                 peer_links: Union[LinkSet, Iterable[PeerLink]],
                  ixps: Optional[Set[int]] = None,
                  input_clique: Optional[Set[int]] = None,
                  BaseASCls: Type[AS] = AS,
                  yaml_as_dict: Optional[Dict[int, AS]] = None,
                  csv_path: Path = (Path(__file__).parent.parent
                                    / "combined.csv"),
+                 cone_cache_size: int = 1000000,
                  ):
-        """Reads in relationship data from a TSV and generate graph"""
+        """Reads in relationship data from a TSV and generate graph
+
+        cp_links and peer_links can be LinkSets or sets of link objects
+        cone_cache_size is the most ASNs that cached customer cones hold
+        """
+
+        # LRU of {asn: customer cone}, see cone_query_funcs
+        self.cone_cache_size: int = cone_cache_size
+        self._cone_cache: "OrderedDict[int, FrozenSet[int]]" = OrderedDict()
+        self._cone_cache_total: int = 0
+        # Lazily built CSR arrays, see csr_funcs
+        self._csr: Dict[str, Tuple[np.ndarray, np.ndarray]] = dict()
+        self._asn_to_idx: Optional[Dict[int, int]] = None
+        self._idx_to_asn: Optional[np.ndarray] = None
 
         if yaml_as_dict is not None:
             self.as_dict: Dict[int, AS] = yaml_as_dict
-            # Convert ASNs to refs
+            # Convert ASNs to refs (they're ASNs until now)
             for as_obj in self.as_dict.values():
-                as_obj.peers = tuple([self.as_dict[asn]
+                as_obj.peers = tuple([self.as_dict[asn]  # type: ignore
                                       for asn in as_obj.peers])
-                as_obj.customers = tuple([self.as_dict[asn]
+                as_obj.customers = tuple([self.as_dict[asn]  # type: ignore
                                           for asn in as_obj.customers])
-                as_obj.providers = tuple([self.as_dict[asn]
+                as_obj.providers = tuple([self.as_dict[asn]  # type: ignore
                                           for asn in as_obj.providers])
 
             # Used for iteration
             self.ases: Tuple[AS, ...] = tuple(self.as_dict.values())
+            # ROV info, etc columns
+            self._attach_attrs()
+            # Stub, multihomed, etc flags and sets
+            self._classify_ases()
             self.propagation_ranks: Tuple[Tuple[AS, ...], ...] =\
                 self._get_propagation_ranks()
 
         else:
             self.as_dict: Dict[int, AS] = dict()  # type: ignore
+            # Store links compactly. LinkSets are used directly
+            cp_link_set: LinkSet = LinkSet.from_links(cp_links, CPLink)
+            peer_link_set: LinkSet = LinkSet.from_links(peer_links, PeerLink)
             logging.debug("gen graph")
             # Just adds all ASes to the dict, and adds ixp/input_clique info
-            self._gen_graph(cp_links,
-                            peer_links,
+            self._gen_graph(cp_link_set,
+                            peer_link_set,
                             ixps if ixps else set(),
                             input_clique if input_clique else set(),
                             BaseASCls)
             logging.debug("gen graph done")
-            # Adds references to all relationships
-            self._add_relationships(cp_links, peer_links)
+            # Adds references to all relationships, as sets for now
+            setup_rels = self._add_relationships(cp_link_set, peer_link_set)
             # Used for iteration
             self.ases: Tuple[AS, ...] = tuple(  # type: ignore
                 self.as_dict.values())
+            # ROV info, etc columns
+            self._attach_attrs()
             logging.debug("add rels done")
             # Remove duplicates from relationships and sort
-            self._make_relationships_tuples()
+            self._make_relationships_tuples(setup_rels)
             logging.debug("typles done")
+            # Stub, multihomed, etc flags and sets
+            self._classify_ases()
+            logging.debug("classified ases")
             # Assign propagation rank to each AS
             self._assign_propagation_ranks()
             logging.debug("assigned prop ranks")
@@ -120,21 +267,6 @@ class BGPDAG(YamlAble):
             logging.debug("Customer cones complete")
             self._add_extra_csv_info(csv_path)
 
-        # Some helpful sets of asns
-        self.stub_ases = set([x for x in self if x.stub])
-        self.mh_ases = set([x for x in self if x.multihomed])
-        self.stub_or_mh_ases = set(self.stub_ases | self.mh_ases)
-        self.input_clique_ases = set([x for x in self if x.input_clique])
-        self.etc_ases = set([x for x in self if not
-                             (x.stub or x.multihomed or x.input_clique)])
-        # Backwards compatibility
-        self.stub_asns = set([x.asn for x in self if x.stub])
-        self.mh_asns = set([x.asn for x in self if x.multihomed])
-        self.stub_or_mh_asns = set(self.stub_asns | self.mh_asns)
-        self.input_clique_asns = set([x.asn for x in self if x.input_clique])
-        self.etc_asns = set([x.asn for x in self if not
-                             (x.stub or x.multihomed or x.input_clique)])
-
 ##############
 # Yaml funcs #
 ##############
@@ -0,0 +1,126 @@
+from pathlib import Path
+from typing import Any, Dict, Tuple, Union
+
+import numpy as np
+
+from .base_as import INPUT_CLIQUE_FLAG
+from .csr_funcs import CSR_TYPE
+from .shared_funcs import SHARED_AS_ARRAYS
+from .shared_funcs import SHARED_HEADER_LEN
+from .shared_funcs import SHARED_MAGIC
+from .shared_funcs import SHARED_RELS
+from .shared_funcs import SHARED_VERSION
+
+
+class BGPDAGView:
+    """Read only view of a graph written with BGPDAG.to_shared
+
+    Every array is a slice of one memory map of the file, so attaching
+    takes milliseconds and every process shares the same pages. There
+    are no AS objects: ASes are dense indices, as in the graph's CSR
+    arrays (see csr_funcs), and per AS values are arrays in index order.
+    Ranks and cone sizes are -1 for None.
+
+    Pickling only sends the path, so views can be passed to pool workers
+    """
+
+    __slots__ = ("path", "idx_to_asn", "propagation_rank",
+                 "customer_cone_size", "as_flags", "_asn_order", "_ixp",
+                 "_csr")
+
+    def __init__(self, path: Path):
+        """Memory maps the file"""
+
+        self.path: Path = path
+        arr: np.ndarray = np.load(str(path), mmap_mode="r")
+        if (arr.ndim != 1
+                or arr.dtype != np.int64
+                or len(arr) < SHARED_HEADER_LEN
+                or int(arr[0]) != SHARED_MAGIC
+                or int(arr[1]) != SHARED_VERSION):
+            raise Exception(f"{path} isn't a graph from this version of "
+                            "BGPDAG.to_shared")
+        num_ases: int = int(arr[2])
+        lens = ([SHARED_HEADER_LEN] + [num_ases] * len(SHARED_AS_ARRAYS))
+        for num_indices in arr[3:SHARED_HEADER_LEN].tolist():
+            lens += [num_ases + 1, num_indices]
+        if len(arr) != sum(lens):
+            raise Exception(f"{path} is truncated")
+
+        # Slices are views into the single mmap
+        bounds: np.ndarray = np.cumsum(lens)
+        slices = [arr[start:end] for start, end in zip(bounds[:-1],
+                                                       bounds[1:])]
+        (self.idx_to_asn,
+         self._asn_order,
+         self.propagation_rank,
+         self.customer_cone_size,
+         self.as_flags,
+         self._ixp) = slices[:len(SHARED_AS_ARRAYS)]
+        csr_slices = slices[len(SHARED_AS_ARRAYS):]
+        self._csr: Dict[str, CSR_TYPE] = {
+            rel: (csr_slices[2 * i], csr_slices[2 * i + 1])
+            for i, rel in enumerate(SHARED_RELS)}
+
+    def __reduce__(self) -> Tuple[Any, Tuple[Path]]:
+        """Workers reattach to the file rather than copying arrays"""
+
+        return (self.__class__, (self.path,))
+
+    def __len__(self) -> int:
+        return len(self.idx_to_asn)
+
+    def indices(self, asns: Union[int, Any]) -> Union[int, np.ndarray]:
+        """Returns the dense index of an ASN, or an array of ASNs"""
+
+        asns_arr: np.ndarray = np.asarray(asns, dtype=np.int64)
+        positions: np.ndarray = np.minimum(
+            np.searchsorted(self.idx_to_asn, asns_arr, sorter=self._asn_order),
+            max(len(self) - 1, 0))
+        found: np.ndarray = self._asn_order[positions]
+        if len(self) == 0 or np.any(self.idx_to_asn[found] != asns_arr):
+            raise Exception(f"ASNs not in the graph: {asns}")
+        return int(found) if asns_arr.ndim == 0 else found
+
+    def csr(self, rel: str) -> CSR_TYPE:
+        """Returns (indptr, indices) of customers, providers or peers"""
+
+        if rel not in self._csr:
+            raise Exception(f"rel must be one of {SHARED_RELS}, not {rel}")
+        return self._csr[rel]
+
+    @property
+    def customers_csr(self) -> CSR_TYPE:
+        return self.csr("customers")
+
+    @property
+    def providers_csr(self) -> CSR_TYPE:
+        return self.csr("providers")
+
+    @property
+    def peers_csr(self) -> CSR_TYPE:
+        return self.csr("peers")
+
+    def neighbors(self, asn: int, rel: str) -> np.ndarray:
+        """Returns the ASNs of an AS's customers, providers or peers
+
+        In the same order as the AS's tuple in the graph
+        """
+
+        indptr, indices = self.csr(rel)
+        idx: int = self.indices(asn)  # type: ignore
+        return self.idx_to_asn[indices[indptr[idx]:indptr[idx + 1]]]
+
+    @property
+    def ixp(self) -> np.ndarray:
+        """Whether each AS is an IXP"""
+
+        ixp: np.ndarray = self._ixp != 0
+        return ixp
+
+    @property
+    def input_clique(self) -> np.ndarray:
+        """Whether each AS is in the input clique"""
+
+        input_clique: np.ndarray = (self.as_flags & INPUT_CLIQUE_FLAG) != 0
+        return input_clique
@@ -0,0 +1,128 @@
+"""Functions to classify every AS once relationships are final
+
+Each AS caches its neighbors, its stubs, and a bitmask of flags (see the
+*_FLAG bits in base_as) so that stub, multihomed, transit, stubs and
+neighbors are O(1). The graph keeps the flags of every AS as an array in
+dense index order (see csr_funcs), and the category sets
+(stub_ases, mh_ases, etc) are built in the same pass
+"""
+
+from typing import Dict, Iterable, List, Set, Tuple
+
+import numpy as np
+
+from .base_as import AS
+from .base_as import INPUT_CLIQUE_FLAG
+from .base_as import MULTIHOMED_FLAG
+from .base_as import STUB_FLAG
+from .base_as import TRANSIT_FLAG
+
+
+# The graph has {category}_ases and {category}_asns sets of each
+CATEGORIES = ("stub", "mh", "stub_or_mh", "input_clique", "etc")
+
+
+def _get_categories(flags: int) -> Tuple[str, ...]:
+    """Returns the categories of an AS with these flags"""
+
+    categories: Tuple[str, ...] = tuple()
+    if flags & STUB_FLAG:
+        categories = ("stub", "stub_or_mh")
+    elif flags & MULTIHOMED_FLAG:
+        categories = ("mh", "stub_or_mh")
+    if flags & INPUT_CLIQUE_FLAG:
+        categories += ("input_clique",)
+    elif not categories:
+        categories = ("etc",)
+    return categories
+
+
+# Categories of every combination of flags
+_FLAG_CATEGORIES: Dict[int, Tuple[str, ...]] = {
+    flags: _get_categories(flags) for flags in range(16)}
+
+
+def _set_flags(as_obj: AS) -> int:
+    """Caches the neighbors and flags of an AS, and returns the flags"""
+
+    as_obj._neighbors = as_obj.customers + as_obj.peers + as_obj.providers
+    flags: int = 0
+    if len(as_obj._neighbors) == 1:
+        flags |= STUB_FLAG
+    elif not as_obj.customers and len(as_obj._neighbors) > 1:
+        flags |= MULTIHOMED_FLAG
+    if len(as_obj.customers) > 1:
+        flags |= TRANSIT_FLAG
+    if as_obj.input_clique:
+        flags |= INPUT_CLIQUE_FLAG
+    as_obj._flags = flags
+    return flags
+
+
+def _set_stubs(as_obj: AS):
+    """Caches the stubs of an AS. Every customer must have flags"""
+
+    as_obj._stubs = tuple([x for x in as_obj.customers
+                           if x._flags & STUB_FLAG])  # type: ignore
+
+
+def _classify_ases(self):
+    """Sets the flags of every AS, and the graph's category sets
+
+    Call _reclassify_ases instead if relationships change
+    """
+
+    flags: List[int] = [0] * len(self.ases)
+    category_ases: Dict[str, Set[AS]] = {x: set() for x in CATEGORIES}
+
+    for i, as_obj in enumerate(self.ases):
+        flags[i] = _set_flags(as_obj)
+        for category in _FLAG_CATEGORIES[flags[i]]:
+            category_ases[category].add(as_obj)
+
+    # Stubs need the flags of every customer, so they're set afterwards
+    for as_obj in self.ases:
+        _set_stubs(as_obj)
+
+    self.as_flags = np.array(flags, dtype=np.uint8)
+    self.as_flags.setflags(write=False)
+    for category, ases in category_ases.items():
+        setattr(self, f"{category}_ases", ases)
+        # Backwards compatibility
+        setattr(self, f"{category}_asns", set([x.asn for x in ases]))
+
+
+def _reclassify_ases(self,
+                     as_objs: Iterable[AS],
+                     removed_ases: Iterable[AS] = tuple()):
+    """Reclassifies ASes whose relationships changed
+
+    Removed ASes are dropped from the category sets. self.ases must
+    already be updated
+    """
+
+    for as_obj in removed_ases:
+        _discard_categories(self, as_obj)
+
+    changed: Set[AS] = set(as_objs)
+    for as_obj in changed:
+        _discard_categories(self, as_obj)
+        for category in _FLAG_CATEGORIES[_set_flags(as_obj)]:
+            getattr(self, f"{category}_ases").add(as_obj)
+            getattr(self, f"{category}_asns").add(as_obj.asn)
+
+    # Stubs of providers change when their customers' flags do
+    for as_obj in changed.union(*[x.providers for x in changed]):
+        _set_stubs(as_obj)
+
+    self.as_flags = np.array([x._flags for x in self.ases], dtype=np.uint8)
+    self.as_flags.setflags(write=False)
+
+
+def _discard_categories(self, as_obj: AS):
+    """Removes a classified AS from the category sets"""
+
+    if as_obj._flags is not None:
+        for category in _FLAG_CATEGORIES[as_obj._flags]:
+            getattr(self, f"{category}_ases").discard(as_obj)
+            getattr(self, f"{category}_asns").discard(as_obj.asn)
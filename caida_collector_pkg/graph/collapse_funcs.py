@@ -0,0 +1,93 @@
+"""Functions to fold single homed stubs into their providers
+
+Most ASes are stubs, and a single homed stub (one neighbor, which is its
+provider) can only hear what its provider does. The reduced graph (see
+subgraph_funcs) drops them, and each remaining AS gets a weight of 1 plus
+the stubs folded into it, so propagation over propagation_ranks runs on a
+much smaller graph. Results are then expanded back to every ASN, with
+folded stubs taking their provider's value:
+
+    collapsed = dag.collapse_stubs(keep={attacker_asn, victim_asn})
+    values = simulate(collapsed.dag)  # {asn: value} of the reduced graph
+    values = collapsed.expand(values)  # {asn: value} of every AS
+
+IXPs, input clique ASes and ASes in keep are never folded
+"""
+
+from typing import Any, Dict, Iterable, List, NamedTuple, Set
+
+import numpy as np
+
+from .base_as import INPUT_CLIQUE_FLAG
+from .base_as import STUB_FLAG
+
+
+class CollapsedDAG(NamedTuple):
+    """A graph with its single homed stubs folded into their providers
+
+    weights is in the reduced graph's dense index order, and idx_map
+    maps each dense index of the original graph to the reduced one
+    """
+
+    dag: Any
+    weights: np.ndarray
+    asns: np.ndarray
+    idx_map: np.ndarray
+    folded: Dict[int, int]
+
+    def expand(self, values: Dict[int, Any]) -> Dict[int, Any]:
+        """Returns {asn: value} of every original ASN from the reduced's
+
+        ASNs whose reduced AS has no value are left out, as in values
+        """
+
+        reduced_asns: List[int] = self.dag.idx_to_asn[self.idx_map].tolist()
+        return {asn: values[reduced_asn]
+                for asn, reduced_asn in zip(self.asns.tolist(), reduced_asns)
+                if reduced_asn in values}
+
+    def expand_array(self, values: np.ndarray) -> np.ndarray:
+        """Returns values in the reduced graph's dense index order, in the
+        original graph's dense index order
+        """
+
+        expanded: np.ndarray = values[self.idx_map]
+        return expanded
+
+
+def collapse_stubs(self, keep: Iterable[int] = tuple()) -> CollapsedDAG:
+    """Returns the graph without single homed stubs, and how to expand it"""
+
+    keep_set: Set[int] = set(keep)
+    missing: Set[int] = keep_set - self.as_dict.keys()
+    if missing:
+        raise Exception(f"ASNs not in the graph: {sorted(missing)}")
+
+    indptr, indices = self.providers_csr
+    # Stubs have one neighbor, so this is a stub whose neighbor's a provider
+    foldable: np.ndarray = ((self.as_flags & STUB_FLAG).astype(bool)
+                            & (np.diff(indptr) == 1)
+                            & ~(self.as_flags & INPUT_CLIQUE_FLAG).astype(bool)
+                            & ~np.fromiter((x.ixp for x in self.ases),
+                                           dtype=bool,
+                                           count=len(self.ases)))
+    foldable[[self.asn_to_idx[x] for x in keep_set]] = False
+    stub_idxs: np.ndarray = np.flatnonzero(foldable)
+    # A stub's provider has a customer, so it's never folded itself
+    provider_idxs: np.ndarray = indices[indptr[stub_idxs]]
+    kept_idxs: np.ndarray = np.flatnonzero(~foldable)
+
+    kept_asns: List[int] = self.idx_to_asn[kept_idxs].tolist()
+    reduced_dag: Any = self.subgraph(kept_asns)
+    idx_map: np.ndarray = np.empty(len(self.ases), dtype=np.int64)
+    idx_map[kept_idxs] = [reduced_dag.asn_to_idx[x] for x in kept_asns]
+    idx_map[stub_idxs] = idx_map[provider_idxs]
+    weights: np.ndarray = np.bincount(idx_map,
+                                      minlength=len(reduced_dag.ases))
+    return CollapsedDAG(
+        dag=reduced_dag,
+        weights=weights,
+        asns=self.idx_to_asn,
+        idx_map=idx_map,
+        folded=dict(zip(self.idx_to_asn[stub_idxs].tolist(),
+                        self.idx_to_asn[provider_idxs].tolist())))
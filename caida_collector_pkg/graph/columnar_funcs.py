@@ -0,0 +1,176 @@
+"""Functions to export the graph as columnar AS and edge tables
+
+Analytics otherwise parse the TSV's {asn,asn,...} strings. Instead, the
+AS table has a row per AS in dense index order (see csr_funcs), and the
+edge table has a row per link:
+
+ases: asn, propagation_rank, customer_cone_size (-1 for None), flags (the
+      *_FLAG bits of base_as), ixp, input_clique, rov_filtering,
+      rov_confidence, rov_source
+edges: src, dst, rel. Customer provider links are provider, customer, -1
+       and peer links are lower ASN, higher ASN, 0 (as in as-rel2 files)
+
+Tables are written as an .npz, a directory of .npy files that can be
+memory mapped, or Arrow IPC/Parquet files if pyarrow is installed
+"""
+
+from pathlib import Path
+from typing import Any, Dict, NamedTuple, Optional
+
+import numpy as np
+
+
+# Formats that tables can be written in
+COLUMNAR_FORMATS = ("npy", "npz", "arrow", "parquet")
+AS_COLUMNS = ("asn", "propagation_rank", "customer_cone_size", "flags",
+              "ixp", "input_clique", "rov_filtering", "rov_confidence",
+              "rov_source")
+EDGE_COLUMNS = ("src", "dst", "rel")
+# Edge rel types
+CP_REL = -1
+PEER_REL = 0
+
+
+class ColumnarTables(NamedTuple):
+    """{column: array} of the AS table and of the edge table"""
+
+    ases: Dict[str, np.ndarray]
+    edges: Dict[str, np.ndarray]
+
+
+def to_columnar(self,
+                path: Optional[Path] = None,
+                fmt: str = "npy") -> ColumnarTables:
+    """Returns the AS and edge tables, and writes them to path if given
+
+    fmt is one of COLUMNAR_FORMATS. npy and the pyarrow formats are
+    directories with a file per table (or per column for npy)
+    """
+
+    if fmt not in COLUMNAR_FORMATS:
+        raise Exception(f"fmt must be one of {COLUMNAR_FORMATS}, not {fmt}")
+
+    ases: Dict[str, np.ndarray] = {
+        "asn": np.array(self.idx_to_asn, dtype=np.int64),
+        # -1 is used for None
+        "propagation_rank": np.array(
+            [-1 if x.propagation_rank is None else x.propagation_rank
+             for x in self.ases], dtype=np.int64),
+        "customer_cone_size": np.array(
+            [-1 if x.customer_cone_size is None else x.customer_cone_size
+             for x in self.ases], dtype=np.int64),
+        "flags": np.array(self.as_flags, dtype=np.uint8),
+        "ixp": np.array([x.ixp for x in self.ases], dtype=bool),
+        "input_clique": np.array([x.input_clique for x in self.ases],
+                                 dtype=bool),
+        "rov_filtering": np.array(self.attrs["rov_filtering"], dtype=str),
+        "rov_confidence": np.array(self.attrs.tolist("rov_confidence"),
+                                   dtype=np.float64),
+        "rov_source": np.array(self.attrs["rov_source"], dtype=str)}
+
+    # Every customer provider link once, from the provider's side
+    indptr, indices = self.csr("customers")
+    cp_src: np.ndarray = self.idx_to_asn[np.repeat(
+        np.arange(len(self.ases)), np.diff(indptr))]
+    cp_dst: np.ndarray = self.idx_to_asn[indices]
+    # Every peer link once, from the lower ASN's side
+    indptr, indices = self.csr("peers")
+    peer_src: np.ndarray = self.idx_to_asn[np.repeat(
+        np.arange(len(self.ases)), np.diff(indptr))]
+    peer_dst: np.ndarray = self.idx_to_asn[indices]
+    lower: np.ndarray = peer_src < peer_dst
+    edges: Dict[str, np.ndarray] = {
+        "src": np.concatenate([cp_src, peer_src[lower]]).astype(np.int64),
+        "dst": np.concatenate([cp_dst, peer_dst[lower]]).astype(np.int64),
+        "rel": np.concatenate([
+            np.full(len(cp_src), CP_REL, dtype=np.int8),
+            np.full(int(lower.sum()), PEER_REL, dtype=np.int8)])}
+
+    tables = ColumnarTables(ases=ases, edges=edges)
+    if path is not None:
+        _write_columnar(tables, path, fmt)
+    return tables
+
+
+def _write_columnar(tables: ColumnarTables, path: Path, fmt: str):
+    """Writes tables to path in fmt"""
+
+    if fmt == "npz":
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open(mode="wb") as f:
+            np.savez(f, **{f"{table}.{col}": arr  # type: ignore
+                           for table, cols in tables._asdict().items()
+                           for col, arr in cols.items()})
+    elif fmt == "npy":
+        for table, cols in tables._asdict().items():
+            (path / table).mkdir(parents=True, exist_ok=True)
+            for col, arr in cols.items():
+                np.save(str(path / table / f"{col}.npy"), arr)
+    else:
+        pa: Any = _import_pyarrow()
+        path.mkdir(parents=True, exist_ok=True)
+        for table, cols in tables._asdict().items():
+            pa_table: Any = pa.table({col: pa.array(arr)
+                                      for col, arr in cols.items()})
+            if fmt == "arrow":
+                with pa.OSFile(str(path / f"{table}.arrow"), "wb") as f:
+                    with pa.ipc.new_file(f, pa_table.schema) as ipc_writer:
+                        ipc_writer.write_table(pa_table)
+            else:
+                import pyarrow.parquet as pq
+                pq.write_table(pa_table, str(path / f"{table}.parquet"))
+
+
+@staticmethod  # type: ignore
+def read_columnar(path: Path,
+                  fmt: str = "npy",
+                  mmap: bool = True) -> ColumnarTables:
+    """Reads tables written by to_columnar
+
+    With mmap, npy columns are read only memory maps and Arrow files are
+    memory mapped (numeric columns are then zero copy). npz files are
+    always read into memory
+    """
+
+    if fmt not in COLUMNAR_FORMATS:
+        raise Exception(f"fmt must be one of {COLUMNAR_FORMATS}, not {fmt}")
+
+    tables: Dict[str, Dict[str, np.ndarray]] = {
+        x: dict() for x in ColumnarTables._fields}
+    if fmt == "npz":
+        with np.load(str(path)) as npz:
+            for key in npz.files:
+                table, col = key.split(".", 1)
+                tables[table][col] = npz[key]
+    elif fmt == "npy":
+        for table, cols in zip(ColumnarTables._fields,
+                               (AS_COLUMNS, EDGE_COLUMNS)):
+            for col in cols:
+                tables[table][col] = np.load(str(path / table / f"{col}.npy"),
+                                             mmap_mode="r" if mmap else None)
+    else:
+        pa: Any = _import_pyarrow()
+        for table in ColumnarTables._fields:
+            table_path: str = str(path / f"{table}.{fmt}")
+            if fmt == "arrow":
+                source: Any = (pa.memory_map(table_path, "r") if mmap
+                               else pa.OSFile(table_path, "rb"))
+                pa_table: Any = pa.ipc.open_file(source).read_all()
+            else:
+                import pyarrow.parquet as pq
+                pa_table = pq.read_table(table_path, memory_map=mmap)
+            for col in pa_table.column_names:
+                tables[table][col] = pa_table.column(col).to_numpy()
+    return ColumnarTables(**tables)
+
+
+def _import_pyarrow() -> Any:
+    """Returns pyarrow, which is only needed for Arrow and Parquet"""
+
+    try:
+        import pyarrow
+        import pyarrow.ipc  # noqa: F401
+    except ImportError:
+        raise Exception("pyarrow must be installed for Arrow and Parquet. "
+                        "Use the npy or npz formats otherwise")
+    return pyarrow
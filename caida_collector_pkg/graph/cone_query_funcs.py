@@ -0,0 +1,136 @@
+"""Functions to query customer cones on demand
+
+A customer cone is every AS reachable by following customer links.
+Cones are computed when asked for, from cones that are already cached
+where possible, and kept in an LRU bounded by the total number of ASNs
+it holds (cone_cache_size, counting one extra per cone), since tier 1
+cones hold most of the graph.
+
+For stubs and multihomed ASes customer_cone_size is 0 by Caida's
+definition, so len(customer_cone(asn)) only matches it for other ASes
+"""
+
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set
+
+from .base_as import AS
+
+
+def customer_cone(self, asn: int) -> FrozenSet[int]:
+    """Returns the ASNs in the customer cone of an AS"""
+
+    cone: FrozenSet[int] = self._get_customer_cone(self.as_dict[asn],
+                                                   dict())
+    return cone
+
+
+def in_cone(self, provider_asn: int, asn: int) -> bool:
+    """Returns True if asn is in the customer cone of provider_asn
+
+    Uses the cached cone if there is one. Otherwise searches down from
+    the provider, skipping customers whose propagation rank is too low
+    to have asn below them (ranks strictly decrease going down)
+    """
+
+    provider_obj: AS = self.as_dict[provider_asn]
+    target: AS = self.as_dict[asn]
+    cached: Optional[FrozenSet[int]] = self._cone_cache.get(provider_asn)
+    if cached is not None:
+        self._cone_cache.move_to_end(provider_asn)
+        return asn in cached
+
+    # Ranks are None only if they were never assigned, so don't prune
+    target_rank: int = (-1 if target.propagation_rank is None
+                        else target.propagation_rank)
+    visited: Set[int] = {provider_asn}
+    stack: List[AS] = [provider_obj]
+    while stack:
+        for customer in stack.pop().customers:
+            if customer is target:
+                return True
+            if (customer.asn not in visited
+                    and (customer.propagation_rank or 0) > target_rank):
+                visited.add(customer.asn)
+                stack.append(customer)
+    return False
+
+
+def customer_cones(self, asns: Iterable[int]) -> Dict[int, FrozenSet[int]]:
+    """Returns {asn: customer cone} for many ASes
+
+    Computed lowest rank first, so that higher cones reuse lower ones
+    even if they don't all fit in the LRU
+    """
+
+    as_objs: List[AS] = sorted(set(self.as_dict[x] for x in asns),
+                               key=lambda x: x.propagation_rank or 0)
+    cones: Dict[int, FrozenSet[int]] = dict()
+    for as_obj in as_objs:
+        cones[as_obj.asn] = self._get_customer_cone(as_obj, cones)
+    return cones
+
+
+def _get_customer_cone(self,
+                       as_obj: AS,
+                       memo: Dict[int, FrozenSet[int]]) -> FrozenSet[int]:
+    """Returns the cone of an AS, reusing cones in the LRU or memo
+
+    Searches down through customers, and stops at any customer whose
+    cone is already known
+    """
+
+    cone: Optional[FrozenSet[int]] = self._get_cached_cone(as_obj.asn, memo)
+    if cone is not None:
+        return cone
+
+    asns: Set[int] = set()
+    stack: List[AS] = [as_obj]
+    while stack:
+        for customer in stack.pop().customers:
+            if customer.asn in asns:
+                continue
+            asns.add(customer.asn)
+            customer_cone: Optional[FrozenSet[int]] = self._get_cached_cone(
+                customer.asn, memo)
+            if customer_cone is None:
+                stack.append(customer)
+            else:
+                asns.update(customer_cone)
+    cone = frozenset(asns)
+    self._cache_cone(as_obj.asn, cone)
+    return cone
+
+
+def _get_cached_cone(self,
+                     asn: int,
+                     memo: Dict[int, FrozenSet[int]]
+                     ) -> Optional[FrozenSet[int]]:
+    """Returns a cone from the memo or LRU, marking it recently used"""
+
+    if asn in memo:
+        return memo[asn]
+    cone: Optional[FrozenSet[int]] = self._cone_cache.get(asn)
+    if cone is not None:
+        self._cone_cache.move_to_end(asn)
+    return cone
+
+
+def _cache_cone(self, asn: int, cone: FrozenSet[int]):
+    """Adds a cone to the LRU, evicting the least recently used cones"""
+
+    # Empty cones still take up an entry, so count one extra per cone
+    size: int = len(cone) + 1
+    # Too big to ever fit, don't evict everything else for it
+    if size > self.cone_cache_size:
+        return
+    self._cone_cache[asn] = cone
+    self._cone_cache_total += size
+    while self._cone_cache_total > self.cone_cache_size:
+        _, evicted = self._cone_cache.popitem(last=False)
+        self._cone_cache_total -= len(evicted) + 1
+
+
+def clear_cone_cache(self):
+    """Empties the cone LRU, i.e. after the graph changes"""
+
+    self._cone_cache.clear()
+    self._cone_cache_total = 0
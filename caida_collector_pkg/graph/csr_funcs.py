@@ -0,0 +1,112 @@
+"""Functions to expose the graph as compressed sparse row arrays
+
+Each AS has a dense index, its position in dag.ases. For a relationship
+(customers, providers or peers), the neighbors of the AS at index i are
+indices[indptr[i]:indptr[i + 1]], in the same order as the AS's tuple.
+So vectorized code can walk the graph without touching AS objects.
+
+Arrays are built lazily on first access, cached, and read only
+"""
+
+from itertools import chain
+from operator import attrgetter
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from .base_as import AS
+
+
+# Relationships that have CSR arrays
+CSR_RELS = ("customers", "providers", "peers")
+
+CSR_TYPE = Tuple[np.ndarray, np.ndarray]
+
+
+@property  # type: ignore
+def idx_to_asn(self) -> np.ndarray:
+    """ASN of each dense AS index"""
+
+    if self._idx_to_asn is None:
+        asns: np.ndarray = np.fromiter((x.asn for x in self.ases),
+                                       dtype=np.int64,
+                                       count=len(self.ases))
+        asns.setflags(write=False)
+        self._idx_to_asn = asns
+    idx_to_asn: np.ndarray = self._idx_to_asn
+    return idx_to_asn
+
+
+@property  # type: ignore
+def asn_to_idx(self) -> Dict[int, int]:
+    """Dense AS index of each ASN"""
+
+    if self._asn_to_idx is None:
+        self._asn_to_idx = {x.asn: i for i, x in enumerate(self.ases)}
+    asn_to_idx: Dict[int, int] = self._asn_to_idx
+    return asn_to_idx
+
+
+def csr(self, rel: str) -> CSR_TYPE:
+    """Returns (indptr, indices) of customers, providers or peers"""
+
+    if rel not in CSR_RELS:
+        raise Exception(f"rel must be one of {CSR_RELS}, not {rel}")
+    if rel not in self._csr:
+        rel_ases: List[AS] = list(chain.from_iterable(
+            getattr(x, rel) for x in self.ases))
+        indptr: np.ndarray = np.zeros(len(self.ases) + 1, dtype=np.int64)
+        np.cumsum(np.fromiter((len(getattr(x, rel)) for x in self.ases),
+                              dtype=np.int64,
+                              count=len(self.ases)),
+                  out=indptr[1:])
+        rel_asns: np.ndarray = np.fromiter(map(attrgetter("asn"), rel_ases),
+                                           dtype=np.int64,
+                                           count=len(rel_ases))
+        # Binary search for the indices, rather than a dict lookup each
+        order: np.ndarray = np.argsort(self.idx_to_asn, kind="stable")
+        indices: np.ndarray = order[np.searchsorted(
+            self.idx_to_asn, rel_asns, sorter=order)].astype(np.int32)
+        self._set_csr(rel, indptr, indices)
+    csr_arrays: CSR_TYPE = self._csr[rel]
+    return csr_arrays
+
+
+def _set_csr(self, rel: str, indptr: np.ndarray, indices: np.ndarray):
+    """Caches CSR arrays (i.e. from a snapshot) as read only"""
+
+    indptr.setflags(write=False)
+    indices.setflags(write=False)
+    self._csr[rel] = (indptr, indices)
+
+
+@property  # type: ignore
+def customers_csr(self) -> CSR_TYPE:
+    """(indptr, indices) of every AS's customers"""
+
+    csr_arrays: CSR_TYPE = self.csr("customers")
+    return csr_arrays
+
+
+@property  # type: ignore
+def providers_csr(self) -> CSR_TYPE:
+    """(indptr, indices) of every AS's providers"""
+
+    csr_arrays: CSR_TYPE = self.csr("providers")
+    return csr_arrays
+
+
+@property  # type: ignore
+def peers_csr(self) -> CSR_TYPE:
+    """(indptr, indices) of every AS's peers"""
+
+    csr_arrays: CSR_TYPE = self.csr("peers")
+    return csr_arrays
+
+
+def _clear_csr(self):
+    """Drops the cached arrays, i.e. after the graph changes"""
+
+    self._csr = dict()
+    self._asn_to_idx = None
+    self._idx_to_asn = None
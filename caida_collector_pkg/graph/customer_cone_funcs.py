@@ -1,38 +1,187 @@
-"""Functions to determine customer cone size"""
+"""Functions to determine customer cone size
 
-from typing import Dict, List, Set
+Cones are bitsets (Python ints, one bit per AS) built in reverse
+topological order, so each cone is the OR of its customers' cones.
+A bitset is freed as soon as every provider of its AS has used it, so
+only the frontier of the graph is held in memory at once. Strongly
+connected components (provider customer cycles) are condensed and
+share a single cone
+"""
+
+from typing import Dict, Iterable, List, Optional, Sequence, Set
 
 from .base_as import AS
 
 
-def _get_customer_cone_size(self):
-    """Gets the AS rank by customer cone, the same way Caida does it"""
-
-    # Recursively assign the customer cone size
-    non_edges: List[AS] = []
-    cone_dict: Dict[int, Set[int]] = {}
-    for as_obj in self:
-        if as_obj.stub or as_obj.multihomed:
-            as_obj.customer_cone_size = 0
-            cone_dict[as_obj.asn] = set()
-        else:
-            non_edges.append(as_obj)
-    for as_obj in non_edges:
-        customer_cone: Set[int] = self._get_cone_size_helper(as_obj, cone_dict)
-        as_obj.customer_cone_size = len(customer_cone)
-
-
-def _get_cone_size_helper(self,
-                          as_obj: AS,
-                          cone_dict: Dict[int, Set[int]]) -> Set[int]:
-    """Recursively determines the cone size of an as"""
-
-    if as_obj.asn in cone_dict:
-        return cone_dict[as_obj.asn]
-    else:
-        cone_dict[as_obj.asn] = set()
-        for customer in as_obj.customers:
-            cone_dict[as_obj.asn].add(customer.asn)
-            self._get_cone_size_helper(customer, cone_dict)
-            cone_dict[as_obj.asn].update(cone_dict[customer.asn])
-    return cone_dict[as_obj.asn]
+# int.bit_count is only in python 3.10+
+_HAS_BIT_COUNT: bool = hasattr(int, "bit_count")
+
+
+def _popcount(x: int) -> int:
+    """Returns the number of set bits"""
+
+    return x.bit_count() if _HAS_BIT_COUNT else bin(x).count("1")
+
+
+def _get_customer_cone_size(self, as_objs: Optional[Iterable[AS]] = None):
+    """Gets the AS rank by customer cone, the same way Caida does it
+
+    Stubs and multihomed ASes have a cone size of 0, and add only
+    themselves to their providers' cones
+
+    If as_objs are given, only they and every AS below them are sized
+    """
+
+    ases: Sequence[AS] = (self.ases if as_objs is None
+                          else self._get_customer_closure(as_objs))
+    # SCCs, customers first
+    sccs: List[List[AS]] = self._get_customer_sccs(ases)
+    # Index ASes in that order, so a cone only has bits below its SCC
+    # and the bitsets of ASes near the leaves are tiny
+    idxs: Dict[int, int] = dict()
+    scc_ids: Dict[int, int] = dict()
+    for scc_id, scc in enumerate(sccs):
+        for as_obj in scc:
+            idxs[as_obj.asn] = len(idxs)
+            scc_ids[as_obj.asn] = scc_id
+
+    # Cones that providers still need, and how many providers (SCCs)
+    cones: Dict[int, int] = dict()
+    num_waiting: Dict[int, int] = dict()
+    for scc_id, scc in enumerate(sccs):
+        # Leaves have empty cones, and add only themselves to providers
+        if len(scc) == 1 and not scc[0].customers:
+            scc[0].customer_cone_size = 0
+            continue
+        customers: List[AS] = [y for x in scc for y in x.customers]
+        customer_scc_ids: Set[int] = set(scc_ids[x.asn] for x in customers
+                                         if x.customers)
+        customer_scc_ids.discard(scc_id)
+        # Stubs and multihomed ASes don't need a cone of their own
+        cone: Optional[int] = None
+        if not (len(scc) == 1 and (scc[0].stub or scc[0].multihomed)):
+            # Bytes needed for every index up to the end of this SCC
+            cone_bytes = bytearray((idxs[scc[-1].asn] + 8) // 8)
+            for customer in customers:
+                idx: int = idxs[customer.asn]
+                cone_bytes[idx >> 3] |= 1 << (idx & 7)
+            cone = int.from_bytes(cone_bytes, "little")
+        for customer_scc_id in customer_scc_ids:
+            customer_cone: Optional[int] = cones.get(customer_scc_id)
+            if customer_cone is None:
+                continue
+            if cone is not None:
+                cone |= customer_cone
+            num_waiting[customer_scc_id] -= 1
+            # Every provider has this cone now
+            if num_waiting[customer_scc_id] == 0:
+                del cones[customer_scc_id]
+                del num_waiting[customer_scc_id]
+
+        if cone is None:
+            scc[0].customer_cone_size = 0
+            continue
+        cone_size: int = _popcount(cone)
+        for as_obj in scc:
+            as_obj.customer_cone_size = cone_size
+        # Providers that aren't being sized are skipped
+        provider_scc_ids: Set[int] = set(scc_ids.get(y.asn, scc_id)
+                                         for x in scc for y in x.providers)
+        provider_scc_ids.discard(scc_id)
+        if provider_scc_ids:
+            cones[scc_id] = cone
+            num_waiting[scc_id] = len(provider_scc_ids)
+
+
+def _get_customer_closure(self, as_objs: Iterable[AS]) -> List[AS]:
+    """Returns as_objs and every AS below them"""
+
+    closure: Dict[int, AS] = {x.asn: x for x in as_objs}
+    stack: List[AS] = list(closure.values())
+    while stack:
+        for customer in stack.pop().customers:
+            if customer.asn not in closure:
+                closure[customer.asn] = customer
+                stack.append(customer)
+    return list(closure.values())
+
+
+def _get_customer_sccs(self,
+                       ases: Optional[Sequence[AS]] = None
+                       ) -> List[List[AS]]:
+    """Returns the SCCs of the customer graph, customers first
+
+    ases defaults to the whole graph, and must hold every AS below them.
+    Without cycles every SCC is a single AS in topological order (the
+    same order that ranks are assigned in). Otherwise falls back to
+    iterative Tarjan's algorithm, which finds an SCC only after every
+    SCC below it, so the result is in reverse topological order
+    """
+
+    # Customers of each AS that haven't been ordered yet
+    if ases is None:
+        ases = self.ases
+    num_unordered: Dict[int, int] = {x.asn: len(x.customers) for x in ases}
+    ordered: List[AS] = [x for x in ases if not x.customers]
+    for as_obj in ordered:
+        for provider_obj in as_obj.providers:
+            # Skips providers above the ASes being ordered
+            num: Optional[int] = num_unordered.get(provider_obj.asn)
+            if num is None:
+                continue
+            num_unordered[provider_obj.asn] = num - 1
+            if num == 1:
+                # Appended while iterating, so it's visited later
+                ordered.append(provider_obj)
+    if len(ordered) == len(ases):
+        return [[x] for x in ordered]
+
+    idxs: Dict[int, int] = {x.asn: i for i, x in enumerate(ases)}
+    num_ases: int = len(ases)
+    # Order each AS was found in, and the lowest order it can reach
+    order: List[int] = [-1] * num_ases
+    low: List[int] = [0] * num_ases
+    on_stack: List[bool] = [False] * num_ases
+    stack: List[int] = []
+    sccs: List[List[AS]] = []
+    counter: int = 0
+
+    for root in range(num_ases):
+        if order[root] != -1:
+            continue
+        # (AS index, index of the next customer to visit)
+        work: List[List[int]] = [[root, 0]]
+        order[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = True
+        while work:
+            frame = work[-1]
+            i: int = frame[0]
+            customers = ases[i].customers
+            if frame[1] < len(customers):
+                j: int = idxs[customers[frame[1]].asn]
+                frame[1] += 1
+                if order[j] == -1:
+                    order[j] = low[j] = counter
+                    counter += 1
+                    stack.append(j)
+                    on_stack[j] = True
+                    work.append([j, 0])
+                elif on_stack[j]:
+                    low[i] = min(low[i], order[j])
+                continue
+            work.pop()
+            if work:
+                parent: int = work[-1][0]
+                low[parent] = min(low[parent], low[i])
+            if low[i] == order[i]:
+                scc: List[AS] = []
+                while True:
+                    j = stack.pop()
+                    on_stack[j] = False
+                    scc.append(ases[j])
+                    if j == i:
+                        break
+                sccs.append(scc)
+    return sccs
@@ -0,0 +1,196 @@
+"""Functions to update a graph in place with the links that changed
+
+Consecutive Caida months differ in a small fraction of links, so rather
+than rebuilding the graph, only the ASes on either end of a changed link
+are updated. Propagation ranks and customer cone sizes can only change
+for those ASes and the ASes above them, so only they are recomputed
+"""
+
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Type, Union
+
+from .base_as import AS
+from .base_as import REL
+from .graph_building_funcs import SETUP_RELS
+
+from ..links import CustomerProviderLink as CPLink
+from ..links import LinkSet
+from ..links import PeerLink
+
+
+# {rel: {asn: ASNs}} of relationships to add or remove
+REL_CHANGES_TYPE = Dict[str, Dict[int, Set[int]]]
+
+
+def apply_diff(self,
+               added_cp: Union[LinkSet, Iterable[CPLink]],
+               removed_cp: Union[LinkSet, Iterable[CPLink]],
+               added_peers: Union[LinkSet, Iterable[PeerLink]],
+               removed_peers: Union[LinkSet, Iterable[PeerLink]],
+               ixps: Optional[Set[int]] = None,
+               input_clique: Optional[Set[int]] = None,
+               BaseASCls: Optional[Type[AS]] = None,
+               csv_path: Path = (Path(__file__).parent.parent
+                                 / "combined.csv")):
+    """Adds and removes links in place, the same as rebuilding the graph
+
+    ixps and input_clique are the new month's (None keeps the current
+    ones). New ASes are BaseASCls (by default the class of the graph's
+    ASes) and get their ROV info from csv_path. ASes that are left
+    without links, and aren't IXPs or in the input clique, are removed.
+
+    Links are removed before they're added. Relationship tuples keep
+    their order, with added ASes at the end
+    """
+
+    if BaseASCls is None:
+        BaseASCls = type(self.ases[0]) if self.ases else AS
+    removed: REL_CHANGES_TYPE = _get_rel_changes(
+        LinkSet.from_links(removed_cp, CPLink),
+        LinkSet.from_links(removed_peers, PeerLink))
+    added: REL_CHANGES_TYPE = _get_rel_changes(
+        LinkSet.from_links(added_cp, CPLink),
+        LinkSet.from_links(added_peers, PeerLink))
+
+    new_ases: Dict[int, AS] = {
+        asn: BaseASCls(asn) for asn in sorted(set().union(
+            *[x.keys() for x in added.values()]))
+        if asn not in self.as_dict}
+    # Work out every new relationship before changing the graph
+    new_rels: Dict[AS, List[REL]] = dict()
+    for asn in set().union(*[x.keys() for x in removed.values()],
+                           *[x.keys() for x in added.values()]):
+        as_obj: Optional[AS] = self.as_dict.get(asn, new_ases.get(asn))
+        if as_obj is None:
+            continue
+        new_rels[as_obj] = [
+            _get_new_rel(getattr(as_obj, rel),
+                         removed[rel].get(asn, set()),
+                         [self.as_dict.get(x, new_ases.get(x))
+                          for x in sorted(added[rel].get(asn, set()))])
+            for rel in SETUP_RELS]
+        peer_asns: Set[int] = set(x.asn for x in new_rels[as_obj][0])
+        if any(x.asn in peer_asns
+               for x in new_rels[as_obj][1] + new_rels[as_obj][2]):
+            raise Exception(f"AS {asn} can't have a peer that is also its "
+                            "customer or provider")
+
+    old_rels: Dict[AS, List[REL]] = {
+        x: [getattr(x, rel) for rel in SETUP_RELS] for x in new_rels}
+    self.as_dict.update(new_ases)
+    for as_obj, rels in new_rels.items():
+        for rel, rel_tuple in zip(SETUP_RELS, rels):
+            setattr(as_obj, rel, rel_tuple)
+    # Ranks only change for changed ASes and the ASes above them. This
+    # raises for cycles, in which case the links are put back
+    try:
+        self._update_propagation_ranks(self._get_provider_closure(new_rels))
+    except Exception:
+        for as_obj, rels in old_rels.items():
+            for rel, rel_tuple in zip(SETUP_RELS, rels):
+                setattr(as_obj, rel, rel_tuple)
+        for asn in new_ases:
+            del self.as_dict[asn]
+        raise
+    changed: Set[AS] = set(new_rels)
+    changed.update(self._update_ixps_and_input_clique(ixps,
+                                                      input_clique,
+                                                      BaseASCls,
+                                                      new_ases))
+
+    removed_ases: List[AS] = [x for x in changed if not (
+        x.peers or x.providers or x.customers or x.ixp or x.input_clique)]
+    for as_obj in removed_ases:
+        del self.as_dict[as_obj.asn]
+        changed.remove(as_obj)
+        new_ases.pop(as_obj.asn, None)
+    # The same order as a rebuild: ASNs with links sorted, then the rest
+    linked_asns: List[int] = sorted(
+        asn for asn, x in self.as_dict.items()
+        if x.peers or x.providers or x.customers)
+    unlinked_asns: List[int] = [
+        asn for asn, x in self.as_dict.items()
+        if not (x.peers or x.providers or x.customers)]
+    self.as_dict = {asn: self.as_dict[asn]
+                    for asn in linked_asns + unlinked_asns}
+    self.ases = tuple(self.as_dict.values())
+    self._attach_attrs()
+
+    # Cached arrays and cones are out of date
+    self._clear_csr()
+    self.clear_cone_cache()
+    self._reclassify_ases(changed, removed_ases)
+    # New IXPs and input clique ASes without links weren't ranked above
+    for as_obj in new_ases.values():
+        if as_obj.propagation_rank is None:
+            as_obj.propagation_rank = 0
+    self.propagation_ranks = self._get_propagation_ranks()
+    above: Set[AS] = self._get_provider_closure(changed)
+    self._get_customer_cone_size(above)
+    if new_ases:
+        self._add_extra_csv_info(csv_path, set(new_ases))
+
+
+def _get_rel_changes(cp_links: LinkSet,
+                     peer_links: LinkSet) -> REL_CHANGES_TYPE:
+    """Returns {rel: {asn: ASNs}} for links"""
+
+    changes: REL_CHANGES_TYPE = {rel: defaultdict(set) for rel in SETUP_RELS}
+    peers, providers, customers = (changes[rel] for rel in SETUP_RELS)
+    for provider_asn, customer_asn in zip(cp_links.asns1.tolist(),
+                                          cp_links.asns2.tolist()):
+        providers[customer_asn].add(provider_asn)
+        customers[provider_asn].add(customer_asn)
+    for asn1, asn2 in zip(peer_links.asns1.tolist(),
+                          peer_links.asns2.tolist()):
+        peers[asn1].add(asn2)
+        peers[asn2].add(asn1)
+    return changes
+
+
+def _get_new_rel(rel: REL, removed_asns: Set[int], added: List[AS]) -> REL:
+    """Returns rel without removed_asns, plus ASes that aren't in it"""
+
+    kept: REL = tuple([x for x in rel if x.asn not in removed_asns])
+    kept_asns: Set[int] = set(x.asn for x in kept)
+    return kept + tuple([x for x in added if x.asn not in kept_asns])
+
+
+def _update_ixps_and_input_clique(self,
+                                  ixps: Optional[Set[int]],
+                                  input_clique: Optional[Set[int]],
+                                  BaseASCls: Type[AS],
+                                  new_ases: Dict[int, AS]) -> Set[AS]:
+    """Sets the new IXPs and input clique, and returns ASes that changed
+
+    ASes that aren't in the graph yet are added to it and to new_ases
+    """
+
+    changed: Set[AS] = set()
+    for attr, asns in (("ixp", ixps), ("input_clique", input_clique)):
+        if asns is None:
+            continue
+        for as_obj in self.as_dict.values():
+            if getattr(as_obj, attr) != (as_obj.asn in asns):
+                setattr(as_obj, attr, as_obj.asn in asns)
+                changed.add(as_obj)
+        for asn in asns:
+            if asn not in self.as_dict:
+                new_ases[asn] = self.as_dict[asn] = BaseASCls(asn)
+                setattr(new_ases[asn], attr, True)
+                changed.add(new_ases[asn])
+    return changed
+
+
+def _get_provider_closure(self, as_objs: Iterable[AS]) -> Set[AS]:
+    """Returns as_objs and every AS above them"""
+
+    closure: Set[AS] = set(as_objs)
+    stack: List[AS] = list(closure)
+    while stack:
+        for provider_obj in stack.pop().providers:
+            if provider_obj not in closure:
+                closure.add(provider_obj)
+                stack.append(provider_obj)
+    return closure
@@ -1,92 +1,94 @@
 """Gontains functions needed to build graph and it's references"""
 
-import csv
-from pathlib import Path
-from typing import Set, Type
+from collections import defaultdict
+from typing import Dict, Set, Type
+
+import numpy as np
 
 from .base_as import AS
-from ..links import CustomerProviderLink as CPLink
-from ..links import PeerLink
+from ..links import LinkSet
+
+
+# Relationships that are built from sets while setting up
+SETUP_RELS = ("peers", "providers", "customers")
+SETUP_RELS_TYPE = Dict[str, Dict[int, Set[AS]]]
 
 
 def _gen_graph(self,
-               cp_links: Set[CPLink],
-               peer_links: Set[PeerLink],
+               cp_links: LinkSet,
+               peer_links: LinkSet,
                ixps: Set[int],
                input_clique: Set[int],
                BaseAsCls: Type[AS]):
     """Generates a graph of AS objects"""
 
     msg = "Shouldn't have a customer-provider that is also a peer!"
-    assert len(cp_links) + len(peer_links) == len(cp_links | peer_links), msg
+    assert cp_links.isdisjoint(peer_links), msg
 
     def _gen_as(asn):
-        return BaseAsCls(asn,
-                         peers_setup_set=set(),
-                         customers_setup_set=set(),
-                         providers_setup_set=set())
+        return BaseAsCls(asn)
 
-    # Add all links to the graph
-    for link in cp_links | peer_links:
-        for asn in link.asns:
-            self.as_dict[asn] = self.as_dict.get(asn, _gen_as(asn))
+    # Add all links to the graph, sorted by ASN rather than in set order,
+    # so the order doesn't depend on how links were read (see diff_funcs)
+    asns = np.unique(np.concatenate([cp_links.asns1,
+                                     cp_links.asns2,
+                                     peer_links.asns1,
+                                     peer_links.asns2]))
+    for asn in asns.tolist():
+        self.as_dict[asn] = _gen_as(asn)
 
     # Add all IXPs to the graph
     for asn in ixps:
-        self.as_dict[asn] = self.as_dict.get(asn, _gen_as(asn))
+        if asn not in self.as_dict:
+            self.as_dict[asn] = _gen_as(asn)
         self.as_dict[asn].ixp = True
 
     # Add all input cliques to the graph
     for asn in input_clique:
-        self.as_dict[asn] = self.as_dict.get(asn, _gen_as(asn))
+        if asn not in self.as_dict:
+            self.as_dict[asn] = _gen_as(asn)
         self.as_dict[asn].input_clique = True
 
 
 def _add_relationships(self,
-                       cp_links: Set[CPLink],
-                       peer_links: Set[PeerLink]):
-    """Adds relationships to the graph as references"""
+                       cp_links: LinkSet,
+                       peer_links: LinkSet) -> SETUP_RELS_TYPE:
+    """Adds relationships to the graph as references
+
+    While setting up, sets are used for speed. They're kept here
+    rather than on the (slotted) ASes, and are returned as
+    {rel: {asn: set of AS objs}}
+    """
+
+    setup_rels: SETUP_RELS_TYPE = {rel: defaultdict(set)
+                                   for rel in SETUP_RELS}
+    peers, providers, customers = (setup_rels[rel] for rel in SETUP_RELS)
 
-    for cp_link in cp_links:
+    for provider_asn, customer_asn in zip(cp_links.asns1.tolist(),
+                                          cp_links.asns2.tolist()):
         # Extract customer and provider obj
-        customer = self.as_dict[cp_link.customer_asn]
-        provider = self.as_dict[cp_link.provider_asn]
+        customer = self.as_dict[customer_asn]
+        provider = self.as_dict[provider_asn]
         # Store references
-        customer.providers_setup_set.add(provider)
-        provider.customers_setup_set.add(customer)
+        providers[customer_asn].add(provider)
+        customers[provider_asn].add(customer)
 
-    for peer_link in peer_links:
+    for asn1, asn2 in zip(peer_links.asns1.tolist(),
+                          peer_links.asns2.tolist()):
         # Extract as objects for peers
-        asn1, asn2 = peer_link.asns
         p1, p2 = self.as_dict[asn1], self.as_dict[asn2]
         # Add references to peers
-        p1.peers_setup_set.add(p2)
-        p2.peers_setup_set.add(p1)
-
-
-def _make_relationships_tuples(self):
-    """Make relationships tuples"""
-
-    rel_attrs = ("peers", "providers", "customers")
-    setup_rel_attrs = ("peers_setup_set",
-                       "providers_setup_set",
-                       "customers_setup_set")
-
-    for as_obj in self:
-        for rel_attr, setup_rel_attr in zip(rel_attrs, setup_rel_attrs):
-            # Conver the setup attribute to tuple
-            setattr(as_obj, rel_attr, tuple(getattr(as_obj, setup_rel_attr)))
-            # Delete the setup attribute
-            delattr(as_obj, setup_rel_attr)
+        peers[asn1].add(p2)
+        peers[asn2].add(p1)
+    return setup_rels
 
 
-def _add_extra_csv_info(self, path: Path):
-    """Adds info from CSVs to ASNs"""
+def _make_relationships_tuples(self, setup_rels: SETUP_RELS_TYPE):
+    """Make relationships tuples from the setup sets"""
 
-    with path.open() as f:
-        for row in csv.DictReader(f):
-            as_ = self.as_dict.get(int(row["asn"]))
-            if as_ is not None:
-                as_.rov_filtering = row["filtering"]
-                as_.rov_confidence = float(row["confidence"])
-                as_.rov_source = row["source"]
+    empty: Set[AS] = set()
+    for rel in SETUP_RELS:
+        rel_sets: Dict[int, Set[AS]] = setup_rels.pop(rel)
+        for as_obj in self:
+            # Conver the setup set to tuple, freeing the set as we go
+            setattr(as_obj, rel, tuple(rel_sets.pop(as_obj.asn, empty)))
@@ -1,32 +1,127 @@
 """Functions to create ranks for propagation"""
 
-from typing import List, Tuple
+from collections import deque
+from typing import Deque, Dict, List, Optional, Set, Tuple
 
 from .base_as import AS
 
 
 def _assign_propagation_ranks(self):
-    """Assigns propagation ranks from the leafs to input_clique"""
+    """Assigns propagation ranks from the leafs to input_clique
+
+    An AS's rank is the length of the longest chain of customers below
+    it (see _rank_asns)
+    """
+
+    for asn, rank in self._rank_asns().items():
+        self.as_dict[asn].propagation_rank = rank
+
+
+def _update_propagation_ranks(self, as_objs: Set[AS]):
+    """Reassigns the ranks of as_objs, which must hold every AS above them
+
+    The ranks of every other AS can't change, so only these ASes are
+    ranked, starting from their ranked customers. If there's a cycle,
+    no rank is changed
+    """
+
+    ranks: Dict[int, int] = self._rank_asns(set(x.asn for x in as_objs),
+                                            outside_ranks=True)
+    for asn, rank in ranks.items():
+        self.as_dict[asn].propagation_rank = rank
 
-    for as_obj in self:
-        self._assign_ranks_helper(as_obj, 0)
 
+def _rank_asns(self,
+               asns: Optional[Set[int]] = None,
+               outside_ranks: bool = False) -> Dict[int, int]:
+    """Returns {asn: propagation rank} of asns, or of every AS if None
 
-def _assign_ranks_helper(self, as_obj: AS, rank: int):
-    """Assigns ranks to all ases in customer/provider chain recursively"""
+    Ranked leaves first in topological (Kahn) order, so each AS and link
+    is visited once and nothing recurses. Only links between asns are
+    followed. Customers outside of asns are ignored, or if outside_ranks,
+    count with their current rank. Raises if there's a cycle
+    """
 
-    if as_obj.propagation_rank is None or as_obj.propagation_rank < rank:
-        as_obj.propagation_rank = rank
-        # Only update it's providers if it's rank becomes higher
-        # This avoids a double for loop of writes
+    ranks: Dict[int, int] = dict()
+    # Customers of each AS that haven't been ranked yet
+    num_unranked: Dict[int, int] = dict()
+    leaves: Deque[AS] = deque()
+    if asns is None:
+        for as_obj in self:
+            ranks[as_obj.asn] = 0
+            num_unranked[as_obj.asn] = len(as_obj.customers)
+            if not as_obj.customers:
+                leaves.append(as_obj)
+    else:
+        for asn in asns:
+            as_obj = self.as_dict[asn]
+            rank: int = 0
+            num: int = 0
+            for customer_obj in as_obj.customers:
+                if customer_obj.asn in asns:
+                    num += 1
+                elif outside_ranks:
+                    rank = max(rank, customer_obj.propagation_rank + 1)
+            ranks[asn] = rank
+            num_unranked[asn] = num
+            if num == 0:
+                leaves.append(as_obj)
+
+    num_ranked: int = 0
+    while leaves:
+        as_obj = leaves.popleft()
+        num_ranked += 1
+        rank = ranks[as_obj.asn] + 1
         for provider_obj in as_obj.providers:
-            self._assign_ranks_helper(provider_obj, rank + 1)
+            provider_asn: int = provider_obj.asn
+            provider_num: Optional[int] = num_unranked.get(provider_asn)
+            # Not in asns
+            if provider_num is None:
+                continue
+            if ranks[provider_asn] < rank:
+                ranks[provider_asn] = rank
+            num_unranked[provider_asn] = provider_num - 1
+            # All customers are ranked, so the provider's rank is final
+            if provider_num == 1:
+                leaves.append(provider_obj)
+
+    if num_ranked != len(ranks):
+        cycle_asns: List[int] = self._get_cycle_asns(num_unranked)
+        raise Exception("Provider customer cycle, can't assign propagation "
+                        f"ranks. ASNs in or between cycles: {cycle_asns}")
+    return ranks
+
+
+def _get_cycle_asns(self, num_unranked: Dict[int, int]) -> List[int]:
+    """Returns the unranked ASNs that are in (or between) cycles
+
+    Unranked ASes are cycles and every AS above them. The ASes above
+    are trimmed off from the top down, the same way leaves are ranked
+    """
+
+    unranked: Set[int] = set(x for x, num in num_unranked.items() if num)
+    # Unranked providers of each unranked AS
+    num_providers: Dict[int, int] = {
+        asn: sum(x.asn in unranked for x in self.as_dict[asn].providers)
+        for asn in unranked}
+    roots: Deque[int] = deque(x for x, num in num_providers.items()
+                              if num == 0)
+    while roots:
+        asn = roots.popleft()
+        unranked.remove(asn)
+        for customer_obj in self.as_dict[asn].customers:
+            if customer_obj.asn in unranked:
+                num_providers[customer_obj.asn] -= 1
+                if num_providers[customer_obj.asn] == 0:
+                    roots.append(customer_obj.asn)
+    return sorted(unranked)
 
 
 def _get_propagation_ranks(self) -> Tuple[Tuple[AS, ...], ...]:
     """Orders ASes by rank"""
 
-    max_rank: int = max(x.propagation_rank for x in self)
+    # -1 for a graph without ASes, which has no ranks
+    max_rank: int = max((x.propagation_rank for x in self), default=-1)
     # Create a list of empty lists
     # Ignore types here for speed purposes
     ranks: List[List[AS]] = list(list() for _ in range(max_rank + 1))
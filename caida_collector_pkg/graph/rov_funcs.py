@@ -0,0 +1,115 @@
+"""Functions to annotate ASes with ROV info from a CSV
+
+The CSV (asn,filtering,confidence,source, see scripts/rov_ases) is
+parsed once per process into an ROVTable, sorted by ASN. Later graphs
+reuse it until the file's mtime or size changes. If an ASN has several
+rows, the last one wins, as when every row was applied in turn.
+
+Tables are joined against the graph's dense index with a binary search,
+and written to the graph's ROV columns (see attr_funcs) in bulk
+"""
+
+import csv
+import os
+from pathlib import Path
+from threading import Lock
+from typing import Dict, NamedTuple, Optional, Set, Tuple, Union
+
+import numpy as np
+
+
+# AS attrs that hold ROV info
+ROV_ATTRS = ("rov_filtering", "rov_confidence", "rov_source")
+
+
+class ROVTable(NamedTuple):
+    """ROV info, with a row per unique ASN in sorted order"""
+
+    asns: np.ndarray
+    filtering: np.ndarray
+    confidence: np.ndarray
+    source: np.ndarray
+
+
+# {resolved path: (mtime_ns, size, table)} shared by every graph
+_rov_tables: Dict[Path, Tuple[int, int, ROVTable]] = dict()
+_rov_tables_lock = Lock()
+
+
+def read_rov_table(path: Path) -> ROVTable:
+    """Returns the ROVTable of a CSV, parsing it only if it changed"""
+
+    resolved: Path = path.resolve()
+    stat = resolved.stat()
+    with _rov_tables_lock:
+        cached = _rov_tables.get(resolved)
+        if cached is not None and cached[:2] == (stat.st_mtime_ns,
+                                                 stat.st_size):
+            return cached[2]
+    table: ROVTable = _parse_rov_csv(resolved)
+    with _rov_tables_lock:
+        _rov_tables[resolved] = (stat.st_mtime_ns, stat.st_size, table)
+    return table
+
+
+def _parse_rov_csv(path: Path) -> ROVTable:
+    """Parses an ROV CSV, keeping the last row of each ASN"""
+
+    with path.open() as f:
+        reader = csv.reader(f)
+        cols = next(reader)
+        rows = list(zip(*reader))
+    if not rows:
+        rows = [tuple() for _ in cols]
+    col_dict = dict(zip(cols, rows))
+    asns: np.ndarray = np.array(col_dict["asn"], dtype=np.int64)
+    # np.unique returns the first of each, so search the reversed ASNs
+    _, reversed_idx = np.unique(asns[::-1], return_index=True)
+    last: np.ndarray = len(asns) - 1 - reversed_idx
+    table = ROVTable(
+        asns=asns[last],
+        filtering=np.array(col_dict["filtering"], dtype=object)[last],
+        confidence=np.array(col_dict["confidence"],
+                            dtype=np.float64)[last],
+        source=np.array(col_dict["source"], dtype=object)[last])
+    for arr in table:
+        arr.setflags(write=False)
+    return table
+
+
+def _add_extra_csv_info(self, path: Path, asns: Optional[Set[int]] = None):
+    """Adds info from CSVs to ASNs (only to asns, if given)"""
+
+    self._join_rov_table(read_rov_table(path), asns)
+
+
+def reannotate(self, rov: Union[str, "os.PathLike[str]", ROVTable]):
+    """Replaces the ROV info of every AS with a CSV's or a table's
+
+    rov is an ROVTable or the path of a CSV. ASes that aren't in it go
+    back to the defaults. Nothing else about the graph changes
+    """
+
+    table: ROVTable = (rov if isinstance(rov, ROVTable)
+                       else read_rov_table(Path(rov)))
+    for attr in ROV_ATTRS:
+        self.attrs.reset(attr)
+    self._join_rov_table(table)
+
+
+def _join_rov_table(self, table: ROVTable, asns: Optional[Set[int]] = None):
+    """Sets the ROV info of ASes in table (only of asns, if given)"""
+
+    if not len(self.ases) or not len(table.asns):
+        return
+    idx_to_asn: np.ndarray = self.idx_to_asn
+    positions: np.ndarray = np.minimum(
+        np.searchsorted(table.asns, idx_to_asn), len(table.asns) - 1)
+    matched: np.ndarray = table.asns[positions] == idx_to_asn
+    if asns is not None:
+        matched &= np.isin(idx_to_asn,
+                           np.array(sorted(asns), dtype=np.int64))
+    as_idxs: np.ndarray = np.flatnonzero(matched)
+    rows: np.ndarray = positions[as_idxs]
+    for attr, column in zip(ROV_ATTRS, table[1:]):
+        self.attrs[attr][as_idxs] = column[rows]
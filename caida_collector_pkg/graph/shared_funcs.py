@@ -0,0 +1,72 @@
+"""Functions to write the graph's topology to one file for BGPDAGViews
+
+Process pool workers otherwise rebuild the graph or unpickle ~75k AS
+objects each, and refcounting then dirties every copy on write page.
+Instead the graph is written once, and each worker memory maps it with a
+read only BGPDAGView, so the pages are shared between every worker.
+Putting the file in /dev/shm keeps it in shared memory.
+
+The file is a single int64 .npy (like the edge cache):
+header: SHARED_MAGIC, SHARED_VERSION, number of ASes, then the number of
+        customer, provider and peer entries
+ASNs, ASN sort order, propagation ranks and customer cone sizes (-1 for
+None), flags (the *_FLAG bits of base_as), ixp, then the indptr and
+indices of each SHARED_RELS relationship (see csr_funcs)
+"""
+
+import os
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from typing import List
+
+import numpy as np
+
+
+# Marks the file as a shared graph
+SHARED_MAGIC = 0x43414944414756
+# Bump whenever the layout changes
+SHARED_VERSION = 1
+SHARED_HEADER_LEN = 6
+# Relationships stored as CSR arrays, in order
+SHARED_RELS = ("customers", "providers", "peers")
+# Arrays with a value per AS, in order
+SHARED_AS_ARRAYS = ("idx_to_asn", "asn_order", "propagation_rank",
+                    "customer_cone_size", "as_flags", "ixp")
+
+
+def to_shared(self, path: Path):
+    """Writes the topology to path, for BGPDAGViews to memory map"""
+
+    csrs = [self.csr(rel) for rel in SHARED_RELS]
+    header: List[int] = [SHARED_MAGIC,
+                         SHARED_VERSION,
+                         len(self.ases)] + [len(x[1]) for x in csrs]
+    arr: np.ndarray = np.concatenate([
+        np.array(header, dtype=np.int64),
+        self.idx_to_asn,
+        np.argsort(self.idx_to_asn, kind="stable"),
+        # -1 is used for None
+        np.array([-1 if x.propagation_rank is None else x.propagation_rank
+                  for x in self.ases], dtype=np.int64),
+        np.array([-1 if x.customer_cone_size is None
+                  else x.customer_cone_size for x in self.ases],
+                 dtype=np.int64),
+        self.as_flags,
+        np.array([x.ixp for x in self.ases], dtype=np.int64)]
+        + [x for csr_arrays in csrs for x in csr_arrays])
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Write then move so that workers never attach to a partial file.
+    # The tmp file is unique per writer, since several may write at once
+    with NamedTemporaryFile(dir=str(path.parent),
+                            prefix=path.name + ".",
+                            suffix=".tmp",
+                            delete=False) as f:
+        tmp_path: Path = Path(f.name)
+        try:
+            np.save(f, arr)
+        except BaseException:
+            f.close()
+            tmp_path.unlink()
+            raise
+    os.replace(str(tmp_path), str(path))
@@ -0,0 +1,123 @@
+"""Functions to save a finished graph to a binary snapshot and reload it
+
+The snapshot is an uncompressed .npz of flat arrays in as_dict order:
+ASNs, ranks, cone sizes, flags, ROV info, and the customers/providers/peers
+of every AS as CSR (indptr/indices) arrays that keep the tuple order (the
+graph's own CSR arrays, see csr_funcs). This reloads without propagation
+ranks, customer cones or the ROV CSV join
+"""
+
+import os
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+import numpy as np
+
+from .base_as import AS
+
+
+# Bump whenever the snapshot layout changes so old snapshots are rebuilt
+SNAPSHOT_VERSION = 2
+# Relationships stored as CSR arrays
+SNAPSHOT_RELS = ("peers", "providers", "customers")
+
+
+def to_snapshot(self, path: Path):
+    """Writes the finished graph to a binary snapshot"""
+
+    arrays: Dict[str, np.ndarray] = {
+        "version": np.array([SNAPSHOT_VERSION], dtype=np.int64),
+        "as_cls": np.array([type(self.ases[0]).__name__ if self.ases
+                            else AS.__name__]),
+        "asns": self.idx_to_asn,
+        # -1 is used for None
+        "propagation_rank": np.array(
+            [-1 if x.propagation_rank is None else x.propagation_rank
+             for x in self.ases], dtype=np.int64),
+        "customer_cone_size": np.array(
+            [-1 if x.customer_cone_size is None else x.customer_cone_size
+             for x in self.ases], dtype=np.int64),
+        "ixp": np.array([x.ixp for x in self.ases], dtype=bool),
+        "input_clique": np.array([x.input_clique for x in self.ases],
+                                 dtype=bool),
+        "rov_filtering": np.array(self.attrs["rov_filtering"], dtype=str),
+        "rov_source": np.array(self.attrs["rov_source"], dtype=str),
+        "rov_confidence": self.attrs["rov_confidence"]}
+
+    for rel in SNAPSHOT_RELS:
+        arrays[f"{rel}_indptr"], arrays[f"{rel}_indices"] = self.csr(rel)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Write then move so that a failed write never leaves a bad snapshot.
+    # The tmp file is unique per writer, since jobs may build the same month
+    with NamedTemporaryFile(dir=str(path.parent),
+                            prefix=path.name + ".",
+                            suffix=".tmp",
+                            delete=False) as f:
+        tmp_path: Path = Path(f.name)
+        try:
+            np.savez(f, **arrays)  # type: ignore
+        except BaseException:
+            f.close()
+            tmp_path.unlink()
+            raise
+    os.replace(str(tmp_path), str(path))
+
+
+@classmethod  # type: ignore
+def from_snapshot(cls,
+                  path: Path,
+                  BaseASCls: Type[AS] = AS) -> Optional[Any]:
+    """Reloads a graph from a snapshot written by to_snapshot
+
+    Returns None if the snapshot is from a different snapshot version
+    or was written with a different BaseASCls
+    """
+
+    with np.load(str(path)) as npz:
+        if (int(npz["version"][0]) != SNAPSHOT_VERSION
+                or str(npz["as_cls"][0]) != BaseASCls.__name__):
+            return None
+        asns: List[int] = npz["asns"].tolist()
+        ranks: List[int] = npz["propagation_rank"].tolist()
+        cone_sizes: List[int] = npz["customer_cone_size"].tolist()
+        ixps: List[bool] = npz["ixp"].tolist()
+        input_cliques: List[bool] = npz["input_clique"].tolist()
+        rov_filterings: List[str] = npz["rov_filtering"].tolist()
+        rov_sources: List[str] = npz["rov_source"].tolist()
+        rov_confidences: np.ndarray = npz["rov_confidence"]
+        rels: Dict[str, List[Tuple[int, ...]]] = dict()
+        csrs: Dict[str, Tuple[np.ndarray, np.ndarray]] = dict()
+        for rel in SNAPSHOT_RELS:
+            csrs[rel] = (npz[f"{rel}_indptr"], npz[f"{rel}_indices"])
+            indptr: List[int] = csrs[rel][0].tolist()
+            # Store ASNs rather than indices, the graph converts to refs
+            rel_asns: List[int] = npz["asns"][csrs[rel][1]].tolist()
+            rels[rel] = [tuple(rel_asns[start:end])
+                         for start, end in zip(indptr[:-1], indptr[1:])]
+
+    as_dict: Dict[int, AS] = dict()
+    for i, asn in enumerate(asns):
+        as_obj = BaseASCls(asn=asn,
+                           input_clique=input_cliques[i],
+                           ixp=ixps[i],
+                           peers=rels["peers"][i],  # type: ignore
+                           providers=rels["providers"][i],  # type: ignore
+                           customers=rels["customers"][i],  # type: ignore
+                           customer_cone_size=(None if cone_sizes[i] == -1
+                                               else cone_sizes[i]),
+                           propagation_rank=(None if ranks[i] == -1
+                                             else ranks[i]))
+        as_dict[asn] = as_obj
+
+    # The yaml path converts the ASNs to refs without rebuilding anything
+    bgp_dag = cls(set(), set(), yaml_as_dict=as_dict)
+    # ROV info is set by column, in the same order
+    bgp_dag.attrs["rov_filtering"] = rov_filterings
+    bgp_dag.attrs["rov_source"] = rov_sources
+    bgp_dag.attrs["rov_confidence"] = rov_confidences
+    # The graph's ASes are in the same order, so the CSR arrays are too
+    for rel, (rel_indptr, rel_indices) in csrs.items():
+        bgp_dag._set_csr(rel, rel_indptr, rel_indices)
+    return bgp_dag
@@ -0,0 +1,112 @@
+"""Functions to extract small graphs from a graph
+
+The subgraph induced by a set of ASNs keeps every link between them, in
+the same tuple order, and each AS's class, IXP/input clique flags and
+attr columns (see attr_funcs). Nothing goes through the graph building
+pipeline: only the subgraph's ASes and their links are visited, and
+ranks and cone sizes are computed for the subgraph alone
+"""
+
+from typing import Any, Dict, Iterable, List, Set, Tuple
+
+import numpy as np
+
+from .base_as import AS
+from .csr_funcs import CSR_TYPE
+from .graph_building_funcs import SETUP_RELS
+
+
+def subgraph(self, asns: Iterable[int]) -> Any:
+    """Returns a new graph of asns and the links between them"""
+
+    asn_set: Set[int] = set(asns)
+    missing: Set[int] = asn_set - self.as_dict.keys()
+    if missing:
+        raise Exception(f"ASNs not in the graph: {sorted(missing)}")
+
+    # Ranked before the ASes are built, so the graph sorts them once
+    ranks: Dict[int, int] = self._rank_asns(asn_set)
+    new_as_dict: Dict[int, AS] = dict()
+    unlinked: List[AS] = list()
+    for asn in sorted(asn_set):
+        as_obj: AS = self.as_dict[asn]
+        # ASNs for now, the graph converts them to refs
+        rels: List[Tuple[int, ...]] = [
+            tuple([x.asn for x in getattr(as_obj, rel) if x.asn in asn_set])
+            for rel in SETUP_RELS]
+        new_as_obj: AS = type(as_obj)(
+            asn=asn,
+            input_clique=as_obj.input_clique,
+            ixp=as_obj.ixp,
+            peers=rels[0],  # type: ignore
+            providers=rels[1],  # type: ignore
+            customers=rels[2],  # type: ignore
+            propagation_rank=ranks[asn])
+        # The same order as building the graph: ASes with links first
+        if any(rels):
+            new_as_dict[asn] = new_as_obj
+        else:
+            unlinked.append(new_as_obj)
+    for new_as_obj in unlinked:
+        new_as_dict[new_as_obj.asn] = new_as_obj
+
+    # Ranks are already assigned, so this only adds the links and sorts
+    # ASes into ranks
+    sub_dag = self.__class__(set(),
+                             set(),
+                             yaml_as_dict=new_as_dict,
+                             cone_cache_size=self.cone_cache_size)
+    sub_dag._get_customer_cone_size()
+
+    if sub_dag.ases:
+        old_idxs: np.ndarray = np.array(
+            [self.asn_to_idx[x] for x in new_as_dict], dtype=np.int64)
+        for attr, column in sub_dag.attrs.items():
+            if attr in self.attrs:
+                column[:] = self.attrs[attr][old_idxs]
+    return sub_dag
+
+
+def cone_subgraph(self, asn: int) -> Any:
+    """Returns the subgraph of an AS and its customer cone"""
+
+    return self.subgraph(self.customer_cone(asn) | {asn})
+
+
+def khop(self, asns: Iterable[int], k: int) -> Any:
+    """Returns the subgraph of ASes at most k links away from asns
+
+    Links in any direction (customers, providers or peers) count
+    """
+
+    if k < 0:
+        raise Exception(f"k must be at least 0, not {k}")
+    asn_set: Set[int] = set(asns)
+    missing: Set[int] = asn_set - self.as_dict.keys()
+    if missing:
+        raise Exception(f"ASNs not in the graph: {sorted(missing)}")
+    visited: np.ndarray = np.zeros(len(self.ases), dtype=bool)
+    frontier: np.ndarray = np.array(
+        sorted(self.asn_to_idx[x] for x in asn_set), dtype=np.int64)
+    visited[frontier] = True
+    for _ in range(k):
+        if not len(frontier):
+            break
+        neighbors: np.ndarray = np.concatenate([
+            _csr_rows(self.csr(rel), frontier) for rel in SETUP_RELS])
+        frontier = np.unique(neighbors[~visited[neighbors]])
+        visited[frontier] = True
+    return self.subgraph(self.idx_to_asn[visited].tolist())
+
+
+def _csr_rows(csr_arrays: CSR_TYPE, rows: np.ndarray) -> np.ndarray:
+    """Returns the indices of every row in rows, concatenated"""
+
+    indptr, indices = csr_arrays
+    starts: np.ndarray = indptr[rows]
+    lens: np.ndarray = indptr[rows + 1] - starts
+    # Position of each entry within its row, added to the row's start
+    offsets: np.ndarray = (np.arange(int(lens.sum()))
+                           - np.repeat(np.cumsum(lens) - lens, lens))
+    row_indices: np.ndarray = indices[np.repeat(starts, lens) + offsets]
+    return row_indices
@@ -0,0 +1,27 @@
+from pathlib import Path
+
+import pytest
+
+from ..bgp_dag import BGPDAG
+from ...caida_collector import CaidaCollector
+
+_decoded_path: Path = (Path(__file__).parent.parent.parent / "caida_collector"
+                       / "tests" / "examples" / "20210901.as-rel2.decoded")
+
+
+def _gen_bgp_dag() -> BGPDAG:
+    """Builds the BGPDAG of the decoded example file"""
+
+    collector = CaidaCollector()
+    with _decoded_path.open(mode="r") as f:
+        edges = collector._get_edges(x.strip() for x in f)
+    cp_links, peer_links = collector._links_from_edge_arrays(edges)
+    return BGPDAG(cp_links,
+                  peer_links,
+                  ixps=edges.ixps,
+                  input_clique=edges.input_clique)
+
+
+@pytest.fixture(scope="function")
+def bgp_dag() -> BGPDAG:
+    return _gen_bgp_dag()
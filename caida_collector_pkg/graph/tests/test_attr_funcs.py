@@ -0,0 +1,107 @@
+import numpy as np
+import pytest
+
+from ..attr_table import AttrTable
+from ..base_as import AS
+from ..bgp_dag import BGPDAG
+from ...links import CustomerProviderLink as CPLink
+
+
+class AttrTestAS(AS):
+    attr_columns = {**AS.attr_columns, "policy": (np.int64, 0)}
+
+
+@pytest.mark.attr_funcs
+class TestAttrFuncs:
+    def test_columns(self, bgp_dag: BGPDAG):
+        """Properties read the columns, in dense index order"""
+
+        assert set(bgp_dag.attrs) == set(AS.attr_columns)
+        for attr in AS.attr_columns:
+            assert (bgp_dag.attrs.tolist(attr)
+                    == [getattr(x, attr) for x in bgp_dag])
+        # Columns hold the real default, so reductions work as is
+        confidence = bgp_dag.attrs["rov_confidence"]
+        assert not np.isnan(confidence).any()
+        assert (confidence[bgp_dag.attrs["rov_source"] == ""] == -1).all()
+        assert confidence.min() == -1
+        for as_obj in bgp_dag:
+            if as_obj.rov_source == "":
+                assert as_obj.db_row["rov_confidence"] == "-1"
+
+    def test_writes(self, bgp_dag: BGPDAG):
+        """Properties and columns write to the same place"""
+
+        as_obj = bgp_dag.ases[3]
+        as_obj.rov_source = "test"
+        assert bgp_dag.attrs["rov_source"][3] == "test"
+        bgp_dag.attrs["rov_confidence"][[3, 4]] = .5
+        assert as_obj.rov_confidence == .5
+        assert bgp_dag.ases[4].rov_confidence == .5
+        as_obj.rov_confidence = -1.0
+        assert bgp_dag.attrs["rov_confidence"][3] == -1
+        assert as_obj.rov_confidence == -1
+        # Written as the default
+        assert as_obj.db_row["rov_confidence"] == "-1"
+
+    def test_reduction(self, bgp_dag: BGPDAG):
+        """i.e. ROV filtering ASes per propagation rank"""
+
+        ranks = bgp_dag.to_columnar().ases["propagation_rank"]
+        counts = np.bincount(ranks[bgp_dag.attrs["rov_filtering"] != ""],
+                             minlength=len(bgp_dag.propagation_ranks))
+        assert counts.tolist() == [
+            len([x for x in rank if x.rov_filtering])
+            for rank in bgp_dag.propagation_ranks]
+
+    def test_subclass(self):
+        """Subclasses add columns, which keep values set before the graph"""
+
+        as_obj = AttrTestAS(asn=1, ixp=True, propagation_rank=0)
+        assert as_obj.policy == 0  # type: ignore
+        as_obj.policy = 5  # type: ignore
+        bgp_dag = BGPDAG(set(), set(), yaml_as_dict={1: as_obj})
+        assert bgp_dag.attrs["policy"].tolist() == [5]
+        assert as_obj.policy == 5  # type: ignore
+
+        bgp_dag = BGPDAG({CPLink(provider_asn=1, customer_asn=2)},
+                         set(),
+                         BaseASCls=AttrTestAS)
+        bgp_dag.as_dict[2].policy = 3  # type: ignore
+        bgp_dag.attrs["policy"][bgp_dag.asn_to_idx[1]] = 7
+        assert bgp_dag.as_dict[1].policy == 7  # type: ignore
+        assert bgp_dag.attrs["policy"][bgp_dag.asn_to_idx[2]] == 3
+
+    def test_apply_diff(self, bgp_dag: BGPDAG):
+        """Values move with their ASes when the graph changes"""
+
+        for i, as_obj in enumerate(bgp_dag):
+            as_obj.rov_source = str(i)
+        expected = {x.asn: x.rov_source for x in bgp_dag}
+        bgp_dag.apply_diff([CPLink(provider_asn=2**31 - 1,
+                                   customer_asn=2**31 - 2)],
+                           [], [], [])
+        for as_obj in bgp_dag:
+            assert as_obj.rov_source == expected.get(as_obj.asn, "")
+            assert as_obj._attrs is bgp_dag.attrs
+        assert bgp_dag.attrs.tolist("rov_source") == [x.rov_source
+                                                      for x in bgp_dag]
+
+
+@pytest.mark.attr_funcs
+class TestAttrTable:
+    def test_table(self):
+        table = AttrTable(3)
+        table.add("x", np.float64, -1)
+        table.add("y", object, "")
+        assert table.tolist("x") == [-1] * 3
+        assert table.default("x") == -1 and type(table.default("x")) is int
+        table.set_value("x", 1, 2.5)
+        table["y"] = ["a", "b", "c"]
+        assert table.get_value("x", 1) == 2.5
+        assert table.tolist("y") == ["a", "b", "c"]
+        table.reset("y")
+        assert table.tolist("y") == [""] * 3
+        assert len(table) == 2 and "x" in table
+        with pytest.raises(Exception, match="already a column"):
+            table.add("x", np.float64, -1)
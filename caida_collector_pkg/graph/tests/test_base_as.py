@@ -0,0 +1,99 @@
+from pathlib import Path
+
+import pytest
+import yaml
+from yamlable import YamlAble
+
+from ..base_as import AS
+from ..bgp_dag import BGPDAG
+from ...links import CustomerProviderLink as CPLink
+from ...links import PeerLink
+
+
+class YamlTestAS(AS):
+    pass
+
+
+def _rows(bgp_dag: BGPDAG):
+    """yaml keeps everything but ROV info, and sorts the ASNs"""
+
+    return [(type(x), x.__to_yaml_dict__(), x.db_row["stubs"])
+            for x in sorted(bgp_dag)]
+
+
+def _loaded_info(as_obj: AS):
+    """What a loaded AS keeps. Its neighbors are ASNs, not ASes"""
+
+    return (type(as_obj),
+            as_obj.asn,
+            as_obj.peers,
+            as_obj.customers,
+            as_obj.providers,
+            as_obj.ixp,
+            as_obj.input_clique,
+            as_obj.customer_cone_size,
+            as_obj.propagation_rank)
+
+
+@pytest.mark.base_as
+class TestBaseAS:
+    def test_slots(self):
+        """ASes have no __dict__, so no setup sets either"""
+
+        as_obj = AS(asn=1)
+        assert not hasattr(as_obj, "__dict__")
+        with pytest.raises(AttributeError):
+            as_obj.peers_setup_set = set()  # type: ignore
+        assert isinstance(as_obj, YamlAble)
+
+    def test_setup_sets_not_kept(self, bgp_dag: BGPDAG):
+        """Relationships are tuples once the graph is built"""
+
+        for as_obj in bgp_dag:
+            for rel in ("peers", "providers", "customers"):
+                assert isinstance(getattr(as_obj, rel), tuple)
+
+    def test_yaml_round_trip(self, bgp_dag: BGPDAG):
+        reloaded = BGPDAG.loads_yaml(bgp_dag.dumps_yaml())
+        assert _rows(reloaded) == _rows(bgp_dag)
+
+    def test_as_yaml_round_trip(self, tmp_path: Path):
+        """A single AS keeps YamlAble's methods, with ASNs as neighbors"""
+
+        as_obj = YamlTestAS(asn=1,
+                            ixp=True,
+                            peers=(AS(asn=2),),
+                            customers=(AS(asn=3), AS(asn=4)),
+                            customer_cone_size=2,
+                            propagation_rank=1)
+        dumped = as_obj.dumps_yaml()
+        assert "!yamlable/YamlTestAS" in dumped
+        assert "python/tuple" not in yaml.dump(as_obj)
+        for reloaded in (YamlTestAS.loads_yaml(dumped),
+                         YamlAble.loads_yaml(yaml.dump(as_obj))):
+            assert _loaded_info(reloaded) == _loaded_info(YamlTestAS(
+                asn=1,
+                ixp=True,
+                peers=(2,),  # type: ignore
+                customers=(3, 4),  # type: ignore
+                customer_cone_size=2,
+                propagation_rank=1))
+
+        path = tmp_path / "as.yaml"
+        as_obj.dump_yaml(str(path))
+        assert (_loaded_info(YamlTestAS.load_yaml(str(path)))
+                == _loaded_info(reloaded))
+        with pytest.raises(Exception):
+            YamlTestAS.loads_yaml(AS(asn=1).dumps_yaml())
+
+    def test_subclass_yaml_round_trip(self):
+        """Subclasses keep their own yaml tag and class"""
+
+        bgp_dag = BGPDAG({CPLink(provider_asn=1, customer_asn=2)},
+                         {PeerLink(1, 3)},
+                         BaseASCls=YamlTestAS)
+        dumped = bgp_dag.dumps_yaml()
+        assert "!yamlable/YamlTestAS" in dumped
+        reloaded = BGPDAG.loads_yaml(dumped)
+        assert all(type(x) is YamlTestAS for x in reloaded)
+        assert _rows(reloaded) == _rows(bgp_dag)
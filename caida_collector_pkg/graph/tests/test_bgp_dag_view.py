@@ -0,0 +1,111 @@
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import pickle
+from typing import List
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from ..bgp_dag import BGPDAG
+from ..bgp_dag_view import BGPDAGView
+from ..csr_funcs import CSR_RELS
+
+
+def _worker_customers(view: BGPDAGView, asn: int):
+    """Returns an AS's customers from a view sent to a worker"""
+
+    return view.neighbors(asn, "customers").tolist()
+
+
+@pytest.fixture(scope="function")
+def view(bgp_dag: BGPDAG, tmp_path: Path) -> BGPDAGView:
+    path = tmp_path / "dag.npy"
+    bgp_dag.to_shared(path)
+    return BGPDAGView(path)
+
+
+@pytest.mark.bgp_dag_view
+class TestBGPDAGView:
+    def test_arrays(self, bgp_dag: BGPDAG, view: BGPDAGView):
+        """Per AS arrays match the graph"""
+
+        assert len(view) == len(bgp_dag)
+        assert view.idx_to_asn.tolist() == bgp_dag.idx_to_asn.tolist()
+        assert view.as_flags.tolist() == bgp_dag.as_flags.tolist()
+        assert (view.propagation_rank.tolist()
+                == [x.propagation_rank for x in bgp_dag])
+        assert (view.customer_cone_size.tolist()
+                == [x.customer_cone_size for x in bgp_dag])
+        assert view.ixp.tolist() == [x.ixp for x in bgp_dag]
+        assert view.input_clique.tolist() == [x.input_clique
+                                              for x in bgp_dag]
+
+    @pytest.mark.parametrize("rel", CSR_RELS)
+    def test_csr(self, bgp_dag: BGPDAG, view: BGPDAGView, rel: str):
+        """CSR arrays and neighbors match the graph"""
+
+        for expected, actual in zip(bgp_dag.csr(rel), view.csr(rel)):
+            assert np.array_equal(expected, actual)
+        for as_obj in bgp_dag:
+            assert (view.neighbors(as_obj.asn, rel).tolist()
+                    == [x.asn for x in getattr(as_obj, rel)])
+
+    def test_read_only(self, view: BGPDAGView):
+        """Every array is a read only slice of the memory map"""
+
+        for arr in (view.idx_to_asn, view.as_flags, *view.peers_csr):
+            assert not arr.flags.writeable
+            assert isinstance(arr, np.memmap)
+
+    def test_indices(self, bgp_dag: BGPDAG, view: BGPDAGView):
+        for asn, idx in bgp_dag.asn_to_idx.items():
+            assert view.indices(asn) == idx
+        asns = list(bgp_dag.asn_to_idx)[::-1]
+        assert (view.indices(asns).tolist()  # type: ignore
+                == [bgp_dag.asn_to_idx[x] for x in asns])
+        with pytest.raises(Exception, match="not in the graph"):
+            view.indices(max(asns) + 1)
+
+    def test_pickle(self, view: BGPDAGView):
+        """Only the path is pickled"""
+
+        assert len(pickle.dumps(view)) < 1000
+        reloaded = pickle.loads(pickle.dumps(view))
+        assert np.array_equal(reloaded.idx_to_asn, view.idx_to_asn)
+
+    def test_workers(self, bgp_dag: BGPDAG, view: BGPDAGView):
+        """Workers attach to the same file"""
+
+        as_obj = max(bgp_dag, key=lambda x: len(x.customers))
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            customers = executor.submit(_worker_customers,
+                                        view,
+                                        as_obj.asn).result()
+        assert customers == [x.asn for x in as_obj.customers]
+
+    def test_concurrent_writers(self, bgp_dag: BGPDAG, tmp_path: Path):
+        """Writers of the same file don't share a tmp file"""
+
+        path = tmp_path / "dag.npy"
+        save = np.save
+        nested: List[bool] = []
+
+        def save_during_another_write(f, arr):
+            save(f, arr)
+            # Another process writes the whole file in the middle of this
+            if not nested:
+                nested.append(True)
+                bgp_dag.to_shared(path)
+
+        with patch.object(np, "save", side_effect=save_during_another_write):
+            bgp_dag.to_shared(path)
+        view = BGPDAGView(path)
+        assert view.idx_to_asn.tolist() == [x.asn for x in bgp_dag]
+        assert list(tmp_path.iterdir()) == [path]
+
+    def test_bad_file(self, tmp_path: Path):
+        path = tmp_path / "bad.npy"
+        np.save(str(path), np.arange(10, dtype=np.int64))
+        with pytest.raises(Exception, match="isn't a graph"):
+            BGPDAGView(path)
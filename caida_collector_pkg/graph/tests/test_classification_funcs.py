@@ -0,0 +1,86 @@
+import pytest
+
+from ..base_as import AS
+from ..base_as import INPUT_CLIQUE_FLAG
+from ..base_as import MULTIHOMED_FLAG
+from ..base_as import STUB_FLAG
+from ..base_as import TRANSIT_FLAG
+from ..bgp_dag import BGPDAG
+
+
+def _computed(as_obj: AS):
+    """stub, multihomed, transit, stubs and neighbors without the cache"""
+
+    neighbors = as_obj.customers + as_obj.peers + as_obj.providers
+    return (len(neighbors) == 1,
+            (len(as_obj.customers) == 0
+             and len(as_obj.peers) + len(as_obj.providers) > 1),
+            len(as_obj.customers) > 1,
+            tuple([x for x in as_obj.customers
+                   if len(x.customers + x.peers + x.providers) == 1]),
+            neighbors)
+
+
+def _cached(as_obj: AS):
+    return (as_obj.stub,
+            as_obj.multihomed,
+            as_obj.transit,
+            as_obj.stubs,
+            as_obj.neighbors)
+
+
+@pytest.mark.classification_funcs
+class TestClassificationFuncs:
+    def test_flags(self, bgp_dag: BGPDAG):
+        """Cached classifications match computing them from scratch"""
+
+        for as_obj in bgp_dag:
+            assert as_obj._flags is not None
+            assert _cached(as_obj) == _computed(as_obj)
+            # Cached, so not rebuilt on every access
+            assert as_obj.neighbors is as_obj.neighbors
+
+    def test_as_flags(self, bgp_dag: BGPDAG):
+        """The flag array is in dense index order"""
+
+        assert bgp_dag.as_flags.tolist() == [x._flags for x in bgp_dag]
+        assert not bgp_dag.as_flags.flags.writeable
+        bits = (STUB_FLAG, MULTIHOMED_FLAG, TRANSIT_FLAG, INPUT_CLIQUE_FLAG)
+        assert any(x & flag for flag in bits for x in bgp_dag.as_flags)
+
+    def test_category_sets(self, bgp_dag: BGPDAG):
+        assert bgp_dag.stub_ases == set([x for x in bgp_dag if x.stub])
+        assert bgp_dag.mh_ases == set([x for x in bgp_dag if x.multihomed])
+        assert bgp_dag.stub_or_mh_ases == bgp_dag.stub_ases | bgp_dag.mh_ases
+        assert bgp_dag.input_clique_ases == set([x for x in bgp_dag
+                                                 if x.input_clique])
+        assert bgp_dag.etc_ases == set([x for x in bgp_dag if not
+                                        (x.stub or x.multihomed
+                                         or x.input_clique)])
+        for attr in ("stub", "mh", "stub_or_mh", "input_clique", "etc"):
+            assert getattr(bgp_dag, f"{attr}_asns") == set(
+                [x.asn for x in getattr(bgp_dag, f"{attr}_ases")])
+        assert bgp_dag.stub_ases and bgp_dag.mh_ases and bgp_dag.etc_ases
+
+    def test_yaml_classified(self, bgp_dag: BGPDAG):
+        reloaded = BGPDAG.loads_yaml(bgp_dag.dumps_yaml())
+        assert reloaded.stub_asns == bgp_dag.stub_asns
+        assert reloaded.etc_asns == bgp_dag.etc_asns
+        for as_obj in reloaded:
+            assert _cached(as_obj) == _computed(as_obj)
+
+    def test_unclassified_as(self):
+        """ASes outside of a graph compute their classifications"""
+
+        provider, customer = AS(asn=1), AS(asn=2)
+        provider.customers = (customer,)
+        customer.providers = (provider,)
+        assert provider._flags is None
+        assert _cached(provider) == _computed(provider)
+        assert _cached(customer) == _computed(customer)
+
+    def test_clear_classification(self, bgp_dag: BGPDAG):
+        as_obj = next(x for x in bgp_dag if x.stub)
+        as_obj._clear_classification()
+        as_obj.peers = as_obj.peers + (AS(asn=10 ** 9),)
+        assert not as_obj.stub
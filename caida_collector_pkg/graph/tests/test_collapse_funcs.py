@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from ..bgp_dag import BGPDAG
+
+
+@pytest.mark.collapse_funcs
+class TestCollapseFuncs:
+    def test_collapse_stubs(self, bgp_dag: BGPDAG):
+        """Only single homed stubs are folded, and weights count them"""
+
+        collapsed = bgp_dag.collapse_stubs()
+        reduced = collapsed.dag
+        assert collapsed.folded
+        for stub_asn, provider_asn in collapsed.folded.items():
+            as_obj = bgp_dag.as_dict[stub_asn]
+            assert as_obj.stub and not as_obj.ixp and not as_obj.input_clique
+            assert [x.asn for x in as_obj.providers] == [provider_asn]
+        for as_obj in bgp_dag:
+            if as_obj.asn not in collapsed.folded:
+                assert not (as_obj.stub and len(as_obj.providers) == 1
+                            and not as_obj.ixp and not as_obj.input_clique)
+        assert (set(reduced.as_dict)
+                == set(bgp_dag.as_dict) - set(collapsed.folded))
+        assert collapsed.weights.sum() == len(bgp_dag)
+        for as_obj in reduced:
+            assert (collapsed.weights[reduced.asn_to_idx[as_obj.asn]]
+                    == 1 + list(collapsed.folded.values()).count(as_obj.asn))
+        assert len(reduced.propagation_ranks) <= len(
+            bgp_dag.propagation_ranks)
+
+    def test_expand(self, bgp_dag: BGPDAG):
+        """Folded stubs take their provider's value"""
+
+        collapsed = bgp_dag.collapse_stubs()
+        values = {x.asn: x.asn for x in collapsed.dag}
+        expanded = collapsed.expand(values)
+        assert list(expanded) == [x.asn for x in bgp_dag]
+        for asn, value in expanded.items():
+            assert value == collapsed.folded.get(asn, asn)
+        assert (collapsed.expand_array(collapsed.dag.idx_to_asn).tolist()
+                == list(expanded.values()))
+        # ASes without values stay without them
+        provider_asn = next(iter(collapsed.folded.values()))
+        del values[provider_asn]
+        assert set(collapsed.expand(values)) == set(
+            asn for asn, value in expanded.items() if value != provider_asn)
+
+    def test_cones(self, bgp_dag: BGPDAG):
+        """Expanding a reduced cone gives the original cone"""
+
+        collapsed = bgp_dag.collapse_stubs()
+        reduced = collapsed.dag
+        for as_obj in sorted(reduced, key=lambda x: x.customer_cone_size,
+                             reverse=True)[:20]:
+            cone_idxs = [reduced.asn_to_idx[x] for x in
+                         reduced.customer_cone(as_obj.asn) | {as_obj.asn}]
+            in_cone = np.isin(collapsed.idx_map, cone_idxs)
+            expanded = set(bgp_dag.idx_to_asn[in_cone].tolist())
+            assert (expanded - {as_obj.asn}
+                    == bgp_dag.customer_cone(as_obj.asn))
+
+    def test_keep(self, bgp_dag: BGPDAG):
+        stub_asn = next(iter(bgp_dag.collapse_stubs().folded))
+        collapsed = bgp_dag.collapse_stubs(keep={stub_asn})
+        assert stub_asn not in collapsed.folded
+        assert stub_asn in collapsed.dag.as_dict
+        with pytest.raises(Exception, match="not in the graph"):
+            bgp_dag.collapse_stubs(keep={2**31})
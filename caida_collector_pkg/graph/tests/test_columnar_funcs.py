@@ -0,0 +1,84 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from ..bgp_dag import BGPDAG
+from ..columnar_funcs import AS_COLUMNS, CP_REL, EDGE_COLUMNS, PEER_REL
+
+
+def _edges(bgp_dag: BGPDAG):
+    """Returns the set of (src, dst, rel) of every link in the graph"""
+
+    edges = set()
+    for as_obj in bgp_dag:
+        for customer in as_obj.customers:
+            edges.add((as_obj.asn, customer.asn, CP_REL))
+        for peer in as_obj.peers:
+            edges.add((min(as_obj.asn, peer.asn),
+                       max(as_obj.asn, peer.asn),
+                       PEER_REL))
+    return edges
+
+
+def _assert_same(expected, actual):
+    """Asserts that both tables have equal columns"""
+
+    for table in ("ases", "edges"):
+        assert (set(getattr(expected, table))
+                == set(getattr(actual, table)))
+        for col, arr in getattr(expected, table).items():
+            assert getattr(actual, table)[col].tolist() == arr.tolist()
+
+
+@pytest.mark.columnar_funcs
+class TestColumnarFuncs:
+    def test_tables(self, bgp_dag: BGPDAG):
+        """Rows match the ASes and every link is in the edge table once"""
+
+        tables = bgp_dag.to_columnar()
+        assert tuple(tables.ases) == AS_COLUMNS
+        assert tuple(tables.edges) == EDGE_COLUMNS
+        ases = tables.ases
+        for i, as_obj in enumerate(bgp_dag):
+            assert ases["asn"][i] == as_obj.asn
+            assert ases["propagation_rank"][i] == as_obj.propagation_rank
+            assert ases["customer_cone_size"][i] == as_obj.customer_cone_size
+            assert ases["flags"][i] == as_obj._flags
+            assert ases["ixp"][i] == as_obj.ixp
+            assert ases["input_clique"][i] == as_obj.input_clique
+            assert ases["rov_filtering"][i] == as_obj.rov_filtering
+            assert ases["rov_confidence"][i] == as_obj.rov_confidence
+            assert ases["rov_source"][i] == as_obj.rov_source
+
+        rows = list(zip(*[tables.edges[x].tolist() for x in EDGE_COLUMNS]))
+        assert len(rows) == len(set(rows))
+        assert set(rows) == _edges(bgp_dag)
+
+    @pytest.mark.parametrize("fmt,name", [("npy", "dag"),
+                                          ("npz", "dag.npz")])
+    def test_round_trip(self, bgp_dag: BGPDAG, tmp_path: Path, fmt, name):
+        """Written tables read back the same"""
+
+        path = tmp_path / name
+        tables = bgp_dag.to_columnar(path, fmt=fmt)
+        _assert_same(tables, BGPDAG.read_columnar(path, fmt=fmt))
+
+    def test_mmap(self, bgp_dag: BGPDAG, tmp_path: Path):
+        """npy columns are read only memory maps"""
+
+        bgp_dag.to_columnar(tmp_path, fmt="npy")
+        tables = BGPDAG.read_columnar(tmp_path, fmt="npy")
+        for arr in list(tables.ases.values()) + list(tables.edges.values()):
+            assert isinstance(arr, np.memmap)
+            assert not arr.flags.writeable
+
+    @pytest.mark.parametrize("fmt", ["arrow", "parquet"])
+    def test_pyarrow(self, bgp_dag: BGPDAG, tmp_path: Path, fmt):
+        pytest.importorskip("pyarrow")
+        tables = bgp_dag.to_columnar(tmp_path, fmt=fmt)
+        _assert_same(tables, BGPDAG.read_columnar(tmp_path, fmt=fmt))
+
+    def test_bad_fmt(self, bgp_dag: BGPDAG):
+        with pytest.raises(Exception, match="fmt must be one of"):
+            bgp_dag.to_columnar(Path("dag.csv"), fmt="csv")
@@ -0,0 +1,64 @@
+from typing import FrozenSet, List, Set
+
+import pytest
+
+from ..base_as import AS
+from ..bgp_dag import BGPDAG
+
+
+def _brute_force_cone(as_obj: AS) -> FrozenSet[int]:
+    """Every AS reachable through customers"""
+
+    asns: Set[int] = set()
+    stack: List[AS] = [as_obj]
+    while stack:
+        for customer in stack.pop().customers:
+            if customer.asn not in asns:
+                asns.add(customer.asn)
+                stack.append(customer)
+    return frozenset(asns)
+
+
+@pytest.mark.cone_query_funcs
+class TestConeQueryFuncs:
+    def test_customer_cone(self, bgp_dag: BGPDAG):
+        """Cones are correct, and match the sizes of non stub/mh ASes"""
+
+        for as_obj in bgp_dag:
+            cone = bgp_dag.customer_cone(as_obj.asn)
+            assert cone == _brute_force_cone(as_obj)
+            if not (as_obj.stub or as_obj.multihomed):
+                assert len(cone) == as_obj.customer_cone_size
+
+    def test_in_cone(self, bgp_dag: BGPDAG):
+        """Rank pruned searches agree with the cones, cached or not"""
+
+        cones = {x.asn: _brute_force_cone(x) for x in bgp_dag}
+        for cached in (False, True):
+            for provider in bgp_dag:
+                for as_obj in bgp_dag:
+                    assert (bgp_dag.in_cone(provider.asn, as_obj.asn)
+                            == (as_obj.asn in cones[provider.asn]))
+                if not cached:
+                    bgp_dag.customer_cone(provider.asn)
+
+    def test_customer_cones(self, bgp_dag: BGPDAG):
+        """Batches match single queries"""
+
+        asns = [x.asn for x in bgp_dag]
+        cones = bgp_dag.customer_cones(asns)
+        assert cones == {x.asn: _brute_force_cone(x) for x in bgp_dag}
+
+    def test_lru(self, bgp_dag: BGPDAG):
+        """The LRU never holds more ASNs than its size"""
+
+        bgp_dag.cone_cache_size = 20
+        for as_obj in bgp_dag:
+            bgp_dag.customer_cone(as_obj.asn)
+            assert sum(len(x) + 1 for x in bgp_dag._cone_cache.values()
+                       ) == bgp_dag._cone_cache_total <= 20
+        # Batches are complete even when the LRU is tiny
+        assert len(bgp_dag.customer_cones([x.asn for x in bgp_dag])) == len(
+            bgp_dag)
+        bgp_dag.clear_cone_cache()
+        assert not bgp_dag._cone_cache and bgp_dag._cone_cache_total == 0
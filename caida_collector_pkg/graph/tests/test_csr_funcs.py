@@ -0,0 +1,51 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from ..bgp_dag import BGPDAG
+from ..csr_funcs import CSR_RELS
+
+
+@pytest.mark.csr_funcs
+class TestCSRFuncs:
+    def test_index_mapping(self, bgp_dag: BGPDAG):
+        """Dense indices are positions in dag.ases"""
+
+        assert bgp_dag.idx_to_asn.tolist() == [x.asn for x in bgp_dag]
+        for asn, idx in bgp_dag.asn_to_idx.items():
+            assert bgp_dag.idx_to_asn[idx] == asn
+
+    @pytest.mark.parametrize("rel", CSR_RELS)
+    def test_csr(self, bgp_dag: BGPDAG, rel: str):
+        """Rows hold the same ASes, in the same order, as the tuples"""
+
+        # Built lazily
+        assert rel not in bgp_dag._csr
+        indptr, indices = bgp_dag.csr(rel)
+        rel_indptr, rel_indices = getattr(bgp_dag, f"{rel}_csr")
+        assert rel_indptr is indptr and rel_indices is indices
+        for i, as_obj in enumerate(bgp_dag):
+            row = indices[indptr[i]:indptr[i + 1]]
+            assert (bgp_dag.idx_to_asn[row].tolist()
+                    == [x.asn for x in getattr(as_obj, rel)])
+        # Cached, and read only so the cache can't be corrupted
+        assert bgp_dag.csr(rel)[0] is indptr
+        with pytest.raises(ValueError):
+            indices[0] = 0
+
+    def test_bad_rel(self, bgp_dag: BGPDAG):
+        with pytest.raises(Exception, match="rel must be one of"):
+            bgp_dag.csr("siblings")
+
+    def test_snapshot(self, bgp_dag: BGPDAG, tmp_path: Path):
+        """Reloaded graphs reuse the snapshot's arrays"""
+
+        path = tmp_path / "dag.npz"
+        bgp_dag.to_snapshot(path)
+        reloaded = BGPDAG.from_snapshot(path)
+        assert reloaded is not None
+        for rel in CSR_RELS:
+            assert rel in reloaded._csr
+            for expected, actual in zip(bgp_dag.csr(rel), reloaded.csr(rel)):
+                assert np.array_equal(expected, actual)
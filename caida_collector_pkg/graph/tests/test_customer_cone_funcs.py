@@ -0,0 +1,74 @@
+from typing import Dict, Set
+
+import pytest
+
+from ..base_as import AS
+from ..bgp_dag import BGPDAG
+from ...links import CustomerProviderLink as CPLink
+from ...links import PeerLink
+
+
+def _set_cone_sizes(bgp_dag: BGPDAG) -> Dict[int, int]:
+    """The old set based algorithm, to check that sizes haven't changed"""
+
+    cone_dict: Dict[int, Set[int]] = dict()
+
+    def helper(as_obj: AS) -> Set[int]:
+        if as_obj.asn not in cone_dict:
+            cone_dict[as_obj.asn] = set()
+            for customer in as_obj.customers:
+                cone_dict[as_obj.asn].add(customer.asn)
+                cone_dict[as_obj.asn].update(helper(customer))
+        return cone_dict[as_obj.asn]
+
+    for as_obj in bgp_dag:
+        if as_obj.stub or as_obj.multihomed:
+            cone_dict[as_obj.asn] = set()
+    return {x.asn: len(helper(x)) for x in bgp_dag}
+
+
+@pytest.mark.customer_cone_funcs
+class TestCustomerConeFuncs:
+    def test_matches_sets(self, bgp_dag: BGPDAG):
+        """Cone sizes are the same as the old set based algorithm"""
+
+        assert ({x.asn: x.customer_cone_size for x in bgp_dag}
+                == _set_cone_sizes(bgp_dag))
+
+    def test_cone_sizes(self):
+        """Shared customers are counted once, stubs/multihomed are 0
+
+        1 is the provider of 2 and 3, which are both providers of 4.
+        4 is the only customer of 5, so 5 is a stub with a customer.
+        6 peers with 3 and 4 so that 4 isn't a stub
+        """
+
+        cp_links = {CPLink(provider_asn=1, customer_asn=2),
+                    CPLink(provider_asn=1, customer_asn=3),
+                    CPLink(provider_asn=2, customer_asn=4),
+                    CPLink(provider_asn=3, customer_asn=4),
+                    CPLink(provider_asn=5, customer_asn=4)}
+        peer_links = {PeerLink(3, 6), PeerLink(4, 6)}
+        bgp_dag = BGPDAG(cp_links, peer_links)
+        assert {x.asn: x.customer_cone_size for x in bgp_dag} == {
+            1: 3, 2: 1, 3: 1, 4: 0, 5: 0, 6: 0}
+
+    def test_sccs(self, bgp_dag: BGPDAG):
+        """Cycles are condensed into one SCC, found before their providers
+
+        Ranks reject cycles, so this calls the cone funcs directly
+        """
+
+        as_dict = {asn: AS(asn=asn) for asn in range(1, 5)}
+        # 1 -> 2 -> 3 -> 2, 3 -> 4
+        as_dict[1].customers = (as_dict[2],)
+        as_dict[2].customers = (as_dict[3],)
+        as_dict[3].customers = (as_dict[2], as_dict[4])
+        bgp_dag.ases = tuple(as_dict.values())
+        sccs = bgp_dag._get_customer_sccs()
+        assert [sorted(x.asn for x in scc) for scc in sccs] == [
+            [4], [2, 3], [1]]
+        # The cycle shares a cone, which includes itself. 1 is a stub
+        bgp_dag._get_customer_cone_size()
+        assert {x.asn: x.customer_cone_size for x in as_dict.values()} == {
+            1: 0, 2: 3, 3: 3, 4: 0}
@@ -0,0 +1,220 @@
+import random
+from typing import Set, Tuple
+
+import pytest
+
+from ..base_as import AS
+from ..bgp_dag import BGPDAG
+from ...links import CustomerProviderLink as CPLink
+from ...links import LinkSet
+from ...links import PeerLink
+
+
+def _graph_info(bgp_dag: BGPDAG):
+    """Everything a rebuild sets. Relationship order isn't kept"""
+
+    return ([(x.asn,
+              type(x),
+              sorted(y.asn for y in x.peers),
+              sorted(y.asn for y in x.providers),
+              sorted(y.asn for y in x.customers),
+              x.input_clique,
+              x.ixp,
+              x.customer_cone_size,
+              x.propagation_rank,
+              x.rov_filtering,
+              repr(x.rov_confidence),
+              x.rov_source,
+              x._flags,
+              sorted(y.asn for y in x.stubs),
+              x.db_row) for x in bgp_dag],
+            [[x.asn for x in rank] for rank in bgp_dag.propagation_ranks],
+            bgp_dag.as_flags.tolist(),
+            [getattr(bgp_dag, f"{x}_asns") for x in
+             ("stub", "mh", "stub_or_mh", "input_clique", "etc")],
+            [getattr(bgp_dag, f"{x}_ases") for x in
+             ("stub", "mh", "stub_or_mh", "input_clique", "etc")])
+
+
+def _links(bgp_dag: BGPDAG) -> Tuple[LinkSet, LinkSet]:
+    cp_links = LinkSet.from_links(
+        [CPLink(provider_asn=x.asn, customer_asn=y.asn)
+         for x in bgp_dag for y in x.customers], CPLink)
+    peer_links = LinkSet.from_links(
+        [PeerLink(x.asn, y.asn) for x in bgp_dag for y in x.peers],
+        PeerLink)
+    return cp_links, peer_links
+
+
+def _synthetic_dag(seed: int) -> BGPDAG:
+    """Caida shaped graph: ASes buy transit from lower ASNs, and peer"""
+
+    rand = random.Random(seed)
+    cp_links: Set[CPLink] = set()
+    for asn in range(2, 401):
+        for _ in range(rand.randint(1, 3)):
+            cp_links.add(CPLink(provider_asn=rand.randint(1, min(asn - 1, 60)),
+                                customer_asn=asn))
+    linked = set(x.asns for x in cp_links)
+    peer_links: Set[PeerLink] = set()
+    while len(peer_links) < 150:
+        asn1, asn2 = sorted(rand.sample(range(1, 401), 2))
+        if (asn1, asn2) not in linked and (asn2, asn1) not in linked:
+            peer_links.add(PeerLink(asn1, asn2))
+    return BGPDAG(cp_links,
+                  peer_links,
+                  ixps={5, 50, 500},
+                  input_clique={1, 2, 3})
+
+
+def _random_diff(bgp_dag: BGPDAG, seed: int):
+    """Removes, adds and flips links, keeping the graph acyclic
+
+    Added customer provider links go down in rank, so no cycles form
+    """
+
+    rand = random.Random(seed)
+    cp_links, peer_links = _links(bgp_dag)
+    removed_cp = set(rand.sample(list(cp_links), len(cp_links) // 10))
+    removed_peers = set(rand.sample(list(peer_links), len(peer_links) // 10))
+    # Flip some customer provider links to peers
+    added_peers: Set[PeerLink] = set(
+        PeerLink(*x.asns)
+        for x in rand.sample(sorted(removed_cp, key=lambda x: x.asns), 3))
+    linked: Set[Tuple[int, ...]] = set(tuple(sorted(x.asns))
+                                       for x in list(cp_links)
+                                       + list(peer_links))
+    ases = list(bgp_dag)
+    added_cp: Set[CPLink] = set()
+    while len(added_cp) < 30:
+        provider, customer = rand.sample(ases, 2)
+        if (provider.propagation_rank > customer.propagation_rank
+                and tuple(sorted((provider.asn, customer.asn))) not in linked):
+            added_cp.add(CPLink(provider_asn=provider.asn,
+                                customer_asn=customer.asn))
+    # New ASes, as a stub, a provider, and a peer. 852 is in the ROV CSV
+    new_asns = [852, 10 ** 6, 10 ** 6 + 1]
+    low = next(x for x in ases if x.propagation_rank == 0)
+    added_cp.add(CPLink(provider_asn=ases[0].asn, customer_asn=new_asns[0]))
+    added_cp.add(CPLink(provider_asn=new_asns[1], customer_asn=low.asn))
+    added_peers.add(PeerLink(new_asns[2], ases[1].asn))
+    return (LinkSet.from_links(added_cp, CPLink),
+            LinkSet.from_links(removed_cp, CPLink),
+            LinkSet.from_links(added_peers, PeerLink),
+            LinkSet.from_links(removed_peers, PeerLink))
+
+
+@pytest.mark.diff_funcs
+class TestDiffFuncs:
+    @pytest.mark.parametrize("seed", range(5))
+    def test_matches_rebuild(self, seed: int):
+        """Applying a diff gives the same graph as a full rebuild"""
+
+        bgp_dag = _synthetic_dag(seed)
+        assert 852 not in bgp_dag.as_dict
+        added_cp, removed_cp, added_peers, removed_peers = _random_diff(
+            bgp_dag, seed)
+        cp_links, peer_links = _links(bgp_dag)
+        ixps = set(x.asn for x in bgp_dag if x.ixp)
+        ixps = set(list(ixps)[1:]) | {bgp_dag.ases[5].asn}
+        input_clique = set(x.asn for x in bgp_dag if x.input_clique)
+        input_clique = set(list(input_clique)[1:]) | {bgp_dag.ases[6].asn}
+        # Warm the caches, which should be cleared
+        bgp_dag.customer_cone(bgp_dag.ases[0].asn)
+        bgp_dag.csr("customers")
+
+        bgp_dag.apply_diff(added_cp,
+                           removed_cp,
+                           added_peers,
+                           removed_peers,
+                           ixps=ixps,
+                           input_clique=input_clique)
+        rebuilt = BGPDAG((cp_links - removed_cp) | added_cp,
+                         (peer_links - removed_peers) | added_peers,
+                         ixps=ixps,
+                         input_clique=input_clique)
+
+        assert 852 in bgp_dag.as_dict
+        assert list(bgp_dag.as_dict) == list(rebuilt.as_dict)
+        assert bgp_dag.ases == tuple(bgp_dag.as_dict.values())
+        assert _graph_info(bgp_dag)[0] == _graph_info(rebuilt)[0]
+        assert _graph_info(bgp_dag)[1:3] == _graph_info(rebuilt)[1:3]
+        assert _graph_info(bgp_dag)[3] == _graph_info(rebuilt)[3]
+        # Sets of ASes compare by identity, so compare their ASNs
+        for ases, rebuilt_ases in zip(_graph_info(bgp_dag)[4],
+                                      _graph_info(rebuilt)[4]):
+            assert set(x.asn for x in ases) == set(x.asn for x in rebuilt_ases)
+            assert all(bgp_dag.as_dict[x.asn] is x for x in ases)
+        assert _links(bgp_dag) == _links(rebuilt)
+        for asn in (bgp_dag.ases[0].asn, bgp_dag.ases[-1].asn):
+            assert bgp_dag.customer_cone(asn) == rebuilt.customer_cone(asn)
+        for rel in ("customers", "providers", "peers"):
+            assert (bgp_dag.csr(rel)[0].tolist()
+                    == rebuilt.csr(rel)[0].tolist())
+
+    def test_removes_unlinked_ases(self, bgp_dag: BGPDAG):
+        """ASes left without links are removed"""
+
+        stub = next(x for x in bgp_dag
+                    if x.stub and x.providers and not x.ixp
+                    and not x.input_clique)
+        provider = stub.providers[0]
+        bgp_dag.apply_diff(set(),
+                           {CPLink(provider_asn=provider.asn,
+                                   customer_asn=stub.asn)},
+                           set(),
+                           set())
+        assert stub.asn not in bgp_dag.as_dict
+        assert stub not in bgp_dag.stub_ases
+        assert stub not in provider.customers
+        assert stub not in provider.stubs
+
+    def test_peer_and_customer(self, bgp_dag: BGPDAG):
+        """A pair can't be both peers and customer/provider"""
+
+        as_obj = next(x for x in bgp_dag if x.customers)
+        customer = as_obj.customers[0]
+        before = _graph_info(bgp_dag)
+        with pytest.raises(Exception):
+            bgp_dag.apply_diff(set(),
+                               set(),
+                               {PeerLink(as_obj.asn, customer.asn)},
+                               set())
+        # Nothing changed
+        assert _graph_info(bgp_dag) == before
+
+    def test_cycle(self):
+        """Cycles raise the same as when building the graph"""
+
+        bgp_dag = BGPDAG({CPLink(provider_asn=1, customer_asn=2),
+                          CPLink(provider_asn=2, customer_asn=3),
+                          CPLink(provider_asn=1, customer_asn=5)},
+                         set())
+        before = _graph_info(bgp_dag)
+        with pytest.raises(Exception, match=r"cycle.*\[1, 2, 3\]"):
+            bgp_dag.apply_diff({CPLink(provider_asn=3, customer_asn=1),
+                                CPLink(provider_asn=4, customer_asn=3)},
+                               {CPLink(provider_asn=1, customer_asn=5)},
+                               set(),
+                               set())
+        # Nothing changed, including ranks and the new AS
+        assert _graph_info(bgp_dag) == before
+        assert [x.asn for x in bgp_dag.as_dict[2].providers] == [1]
+        assert [x.asn for x in bgp_dag.as_dict[1].customers] == [2, 5]
+        assert bgp_dag.customer_cone(1) == {2, 3, 5}
+
+    def test_base_as_cls(self):
+        """New ASes are the class of the graph's ASes"""
+
+        class DiffTestAS(AS):
+            pass
+
+        bgp_dag = BGPDAG({CPLink(provider_asn=1, customer_asn=2)},
+                         set(),
+                         BaseASCls=DiffTestAS)
+        bgp_dag.apply_diff({CPLink(provider_asn=1, customer_asn=3)},
+                           set(),
+                           set(),
+                           set())
+        assert type(bgp_dag.as_dict[3]) is DiffTestAS
+        assert bgp_dag.as_dict[1].customer_cone_size == 2
@@ -0,0 +1,73 @@
+import sys
+from typing import Dict
+
+import pytest
+
+from ..base_as import AS
+from ..bgp_dag import BGPDAG
+from ...links import CustomerProviderLink as CPLink
+from ...links import PeerLink
+
+
+def _recursive_ranks(bgp_dag: BGPDAG) -> Dict[int, int]:
+    """The old recursive algorithm, to check that ranks haven't changed"""
+
+    ranks: Dict[int, int] = dict()
+
+    def helper(as_obj: AS, rank: int):
+        if ranks.get(as_obj.asn, -1) < rank:
+            ranks[as_obj.asn] = rank
+            for provider_obj in as_obj.providers:
+                helper(provider_obj, rank + 1)
+
+    for as_obj in bgp_dag:
+        helper(as_obj, 0)
+    return ranks
+
+
+@pytest.mark.propagation_rank_funcs
+class TestPropagationRankFuncs:
+    def test_matches_recursive(self, bgp_dag: BGPDAG):
+        """Ranks are the same as the old recursive algorithm"""
+
+        expected = _recursive_ranks(bgp_dag)
+        assert {x.asn: x.propagation_rank for x in bgp_dag} == expected
+        for rank, ases in enumerate(bgp_dag.propagation_ranks):
+            assert all(x.propagation_rank == rank for x in ases)
+
+    def test_longest_chain(self):
+        """An AS is ranked by its longest chain of customers
+
+        1 is the provider of 2 and 4, 2 of 3, and 3 of 4. 5 peers with 1
+        """
+
+        cp_links = {CPLink(provider_asn=1, customer_asn=2),
+                    CPLink(provider_asn=2, customer_asn=3),
+                    CPLink(provider_asn=3, customer_asn=4),
+                    CPLink(provider_asn=1, customer_asn=4)}
+        bgp_dag = BGPDAG(cp_links, {PeerLink(1, 5)})
+        assert {x.asn: x.propagation_rank for x in bgp_dag} == {
+            1: 3, 2: 2, 3: 1, 4: 0, 5: 0}
+
+    def test_deep_chain(self):
+        """Chains deeper than the recursion limit are fine"""
+
+        depth = sys.getrecursionlimit() + 100
+        cp_links = {CPLink(provider_asn=i + 1, customer_asn=i)
+                    for i in range(1, depth)}
+        bgp_dag = BGPDAG(cp_links, set())
+        assert bgp_dag.as_dict[depth].propagation_rank == depth - 1
+
+    def test_cycle(self):
+        """Cycles are reported, without the ASes above them
+
+        1 -> 2 -> 3 -> 1 is a cycle, 4 is above it and 5 below it
+        """
+
+        cp_links = {CPLink(provider_asn=1, customer_asn=2),
+                    CPLink(provider_asn=2, customer_asn=3),
+                    CPLink(provider_asn=3, customer_asn=1),
+                    CPLink(provider_asn=4, customer_asn=1),
+                    CPLink(provider_asn=3, customer_asn=5)}
+        with pytest.raises(Exception, match=r"cycle.*\[1, 2, 3\]"):
+            BGPDAG(cp_links, set())
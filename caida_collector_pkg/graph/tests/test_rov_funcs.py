@@ -0,0 +1,97 @@
+import csv
+import os
+from pathlib import Path
+from typing import Dict, Tuple
+
+import pytest
+
+from ..bgp_dag import BGPDAG
+from .. import rov_funcs
+from ..rov_funcs import read_rov_table
+
+
+_combined_path: Path = Path(__file__).parent.parent.parent / "combined.csv"
+
+
+def _expected_rov(bgp_dag: BGPDAG, path: Path):
+    """Returns {asn: ROV info} from applying every row in turn"""
+
+    rov: Dict[int, Tuple[str, float, str]] = {x.asn: ("", -1, "")
+                                              for x in bgp_dag}
+    with path.open() as f:
+        for row in csv.DictReader(f):
+            if int(row["asn"]) in rov:
+                rov[int(row["asn"])] = (row["filtering"],
+                                        float(row["confidence"]),
+                                        row["source"])
+    return rov
+
+
+def _rov(bgp_dag: BGPDAG):
+    return {x.asn: (x.rov_filtering, x.rov_confidence, x.rov_source)
+            for x in bgp_dag}
+
+
+def _write_csv(path: Path, rows):
+    with path.open(mode="w") as f:
+        writer = csv.writer(f)
+        writer.writerow(["asn", "filtering", "confidence", "source"])
+        writer.writerows(rows)
+
+
+@pytest.mark.rov_funcs
+class TestROVFuncs:
+    def test_join(self, bgp_dag: BGPDAG):
+        """The join matches applying each row, with the last row winning"""
+
+        assert _rov(bgp_dag) == _expected_rov(bgp_dag, _combined_path)
+        # The example graph has ASNs with several rows
+        assert bgp_dag.as_dict[174].rov_source == "tma"
+
+    def test_cache(self, tmp_path: Path):
+        """Tables are parsed once, until the file changes"""
+
+        path = tmp_path / "rov.csv"
+        _write_csv(path, [[1, "all", 1, "a"]])
+        table = read_rov_table(path)
+        assert read_rov_table(path) is table
+        _write_csv(path, [[1, "all", 1, "a"], [2, "peers", .5, "b"]])
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        assert read_rov_table(path).asns.tolist() == [1, 2]
+        assert len(rov_funcs._rov_tables) >= 1
+
+    def test_reannotate(self, bgp_dag: BGPDAG, tmp_path: Path):
+        """Reannotating replaces the ROV info and nothing else"""
+
+        asns = [x.asn for x in bgp_dag][:3]
+        path = tmp_path / "rov.csv"
+        _write_csv(path, [[asns[0], "peers", .5, "new"],
+                          [asns[1], "all", 1, "new"],
+                          [asns[0], "all", .2, "newer"],
+                          # Not in the graph
+                          [2**31, "all", 1, "new"]])
+        ranks = [x.propagation_rank for x in bgp_dag]
+        bgp_dag.reannotate(path)
+        assert _rov(bgp_dag) == _expected_rov(bgp_dag, path)
+        assert bgp_dag.as_dict[asns[0]].rov_source == "newer"
+        assert bgp_dag.as_dict[asns[2]].rov_confidence == -1
+        assert [x.propagation_rank for x in bgp_dag] == ranks
+
+        bgp_dag.reannotate(read_rov_table(_combined_path))
+        assert _rov(bgp_dag) == _expected_rov(bgp_dag, _combined_path)
+
+    def test_reannotate_str_path(self, bgp_dag: BGPDAG, tmp_path: Path):
+        """Paths can be given as strs too"""
+
+        path = tmp_path / "rov.csv"
+        _write_csv(path, [[bgp_dag.ases[0].asn, "all", 1, "str"]])
+        bgp_dag.reannotate(str(path))
+        assert _rov(bgp_dag) == _expected_rov(bgp_dag, path)
+        assert bgp_dag.ases[0].rov_source == "str"
+
+    def test_empty(self, bgp_dag: BGPDAG, tmp_path: Path):
+        path = tmp_path / "rov.csv"
+        _write_csv(path, [])
+        bgp_dag.reannotate(path)
+        assert set(_rov(bgp_dag).values()) == {("", -1, "")}
@@ -0,0 +1,89 @@
+from pathlib import Path
+from typing import List
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from ..base_as import AS
+from ..bgp_dag import BGPDAG
+from .. import snapshot_funcs
+
+
+class SnapshotTestAS(AS):
+    pass
+
+
+def _as_info(bgp_dag: BGPDAG):
+    """Returns everything about the graph that should survive a reload"""
+
+    return [(x.asn,
+             type(x),
+             tuple([y.asn for y in x.peers]),
+             tuple([y.asn for y in x.providers]),
+             tuple([y.asn for y in x.customers]),
+             x.input_clique,
+             x.ixp,
+             x.customer_cone_size,
+             x.propagation_rank,
+             x.rov_filtering,
+             repr(x.rov_confidence),
+             x.rov_source) for x in bgp_dag]
+
+
+@pytest.mark.snapshot_funcs
+class TestSnapshotFuncs:
+    def test_round_trip(self, bgp_dag: BGPDAG, tmp_path: Path):
+        """A reloaded graph behaves the same as the original"""
+
+        path = tmp_path / "dag.npz"
+        bgp_dag.to_snapshot(path)
+        reloaded = BGPDAG.from_snapshot(path)
+        assert reloaded is not None
+
+        assert _as_info(reloaded) == _as_info(bgp_dag)
+        assert ([[x.asn for x in rank] for rank in reloaded.propagation_ranks]
+                == [[x.asn for x in rank]
+                    for rank in bgp_dag.propagation_ranks])
+        for attr in ("stub_asns", "mh_asns", "input_clique_asns", "etc_asns"):
+            assert getattr(reloaded, attr) == getattr(bgp_dag, attr)
+        assert ([x.db_row for x in reloaded] == [x.db_row for x in bgp_dag])
+
+    def test_concurrent_writers(self, bgp_dag: BGPDAG, tmp_path: Path):
+        """Writers of the same snapshot don't share a tmp file"""
+
+        path = tmp_path / "dag.npz"
+        savez = np.savez
+        nested: List[bool] = []
+
+        def savez_during_another_write(f, **arrays):
+            savez(f, **arrays)
+            # Another job writes the whole snapshot in the middle of this one
+            if not nested:
+                nested.append(True)
+                bgp_dag.to_snapshot(path)
+
+        with patch.object(np, "savez", side_effect=savez_during_another_write):
+            bgp_dag.to_snapshot(path)
+        reloaded = BGPDAG.from_snapshot(path)
+        assert reloaded is not None
+        assert _as_info(reloaded) == _as_info(bgp_dag)
+        assert list(tmp_path.iterdir()) == [path]
+
+    def test_wrong_as_cls(self, bgp_dag: BGPDAG, tmp_path: Path):
+        """Snapshots only reload with the AS class they were written with"""
+
+        path = tmp_path / "dag.npz"
+        bgp_dag.to_snapshot(path)
+        assert BGPDAG.from_snapshot(path, BaseASCls=SnapshotTestAS) is None
+
+    def test_wrong_version(self, bgp_dag: BGPDAG, tmp_path: Path):
+        """Snapshots from other snapshot versions aren't reloaded"""
+
+        path = tmp_path / "dag.npz"
+        bgp_dag.to_snapshot(path)
+        with np.load(str(path)) as npz:
+            arrays = dict(npz)
+        arrays["version"] = np.array([snapshot_funcs.SNAPSHOT_VERSION + 1])
+        np.savez(str(path), **arrays)
+        assert BGPDAG.from_snapshot(path) is None
@@ -0,0 +1,140 @@
+import random
+from typing import Set
+
+import pytest
+
+from ..bgp_dag import BGPDAG
+from ...links import CustomerProviderLink as CPLink
+from ...links import PeerLink
+
+
+def _info(bgp_dag: BGPDAG, asn: int):
+    """Returns what a subgraph and a rebuilt graph should agree on"""
+
+    as_obj = bgp_dag.as_dict[asn]
+    return (set(x.asn for x in as_obj.peers),
+            set(x.asn for x in as_obj.providers),
+            set(x.asn for x in as_obj.customers),
+            as_obj.ixp,
+            as_obj.input_clique,
+            as_obj.propagation_rank,
+            as_obj.customer_cone_size,
+            as_obj._flags,
+            as_obj.rov_filtering,
+            as_obj.rov_confidence,
+            as_obj.rov_source)
+
+
+def _rebuild(bgp_dag: BGPDAG, asns: Set[int]) -> BGPDAG:
+    """Builds the induced graph from its links"""
+
+    cp_links = set()
+    peer_links = set()
+    for as_obj in bgp_dag:
+        if as_obj.asn not in asns:
+            continue
+        for customer in as_obj.customers:
+            if customer.asn in asns:
+                cp_links.add(CPLink(provider_asn=as_obj.asn,
+                                    customer_asn=customer.asn))
+        for peer in as_obj.peers:
+            if peer.asn in asns:
+                peer_links.add(PeerLink(as_obj.asn, peer.asn))
+    return BGPDAG(cp_links,
+                  peer_links,
+                  ixps=set(x.asn for x in bgp_dag
+                           if x.ixp and x.asn in asns),
+                  input_clique=set(x.asn for x in bgp_dag
+                                   if x.input_clique and x.asn in asns))
+
+
+def _neighbor_asns(bgp_dag: BGPDAG, asns: Set[int]) -> Set[int]:
+    return set(y.asn for x in asns
+               for y in bgp_dag.as_dict[x].neighbors)
+
+
+@pytest.mark.subgraph_funcs
+class TestSubgraphFuncs:
+    @pytest.mark.parametrize("seed", range(5))
+    def test_subgraph(self, bgp_dag: BGPDAG, seed: int):
+        """Subgraphs match rebuilding the graph from the induced links"""
+
+        random.seed(seed)
+        asns = set(random.sample(sorted(bgp_dag.as_dict),
+                                 len(bgp_dag) // 2))
+        sub_dag = bgp_dag.subgraph(asns)
+        rebuilt = _rebuild(bgp_dag, asns)
+
+        assert set(sub_dag.as_dict) == asns
+        # The same order as a rebuild for ASes with links (the rest are
+        # in set order when rebuilding)
+        assert ([x.asn for x in sub_dag if x.neighbors]
+                == [x.asn for x in rebuilt if x.neighbors])
+        assert all(x.neighbors for x in sub_dag.ases[:len(
+            [x for x in sub_dag if x.neighbors])])
+        for asn in rebuilt.as_dict:
+            assert _info(sub_dag, asn) == _info(rebuilt, asn)
+        for asn in asns - rebuilt.as_dict.keys():
+            assert not sub_dag.as_dict[asn].neighbors
+        for attr in ("stub_asns", "mh_asns", "input_clique_asns"):
+            assert getattr(sub_dag, attr) == getattr(rebuilt, attr)
+
+    def test_order_and_attrs(self, bgp_dag: BGPDAG):
+        """Tuples keep their order, and attr columns are copied"""
+
+        for i, as_obj in enumerate(bgp_dag):
+            as_obj.rov_source = str(i)
+        asns = set(list(bgp_dag.as_dict)[::2])
+        sub_dag = bgp_dag.subgraph(asns)
+        for as_obj in sub_dag:
+            old_as_obj = bgp_dag.as_dict[as_obj.asn]
+            assert as_obj is not old_as_obj
+            assert as_obj.rov_source == old_as_obj.rov_source
+            for rel in ("peers", "providers", "customers"):
+                assert ([x.asn for x in getattr(as_obj, rel)]
+                        == [x.asn for x in getattr(old_as_obj, rel)
+                            if x.asn in asns])
+        # The original is untouched
+        assert bgp_dag.ases[1].rov_source == "1"
+
+    def test_cone_subgraph(self, bgp_dag: BGPDAG):
+        as_obj = max(bgp_dag, key=lambda x: x.customer_cone_size or 0)
+        sub_dag = bgp_dag.cone_subgraph(as_obj.asn)
+        assert (set(sub_dag.as_dict)
+                == bgp_dag.customer_cone(as_obj.asn) | {as_obj.asn})
+        assert (sub_dag.as_dict[as_obj.asn].customer_cone_size
+                == as_obj.customer_cone_size)
+        assert (sub_dag.as_dict[as_obj.asn].propagation_rank
+                == as_obj.propagation_rank)
+
+    @pytest.mark.parametrize("k", range(4))
+    def test_khop(self, bgp_dag: BGPDAG, k: int):
+        start = {bgp_dag.ases[0].asn, bgp_dag.ases[-1].asn}
+        expected = set(start)
+        frontier = set(start)
+        for _ in range(k):
+            frontier = _neighbor_asns(bgp_dag, frontier) - expected
+            expected |= frontier
+        sub_dag = bgp_dag.khop(start, k)
+        assert set(sub_dag.as_dict) == expected
+        rebuilt = _rebuild(bgp_dag, expected)
+        for asn in rebuilt.as_dict:
+            assert _info(sub_dag, asn) == _info(rebuilt, asn)
+
+    def test_missing(self, bgp_dag: BGPDAG):
+        with pytest.raises(Exception, match="not in the graph"):
+            bgp_dag.subgraph({2**31})
+        with pytest.raises(Exception, match="not in the graph"):
+            bgp_dag.khop({2**31}, 1)
+        with pytest.raises(Exception, match="at least 0"):
+            bgp_dag.khop({bgp_dag.ases[0].asn}, -1)
+
+    def test_empty(self, bgp_dag: BGPDAG):
+        """A subgraph without ASes is an empty graph"""
+
+        sub_dag = bgp_dag.subgraph([])
+        assert len(sub_dag) == 0
+        assert sub_dag.propagation_ranks == tuple()
+        assert len(sub_dag.attrs["rov_source"]) == 0
+        # As is a rebuilt graph without links
+        assert len(_rebuild(bgp_dag, set())) == 0
@@ -1,4 +1,5 @@
 from .customer_provider_link import CustomerProviderLink
+from .link_set import LinkSet
 from .peer_link import PeerLink
 
-__all__ = ["CustomerProviderLink", "PeerLink"]
+__all__ = ["CustomerProviderLink", "LinkSet", "PeerLink"]
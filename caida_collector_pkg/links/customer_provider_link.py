@@ -6,18 +6,37 @@ from .link import Link
 class CustomerProviderLink(Link):
     """Stores the customer and provider information"""
 
-    def __init__(self, **kwargs):
+    __slots__ = ("__customer_asn", "__provider_asn")
+
+    def __init__(self, *, customer_asn: int, provider_asn: int):
         """Saves the link info
 
-        done using kwargs so that it errors if it's not passed in
+        done using keyword only args so that it errors if not passed in
+        """
+
+        self.__customer_asn: int = int(customer_asn)
+        self.__provider_asn: int = int(provider_asn)
+        self._asns: Tuple[int, int] = self._sorted_asns(self.__customer_asn,
+                                                        self.__provider_asn)
+
+    @classmethod
+    def _view(cls,
+              provider_asn: int,
+              customer_asn: int) -> "CustomerProviderLink":
+        """Creates a link from trusted ints without any conversions
+
+        Used by LinkSet when iterating
         """
 
-        for kwarg in ["customer_asn", "provider_asn"]:
-            assert kwarg in kwargs, f"Params missing {kwarg}"
+        link = cls.__new__(cls)
+        link.__customer_asn = customer_asn
+        link.__provider_asn = provider_asn
+        link._asns = cls._sorted_asns(customer_asn, provider_asn)
+        return link
 
-        self.__customer_asn: int = int(kwargs["customer_asn"])
-        self.__provider_asn: int = int(kwargs["provider_asn"])
-        super(CustomerProviderLink, self).__init__()
+    @staticmethod
+    def _sorted_asns(asn1: int, asn2: int) -> Tuple[int, int]:
+        return (asn1, asn2) if asn1 < asn2 else (asn2, asn1)
 
     @property
     def customer_asn(self) -> int:
@@ -30,10 +49,3 @@ class CustomerProviderLink(Link):
         """Returns provider asn. Done this way for immutability/hashing"""
 
         return self.__provider_asn
-
-    @property
-    def asns(self) -> Tuple[int, int]:
-        """Returns asns associated with this link. Used for hashing"""
-
-        return tuple(sorted([self.customer_asn,
-                             self.provider_asn]))  # type: ignore
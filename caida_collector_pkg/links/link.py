@@ -1,28 +1,26 @@
-from abc import ABC, abstractmethod
+from abc import ABC
 
 from typing import Any, Tuple
 
 
 class Link(ABC):
-    """Contains a relationship link in a BGP topology"""
+    """Contains a relationship link in a BGP topology
 
-    __slots__: Tuple[str, ...] = tuple()
+    Links are thin immutable views of a pair of ASNs. The sorted asns
+    are computed once on creation rather than on every hash/eq
+    """
 
-    def __init__(self):
-        # Make sure we have asns
-        # Make sure the asns is a tuple
-        assert isinstance(self.asns, tuple)
-        # Make sure the asns is sorted
-        assert tuple(sorted(self.asns)) == self.asns
+    __slots__: Tuple[str, ...] = ("_asns",)
+    _asns: Tuple[int, int]
 
     def __hash__(self) -> int:
         """Hashes used in sets"""
 
-        return hash(self.asns)
+        return hash(self._asns)
 
     def __eq__(self, other: Any):
         if isinstance(other, Link):
-            return self.asns == other.asns
+            return self._asns == other._asns
         else:
             return NotImplemented
 
@@ -33,6 +31,7 @@ class Link(ABC):
             return NotImplemented
 
     @property
-    @abstractmethod
     def asns(self) -> Tuple[int, int]:
-        raise NotImplementedError
+        """Returns sorted asns associated with this link. Used for hashing"""
+
+        return self._asns
@@ -0,0 +1,207 @@
+from typing import Any, Iterable, Iterator, Optional, Tuple, Type, Union
+
+import numpy as np
+
+from .customer_provider_link import CustomerProviderLink
+from .link import Link
+from .peer_link import PeerLink
+
+
+LINK_CLS_TYPE = Union[Type[CustomerProviderLink], Type[PeerLink]]
+
+
+class LinkSet:
+    """Set of links stored as sorted, unique, packed 64 bit keys
+
+    ASNs are 32 bit, so each link packs into a single uint64 key:
+    (asn1 << 32) | asn2. For customer provider links asn1 is the
+    provider and asn2 the customer, in the same order as the as-rel2
+    file. For peer links the pair is sorted, so that (a, b) == (b, a)
+
+    Iterating yields CustomerProviderLink/PeerLink views, so a LinkSet
+    can be used anywhere a set of link objects was used before
+    """
+
+    __slots__ = ("LinkCls", "_keys")
+
+    def __init__(self,
+                 LinkCls: LINK_CLS_TYPE,
+                 keys: Optional[np.ndarray] = None,
+                 _unique: bool = False):
+        """Stores the keys. If _unique they're already sorted and unique"""
+
+        if LinkCls not in (CustomerProviderLink, PeerLink):
+            raise Exception(f"Can't make a LinkSet of {LinkCls}")
+        self.LinkCls: LINK_CLS_TYPE = LinkCls
+        if keys is None:
+            keys = np.empty(0, dtype=np.uint64)
+        keys = np.asarray(keys, dtype=np.uint64)
+        self._keys: np.ndarray = keys if _unique else np.unique(keys)
+
+    @classmethod
+    def from_arrays(cls,
+                    LinkCls: LINK_CLS_TYPE,
+                    asns1: Any,
+                    asns2: Any) -> "LinkSet":
+        """Creates a LinkSet from two parallel arrays of ASNs
+
+        For customer provider links asns1 are providers, asns2 customers
+        """
+
+        asns1 = np.asarray(asns1, dtype=np.uint64)
+        asns2 = np.asarray(asns2, dtype=np.uint64)
+        if LinkCls is PeerLink:
+            asns1, asns2 = (np.minimum(asns1, asns2),
+                            np.maximum(asns1, asns2))
+        return cls(LinkCls, cls._pack(asns1, asns2))
+
+    @classmethod
+    def from_links(cls,
+                   links: Iterable[Link],
+                   LinkCls: Optional[LINK_CLS_TYPE] = None) -> "LinkSet":
+        """Creates a LinkSet from link objects (or returns a LinkSet)"""
+
+        if isinstance(links, LinkSet):
+            return links
+        links = list(links)
+        if LinkCls is None:
+            if len(links) == 0:
+                raise Exception("LinkCls is needed for empty links")
+            LinkCls = type(links[0])  # type: ignore
+        if LinkCls is CustomerProviderLink:
+            pairs = [(x.provider_asn, x.customer_asn)  # type: ignore
+                     for x in links]
+        else:
+            pairs = [x.asns for x in links]
+        arr = np.array(pairs, dtype=np.uint64).reshape(-1, 2)
+        return cls.from_arrays(LinkCls, arr[:, 0], arr[:, 1])  # type: ignore
+
+    @staticmethod
+    def _pack(asns1: np.ndarray, asns2: np.ndarray) -> np.ndarray:
+        keys: np.ndarray = (asns1 << np.uint64(32)) | asns2
+        return keys
+
+    def _key(self, link: Union[Link, Tuple[int, int]]) -> int:
+        """Returns the key of a link or of an (asn1, asn2) tuple"""
+
+        if isinstance(link, CustomerProviderLink):
+            asn1, asn2 = link.provider_asn, link.customer_asn
+        elif isinstance(link, Link):
+            asn1, asn2 = link.asns
+        else:
+            asn1, asn2 = link
+            if self.LinkCls is PeerLink and asn2 < asn1:
+                asn1, asn2 = asn2, asn1
+        return (int(asn1) << 32) | int(asn2)
+
+##############
+# Properties #
+##############
+
+    @property
+    def keys(self) -> np.ndarray:
+        """Sorted unique packed keys"""
+
+        return self._keys
+
+    @property
+    def asns1(self) -> np.ndarray:
+        """Providers for customer provider links, lower ASN for peers"""
+
+        return (self._keys >> np.uint64(32)).astype(np.int64)
+
+    @property
+    def asns2(self) -> np.ndarray:
+        """Customers for customer provider links, higher ASN for peers"""
+
+        return (self._keys & np.uint64(0xFFFFFFFF)).astype(np.int64)
+
+    @property
+    def unordered_keys(self) -> np.ndarray:
+        """Sorted keys with each ASN pair sorted, regardless of direction
+
+        Used to compare customer provider links against peer links
+        """
+
+        if self.LinkCls is PeerLink:
+            return self._keys
+        asns1, asns2 = self.asns1.astype(np.uint64), self.asns2.astype(
+            np.uint64)
+        return np.unique(self._pack(np.minimum(asns1, asns2),
+                                    np.maximum(asns1, asns2)))
+
+#############
+# Set funcs #
+#############
+
+    def _other_keys(self, other: Any) -> np.ndarray:
+        if not isinstance(other, LinkSet):
+            other = LinkSet.from_links(other, self.LinkCls)
+        if other.LinkCls is not self.LinkCls:
+            raise Exception("Can't combine LinkSets of different links")
+        keys: np.ndarray = other._keys
+        return keys
+
+    def union(self, *others: Iterable[Link]) -> "LinkSet":
+        keys = np.concatenate([self._keys]
+                              + [self._other_keys(x) for x in others])
+        return LinkSet(self.LinkCls, keys)
+
+    def intersection(self, other: Iterable[Link]) -> "LinkSet":
+        return LinkSet(self.LinkCls,
+                       np.intersect1d(self._keys,
+                                      self._other_keys(other),
+                                      assume_unique=True),
+                       _unique=True)
+
+    def difference(self, other: Iterable[Link]) -> "LinkSet":
+        return LinkSet(self.LinkCls,
+                       np.setdiff1d(self._keys,
+                                    self._other_keys(other),
+                                    assume_unique=True),
+                       _unique=True)
+
+    def isdisjoint(self, other: "LinkSet") -> bool:
+        """True if no pair of ASNs is in both, regardless of direction"""
+
+        return len(np.intersect1d(self.unordered_keys,
+                                  other.unordered_keys,
+                                  assume_unique=True)) == 0
+
+    __or__ = union
+    __and__ = intersection
+    __sub__ = difference
+
+##################
+# Iterator funcs #
+##################
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __iter__(self) -> Iterator[Link]:
+        view = self.LinkCls._view
+        for asn1, asn2 in zip(self.asns1.tolist(), self.asns2.tolist()):
+            yield view(asn1, asn2)
+
+    def __contains__(self, link: Any) -> bool:
+        key = self._key(link)
+        i = int(np.searchsorted(self._keys, np.uint64(key)))
+        return i < len(self._keys) and int(self._keys[i]) == key
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, LinkSet):
+            return (self.LinkCls is other.LinkCls
+                    and np.array_equal(self._keys, other._keys))
+        elif isinstance(other, (set, frozenset)):
+            if len(other) == 0:
+                return len(self) == 0
+            return self == LinkSet.from_links(other, self.LinkCls)
+        else:
+            return NotImplemented
+
+    # Unhashable, the same as set
+    __hash__ = None  # type: ignore
+
+    def __repr__(self) -> str:
+        return f"LinkSet({self.LinkCls.__name__}, {len(self)} links)"
@@ -6,23 +6,31 @@ from .link import Link
 class PeerLink(Link):
     """Stores the info for a peer link"""
 
+    __slots__: Tuple[str, ...] = tuple()
+
     def __init__(self,
                  peer1_asn: int,
                  peer2_asn: int):
         """Saves the link info"""
 
-        self.__peer_asns: Tuple[int, int] = tuple(
-            sorted([int(peer1_asn), int(peer2_asn)]))  # type: ignore
-        super(PeerLink, self).__init__()
+        peer1_asn, peer2_asn = int(peer1_asn), int(peer2_asn)
+        self._asns: Tuple[int, int] = ((peer1_asn, peer2_asn)
+                                       if peer1_asn < peer2_asn
+                                       else (peer2_asn, peer1_asn))
 
-    @property
-    def peer_asns(self) -> Tuple[int, int]:
-        """Returns peer asns. Done this way for immutability/hashing"""
+    @classmethod
+    def _view(cls, peer1_asn: int, peer2_asn: int) -> "PeerLink":
+        """Creates a link from trusted sorted ints without any conversions
 
-        return self.__peer_asns
+        Used by LinkSet when iterating
+        """
+
+        link = cls.__new__(cls)
+        link._asns = (peer1_asn, peer2_asn)
+        return link
 
     @property
-    def asns(self) -> Tuple[int, int]:
-        """Returns asns associated with this link"""
+    def peer_asns(self) -> Tuple[int, int]:
+        """Returns peer asns. Done this way for immutability/hashing"""
 
-        return tuple(sorted(self.__peer_asns))  # type: ignore
+        return self._asns
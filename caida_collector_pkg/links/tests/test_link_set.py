@@ -0,0 +1,65 @@
+import pytest
+
+from ..customer_provider_link import CustomerProviderLink as CPLink
+from ..link_set import LinkSet
+from ..peer_link import PeerLink
+
+
+@pytest.mark.link_set
+class TestLinkSet:
+    """Tests the packed LinkSet against sets of link objects"""
+
+    def test_from_arrays_dedups(self):
+        """Duplicate links are removed, peers regardless of order"""
+
+        cp_links = LinkSet.from_arrays(CPLink, [1, 1, 2], [3, 3, 3])
+        assert len(cp_links) == 2
+        assert cp_links == set([CPLink(provider_asn=1, customer_asn=3),
+                                CPLink(provider_asn=2, customer_asn=3)])
+        peer_links = LinkSet.from_arrays(PeerLink, [5, 6], [6, 5])
+        assert len(peer_links) == 1
+        assert list(peer_links) == [PeerLink(5, 6)]
+
+    def test_iteration_views(self):
+        """Iterating yields link objects with the right direction"""
+
+        cp_links = LinkSet.from_arrays(CPLink, [10], [20])
+        link = next(iter(cp_links))
+        assert isinstance(link, CPLink)
+        assert link.provider_asn == 10
+        assert link.customer_asn == 20
+        assert link.asns == (10, 20)
+
+    def test_membership(self):
+        """Membership works for links and for tuples"""
+
+        cp_links = LinkSet.from_arrays(CPLink, [1], [2])
+        assert CPLink(provider_asn=1, customer_asn=2) in cp_links
+        assert (1, 2) in cp_links
+        # Customer provider links have a direction
+        assert (2, 1) not in cp_links
+        peer_links = LinkSet.from_arrays(PeerLink, [4_000_000_000], [7])
+        assert (4_000_000_000, 7) in peer_links
+        assert PeerLink(7, 4_000_000_000) in peer_links
+        assert (7, 8) not in peer_links
+
+    def test_set_funcs(self):
+        """Union, intersection and difference"""
+
+        links1 = LinkSet.from_arrays(PeerLink, [1, 2], [2, 3])
+        links2 = LinkSet.from_links([PeerLink(3, 2), PeerLink(4, 5)])
+        assert links1 | links2 == set([PeerLink(1, 2),
+                                       PeerLink(2, 3),
+                                       PeerLink(4, 5)])
+        assert links1 & links2 == set([PeerLink(2, 3)])
+        assert links1 - links2 == set([PeerLink(1, 2)])
+        with pytest.raises(Exception):
+            links1 | LinkSet.from_arrays(CPLink, [1], [2])
+
+    def test_isdisjoint(self):
+        """Customer provider links are compared against peers unordered"""
+
+        cp_links = LinkSet.from_arrays(CPLink, [2], [1])
+        assert not cp_links.isdisjoint(LinkSet.from_arrays(PeerLink, [1],
+                                                           [2]))
+        assert cp_links.isdisjoint(LinkSet.from_arrays(PeerLink, [1], [3]))
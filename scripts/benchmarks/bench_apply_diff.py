@@ -0,0 +1,58 @@
+"""Times applying a month's diff against rebuilding the graph
+
+python scripts/benchmarks/bench_apply_diff.py [num_ases] [percent changed]
+
+Removes and adds a percent of the links of a synthetic graph shaped like
+Caida's (see bench_propagation_ranks.py). Added links go from providers
+to customers of a lower rank, so no cycles form
+"""
+
+import random
+import sys
+import time
+
+from caida_collector_pkg import BGPDAG, CustomerProviderLink as CPLink
+from caida_collector_pkg import LinkSet
+
+from bench_propagation_ranks import synthetic_dag
+
+
+def main():
+    num_ases = int(sys.argv[1]) if len(sys.argv) > 1 else 75000
+    percent = float(sys.argv[2]) if len(sys.argv) > 2 else 1
+    rand = random.Random(0)
+    bgp_dag = synthetic_dag(num_ases)
+    cp_links = LinkSet.from_links(
+        [CPLink(provider_asn=x.asn, customer_asn=y.asn)
+         for x in bgp_dag for y in x.customers], CPLink)
+
+    num_changed = int(len(cp_links) * percent / 100)
+    removed_cp = LinkSet.from_links(rand.sample(list(cp_links), num_changed),
+                                    CPLink)
+    added = set()
+    while len(added) < num_changed:
+        provider, customer = rand.sample(bgp_dag.ases, 2)
+        if (provider.propagation_rank > customer.propagation_rank
+                and customer not in provider.customers):
+            added.add(CPLink(provider_asn=provider.asn,
+                             customer_asn=customer.asn))
+    added_cp = LinkSet.from_links(added, CPLink)
+    new_cp = (cp_links - removed_cp) | added_cp
+
+    start = time.perf_counter()
+    BGPDAG(new_cp, set())
+    rebuild_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    bgp_dag.apply_diff(added_cp, removed_cp, set(), set())
+    diff_time = time.perf_counter() - start
+
+    print(f"{num_ases} ASes, {num_changed} of {len(cp_links)} customer "
+          "provider links removed and added")
+    print(f"rebuild: {rebuild_time:.2f}s")
+    print(f"apply_diff: {diff_time:.2f}s "
+          f"({rebuild_time / diff_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""Measures the memory used by each AS object
+
+python scripts/benchmarks/bench_as_memory.py [num_ases]
+
+Reports the size of an AS instance (plus its __dict__, if it has one)
+and the tracemalloc peak/retained memory of building a synthetic graph
+(see bench_propagation_ranks.py)
+"""
+
+import sys
+import tracemalloc
+
+from bench_propagation_ranks import synthetic_dag
+
+
+def instance_bytes(as_obj) -> int:
+    """Bytes of the instance itself, not the objects it refers to"""
+
+    size = sys.getsizeof(as_obj)
+    if hasattr(as_obj, "__dict__"):
+        size += sys.getsizeof(as_obj.__dict__)
+    return size
+
+
+def main():
+    num_ases = int(sys.argv[1]) if len(sys.argv) > 1 else 75000
+
+    tracemalloc.start()
+    bgp_dag = synthetic_dag(num_ases)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    per_as = sum(instance_bytes(x) for x in bgp_dag) / len(bgp_dag)
+    print(f"{len(bgp_dag)} ASes, has __dict__: "
+          f"{hasattr(bgp_dag.ases[0], '__dict__')}")
+    print(f"instance bytes per AS: {per_as:.0f}")
+    print(f"graph build: peak {peak / 1e6:.1f}MB, "
+          f"retained {retained / 1e6:.1f}MB "
+          f"({retained / len(bgp_dag):.0f} bytes per AS)")
+
+
+if __name__ == "__main__":
+    main()
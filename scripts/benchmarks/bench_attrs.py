@@ -0,0 +1,62 @@
+"""Times per AS attr updates and reductions, by AS against by column
+
+python scripts/benchmarks/bench_attrs.py [num_ases]
+
+Uses a synthetic graph shaped like Caida's (see
+bench_propagation_ranks.py). Sets the ROV info of half the ASes, then
+counts the ROV filtering ASes of each propagation rank
+"""
+
+import sys
+import time
+
+import numpy as np
+
+from bench_propagation_ranks import synthetic_dag
+
+
+def by_as(bgp_dag, idxs):
+    for idx in idxs.tolist():
+        as_obj = bgp_dag.ases[idx]
+        as_obj.rov_filtering = "all"
+        as_obj.rov_confidence = .5
+    counts = [0] * len(bgp_dag.propagation_ranks)
+    for as_obj in bgp_dag:
+        if as_obj.rov_filtering:
+            counts[as_obj.propagation_rank] += 1
+    return counts
+
+
+def by_column(bgp_dag, ranks, idxs):
+    bgp_dag.attrs["rov_filtering"][idxs] = "all"
+    bgp_dag.attrs["rov_confidence"][idxs] = .5
+    return np.bincount(ranks[bgp_dag.attrs["rov_filtering"] != ""],
+                       minlength=len(bgp_dag.propagation_ranks)).tolist()
+
+
+def main():
+    num_ases = int(sys.argv[1]) if len(sys.argv) > 1 else 75000
+    bgp_dag = synthetic_dag(num_ases)
+    ranks = bgp_dag.to_columnar().ases["propagation_rank"]
+    idxs = np.random.default_rng(0).permutation(num_ases)[:num_ases // 2]
+
+    # Start without combined.csv's ROV info
+    for attr in ("rov_filtering", "rov_confidence"):
+        bgp_dag.attrs.reset(attr)
+    start = time.perf_counter()
+    as_counts = by_as(bgp_dag, idxs)
+    as_time = time.perf_counter() - start
+    for attr in ("rov_filtering", "rov_confidence"):
+        bgp_dag.attrs.reset(attr)
+    start = time.perf_counter()
+    column_counts = by_column(bgp_dag, ranks, idxs)
+    column_time = time.perf_counter() - start
+    assert as_counts == column_counts
+
+    print(f"{num_ases} ASes, {len(idxs)} updated")
+    print(f"by AS: {as_time:.3f}s")
+    print(f"by column: {column_time:.4f}s ({as_time / column_time:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Times workers loading a snapshot against attaching to a BGPDAGView
+
+python scripts/benchmarks/bench_bgp_dag_view.py [num_ases] [workers]
+
+Uses a synthetic graph shaped like Caida's, with peers
+(see bench_propagation_ranks.py). Each worker loads the graph, walks
+every customer list, and reports its load time and private memory
+(RssAnon, which doesn't count the shared file pages)
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import sys
+from tempfile import TemporaryDirectory
+import time
+
+from caida_collector_pkg import BGPDAG, BGPDAGView
+
+from bench_propagation_ranks import synthetic_dag
+
+
+def rss_anon_mb() -> float:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("RssAnon"):
+                return int(line.split()[1]) / 1024
+    return 0
+
+
+def load_snapshot(path: Path):
+    start_rss = rss_anon_mb()
+    start = time.perf_counter()
+    bgp_dag = BGPDAG.from_snapshot(path)
+    load_time = time.perf_counter() - start
+    sum(len(x.customers) for x in bgp_dag)
+    return load_time, rss_anon_mb() - start_rss
+
+
+def attach_view(path: Path):
+    start_rss = rss_anon_mb()
+    start = time.perf_counter()
+    view = BGPDAGView(path)
+    load_time = time.perf_counter() - start
+    indptr, indices = view.customers_csr
+    int(indices.sum()) + int(indptr[-1])
+    return load_time, rss_anon_mb() - start_rss
+
+
+def main():
+    num_ases = int(sys.argv[1]) if len(sys.argv) > 1 else 75000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    bgp_dag = synthetic_dag(num_ases, 400000)
+
+    with TemporaryDirectory() as tmp_name:
+        snapshot_path = Path(tmp_name) / "dag.npz"
+        shared_path = Path(tmp_name) / "dag.npy"
+        bgp_dag.to_snapshot(snapshot_path)
+        bgp_dag.to_shared(shared_path)
+        print(f"{num_ases} ASes, {workers} workers")
+        for name, func, path in (("snapshot", load_snapshot, snapshot_path),
+                                 ("view", attach_view, shared_path)):
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(func, [path] * workers))
+            load_time = max(x[0] for x in results)
+            rss = sum(x[1] for x in results)
+            print(f"{name}: {load_time * 1000:.1f}ms to load, "
+                  f"{rss:.1f}MB private memory across workers")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Times serial vs parallel bz2 decompression of relationship files
+
+python scripts/benchmarks/bench_bz2.py [path.bz2] [jobs]
+
+Without a path, uses a synthetic file about the size of a serial-2 file
+"""
+
+import bz2
+import os
+from pathlib import Path
+import random
+import sys
+from tempfile import TemporaryDirectory
+import time
+
+from caida_collector_pkg.caida_collector.bz2_funcs import decompress_parallel
+
+
+def synthetic_file(path: Path, num_lines: int = 500000):
+    rand = random.Random(0)
+    lines = [f"{rand.randint(1, 400000)}|{rand.randint(1, 400000)}|"
+             f"{rand.choice(('-1', '0'))}|bgp" for _ in range(num_lines)]
+    path.write_bytes(bz2.compress(("\n".join(lines) + "\n").encode()))
+
+
+def main():
+    jobs = int(sys.argv[2]) if len(sys.argv) > 2 else (os.cpu_count() or 1)
+    with TemporaryDirectory() as tmp_dir:
+        if len(sys.argv) > 1:
+            path = Path(sys.argv[1])
+        else:
+            path = Path(tmp_dir) / "synthetic.bz2"
+            synthetic_file(path)
+
+        start = time.perf_counter()
+        serial = bz2.decompress(path.read_bytes())
+        serial_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        parallel = b"".join(decompress_parallel(path, jobs))
+        parallel_time = time.perf_counter() - start
+
+    assert serial == parallel, "Output differs"
+    print(f"{path.name}: {len(serial) / 1e6:.1f}MB decompressed")
+    print(f"serial: {serial_time:.2f}s")
+    print(f"parallel ({jobs} jobs): {parallel_time:.2f}s "
+          f"({serial_time / parallel_time:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Times classifying ASes against recomputing classifications
+
+python scripts/benchmarks/bench_classification.py [num_ases]
+
+Compares building the category sets and reading every AS's
+classifications (like the TSV does) with and without the cached flags,
+on a synthetic graph shaped like Caida's (see bench_propagation_ranks.py)
+"""
+
+import sys
+import time
+
+from bench_propagation_ranks import synthetic_dag
+
+
+def old_category_sets(bgp_dag):
+    """The old way, every property is recomputed on each access"""
+
+    stub_ases = set([x for x in bgp_dag if x.stub])
+    mh_ases = set([x for x in bgp_dag if x.multihomed])
+    input_clique_ases = set([x for x in bgp_dag if x.input_clique])
+    etc_ases = set([x for x in bgp_dag if not
+                    (x.stub or x.multihomed or x.input_clique)])
+    stub_asns = set([x.asn for x in bgp_dag if x.stub])
+    mh_asns = set([x.asn for x in bgp_dag if x.multihomed])
+    input_clique_asns = set([x.asn for x in bgp_dag if x.input_clique])
+    etc_asns = set([x.asn for x in bgp_dag if not
+                    (x.stub or x.multihomed or x.input_clique)])
+    return (stub_ases, mh_ases, input_clique_ases, etc_ases,
+            stub_asns, mh_asns, input_clique_asns, etc_asns)
+
+
+def read_all(bgp_dag):
+    """Reads every classification once, like writing the TSV does"""
+
+    for x in bgp_dag:
+        x.stubs, x.stub, x.multihomed, x.transit, x.neighbors
+
+
+def timed(func, *args) -> float:
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    num_ases = int(sys.argv[1]) if len(sys.argv) > 1 else 75000
+    bgp_dag = synthetic_dag(num_ases)
+
+    cached_sets = timed(bgp_dag._classify_ases)
+    cached_reads = timed(read_all, bgp_dag)
+    for as_obj in bgp_dag:
+        as_obj._clear_classification()
+    old_sets = timed(old_category_sets, bgp_dag)
+    old_reads = timed(read_all, bgp_dag)
+
+    print(f"{num_ases} ASes")
+    print(f"category sets: recomputed {old_sets:.3f}s, "
+          f"one pass {cached_sets:.3f}s")
+    print(f"reading every classification: recomputed {old_reads:.3f}s, "
+          f"cached {cached_reads:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
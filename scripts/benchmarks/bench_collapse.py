@@ -0,0 +1,91 @@
+"""Times a propagation loop on a graph against its stub collapsed graph
+
+python scripts/benchmarks/bench_collapse.py [num_ases]
+
+Uses a synthetic graph shaped like Caida's (see bench_propagation_ranks.py).
+The loop sends a route up and then down the propagation ranks, as
+simulations do, and the collapsed graph's results are expanded back.
+About 3 in 10 of its ASes are single homed stubs
+"""
+
+import gc
+import sys
+import time
+
+import numpy as np
+
+from bench_propagation_ranks import synthetic_dag
+
+
+def propagate(bgp_dag, origin):
+    """{asn: path length} of a route from origin, sent up to providers
+    and then down to customers, rank by rank
+    """
+
+    lengths = {origin: 0}
+    for rank in bgp_dag.propagation_ranks:
+        for as_obj in rank:
+            _best(as_obj, as_obj.customers, lengths)
+    for rank in reversed(bgp_dag.propagation_ranks):
+        for as_obj in rank:
+            _best(as_obj, as_obj.providers, lengths)
+    return lengths
+
+
+def _best(as_obj, neighbors, lengths):
+    """Keeps the shortest of an AS's route and its neighbors' routes"""
+
+    for neighbor in neighbors:
+        length = lengths.get(neighbor.asn)
+        if length is not None and length + 1 < lengths.get(as_obj.asn,
+                                                           num_hops_max):
+            lengths[as_obj.asn] = length + 1
+
+
+num_hops_max = 2**31
+
+
+def best_time(func, *args, repeat=10):
+    """Fastest of several runs, without GC pauses as in timeit"""
+
+    times = []
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func(*args)
+            times.append(time.perf_counter() - start)
+    finally:
+        gc.enable()
+    return min(times)
+
+
+def main():
+    num_ases = int(sys.argv[1]) if len(sys.argv) > 1 else 75000
+    bgp_dag = synthetic_dag(num_ases)
+
+    # A single homed stub, which would be folded if it weren't kept
+    origin = max(x.asn for x in bgp_dag
+                 if x.stub and len(x.providers) == 1)
+    start = time.perf_counter()
+    collapsed = bgp_dag.collapse_stubs(keep={origin})
+    collapse_time = time.perf_counter() - start
+
+    full_time = best_time(propagate, bgp_dag, origin)
+    reduced_time = best_time(propagate, collapsed.dag, origin)
+    lengths = propagate(collapsed.dag, origin)
+    expand_time = best_time(collapsed.expand, lengths)
+    length_arr = np.array([lengths[x] for x in collapsed.dag.idx_to_asn])
+    expand_array_time = best_time(collapsed.expand_array, length_arr)
+
+    print(f"{num_ases} ASes, {len(collapsed.dag)} after folding "
+          f"{len(collapsed.folded)} stubs ({collapse_time:.3f}s, once)")
+    print(f"propagation: {full_time:.3f}s, on the collapsed graph: "
+          f"{reduced_time:.3f}s ({full_time / reduced_time:.1f}x)")
+    print(f"expanding a dict: {expand_time:.4f}s, "
+          f"an array: {expand_array_time:.5f}s")
+
+
+if __name__ == "__main__":
+    main()
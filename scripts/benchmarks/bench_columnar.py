@@ -0,0 +1,63 @@
+"""Times loading the TSV's sets against loading columnar tables
+
+python scripts/benchmarks/bench_columnar.py [num_ases] [num_peer_links]
+
+Uses a synthetic graph shaped like Caida's, with peers
+(see bench_propagation_ranks.py). Loading the TSV parses every
+{asn,asn,...} set into links, the way analytics jobs do
+"""
+
+import csv
+from pathlib import Path
+import sys
+from tempfile import TemporaryDirectory
+import time
+
+from caida_collector_pkg import BGPDAG, CaidaCollector
+
+from bench_propagation_ranks import synthetic_dag
+
+
+def load_tsv(path: Path):
+    """Returns the link triples of the TSV"""
+
+    edges = []
+    with path.open(mode="r") as f:
+        for row in csv.DictReader(f, delimiter="\t"):
+            asn = int(row["asn"])
+            for customer in row["customers"][1:-1].split(","):
+                if customer:
+                    edges.append((asn, int(customer), -1))
+            for peer in row["peers"][1:-1].split(","):
+                if peer and asn < int(peer):
+                    edges.append((asn, int(peer), 0))
+    return edges
+
+
+def timed(func, *args) -> float:
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    num_ases = int(sys.argv[1]) if len(sys.argv) > 1 else 75000
+    num_peer_links = int(sys.argv[2]) if len(sys.argv) > 2 else 400000
+    bgp_dag = synthetic_dag(num_ases, num_peer_links)
+
+    with TemporaryDirectory() as tmp_name:
+        tsv_path = Path(tmp_name) / "dag.tsv"
+        CaidaCollector()._write_tsv(bgp_dag, tsv_path)
+        tsv_time = timed(load_tsv, tsv_path)
+        print(f"{num_ases} ASes, {num_peer_links} peer links")
+        print(f"parse TSV: {tsv_time:.2f}s")
+        for fmt, name in (("npz", "dag.npz"), ("npy", "dag")):
+            path = Path(tmp_name) / name
+            write_time = timed(bgp_dag.to_columnar, path, fmt)
+            read_time = timed(BGPDAG.read_columnar, path, fmt)
+            print(f"{fmt}: write {write_time:.2f}s, read {read_time:.3f}s "
+                  f"({tsv_time / read_time:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
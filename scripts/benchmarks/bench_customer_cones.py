@@ -0,0 +1,67 @@
+"""Times customer cones and measures their peak memory
+
+python scripts/benchmarks/bench_customer_cones.py [num_ases]
+
+Compares the bitset engine against the old set based algorithm on a
+synthetic graph shaped like Caida's (see bench_propagation_ranks.py)
+"""
+
+import sys
+import time
+import tracemalloc
+from typing import Dict, Set
+
+from bench_propagation_ranks import synthetic_dag
+
+
+def set_cone_sizes(bgp_dag) -> Dict[int, int]:
+    """The old algorithm"""
+
+    cone_dict: Dict[int, Set[int]] = dict()
+
+    def helper(as_obj):
+        if as_obj.asn not in cone_dict:
+            cone_dict[as_obj.asn] = set()
+            for customer in as_obj.customers:
+                cone_dict[as_obj.asn].add(customer.asn)
+                cone_dict[as_obj.asn].update(helper(customer))
+        return cone_dict[as_obj.asn]
+
+    for as_obj in bgp_dag:
+        if as_obj.stub or as_obj.multihomed:
+            cone_dict[as_obj.asn] = set()
+    return {x.asn: len(helper(x)) for x in bgp_dag}
+
+
+def measure(func, *args):
+    """Returns func's result, time, and peak traced memory in MB
+
+    Memory is traced in a second run, since tracing slows it down
+    """
+
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    func(*args)
+    peak = tracemalloc.get_traced_memory()[1] / 1e6
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    num_ases = int(sys.argv[1]) if len(sys.argv) > 1 else 75000
+    bgp_dag = synthetic_dag(num_ases)
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), num_ases + 100))
+
+    expected, set_time, set_peak = measure(set_cone_sizes, bgp_dag)
+    _, bitset_time, bitset_peak = measure(bgp_dag._get_customer_cone_size)
+
+    assert {x.asn: x.customer_cone_size for x in bgp_dag} == expected
+    print(f"{num_ases} ASes, largest cone {max(expected.values())}")
+    print(f"sets: {set_time:.2f}s, peak {set_peak:.1f}MB")
+    print(f"bitsets: {bitset_time:.2f}s, peak {bitset_peak:.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
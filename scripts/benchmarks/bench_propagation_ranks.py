@@ -0,0 +1,74 @@
+"""Times propagation rank assignment against the old recursive algorithm
+
+python scripts/benchmarks/bench_propagation_ranks.py [num_ases]
+
+Uses a synthetic graph shaped like Caida's: every AS buys transit from
+a few providers that are earlier (closer to the clique) than it is, and
+about 1 in 7 ASes are transit providers
+"""
+
+import random
+import sys
+import time
+from typing import Dict
+
+from caida_collector_pkg import BGPDAG, CustomerProviderLink as CPLink
+from caida_collector_pkg import PeerLink
+
+
+def synthetic_dag(num_ases: int, num_peer_links: int = 0) -> BGPDAG:
+    rand = random.Random(0)
+    cp_links = set()
+    for asn in range(2, num_ases + 1):
+        # Skewed towards low ASNs, like large transit providers
+        for _ in range(rand.randint(1, 3)):
+            provider = int(rand.random() ** 2
+                           * min(asn - 1, num_ases // 7)) + 1
+            cp_links.add(CPLink(provider_asn=provider, customer_asn=asn))
+    linked = set(x.asns for x in cp_links)
+    peer_links = set()
+    while len(peer_links) < num_peer_links:
+        asn1, asn2 = sorted(rand.sample(range(1, num_ases + 1), 2))
+        if (asn1, asn2) not in linked and (asn2, asn1) not in linked:
+            peer_links.add(PeerLink(asn1, asn2))
+    return BGPDAG(cp_links, peer_links)
+
+
+def recursive_ranks(bgp_dag: BGPDAG) -> Dict[int, int]:
+    """The old algorithm"""
+
+    ranks: Dict[int, int] = dict()
+
+    def helper(as_obj, rank):
+        if ranks.get(as_obj.asn, -1) < rank:
+            ranks[as_obj.asn] = rank
+            for provider_obj in as_obj.providers:
+                helper(provider_obj, rank + 1)
+
+    for as_obj in bgp_dag:
+        helper(as_obj, 0)
+    return ranks
+
+
+def main():
+    num_ases = int(sys.argv[1]) if len(sys.argv) > 1 else 75000
+    bgp_dag = synthetic_dag(num_ases)
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), num_ases + 100))
+
+    start = time.perf_counter()
+    expected = recursive_ranks(bgp_dag)
+    recursive_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    bgp_dag._assign_propagation_ranks()
+    topological_time = time.perf_counter() - start
+
+    assert {x.asn: x.propagation_rank for x in bgp_dag} == expected
+    print(f"{num_ases} ASes, {max(expected.values())} ranks")
+    print(f"recursive: {recursive_time:.3f}s")
+    print(f"topological: {topological_time:.3f}s "
+          f"({recursive_time / topological_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
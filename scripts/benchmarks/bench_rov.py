@@ -0,0 +1,79 @@
+"""Times the ROV join against reading the CSV row by row per graph
+
+python scripts/benchmarks/bench_rov.py [num_ases] [num_rows]
+
+Uses a synthetic graph shaped like Caida's (see
+bench_propagation_ranks.py) and a synthetic ROV CSV with num_rows rows
+"""
+
+import csv
+from pathlib import Path
+import random
+import sys
+from tempfile import TemporaryDirectory
+import time
+
+from caida_collector_pkg.graph.rov_funcs import read_rov_table
+
+from bench_propagation_ranks import synthetic_dag
+
+
+def add_rows(bgp_dag, path: Path):
+    """The row by row join that every graph used to do"""
+
+    with path.open() as f:
+        for row in csv.DictReader(f):
+            as_ = bgp_dag.as_dict.get(int(row["asn"]))
+            if as_ is not None:
+                as_.rov_filtering = row["filtering"]
+                as_.rov_confidence = float(row["confidence"])
+                as_.rov_source = row["source"]
+
+
+def timed(func, *args) -> float:
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    num_ases = int(sys.argv[1]) if len(sys.argv) > 1 else 75000
+    num_rows = int(sys.argv[2]) if len(sys.argv) > 2 else 50000
+    bgp_dag = synthetic_dag(num_ases)
+    random.seed(0)
+
+    with TemporaryDirectory() as tmp_name:
+        path = Path(tmp_name) / "rov.csv"
+        with path.open(mode="w") as f:
+            writer = csv.writer(f)
+            writer.writerow(["asn", "filtering", "confidence", "source"])
+            for _ in range(num_rows):
+                writer.writerow([random.randrange(num_ases * 2),
+                                 random.choice(["all", "peers"]),
+                                 random.choice([1, .2]),
+                                 random.choice(["tma", "cloudflare"])])
+        # Start from the defaults, as reannotate does
+        for as_obj in bgp_dag:
+            as_obj.rov_filtering = ""
+            as_obj.rov_confidence = -1
+            as_obj.rov_source = ""
+        rows_time = timed(add_rows, bgp_dag, path)
+        expected = [(x.rov_filtering, x.rov_confidence, x.rov_source)
+                    for x in bgp_dag]
+        cold_time = timed(bgp_dag._add_extra_csv_info, path)
+        warm_time = timed(bgp_dag._add_extra_csv_info, path)
+        table = read_rov_table(path)
+        reannotate_time = timed(bgp_dag.reannotate, table)
+        assert expected == [(x.rov_filtering, x.rov_confidence, x.rov_source)
+                            for x in bgp_dag]
+
+    print(f"{num_ases} ASes, {num_rows} ROV rows")
+    print(f"row by row: {rows_time:.3f}s")
+    print(f"join, parsing the CSV: {cold_time:.3f}s")
+    print(f"join, cached table: {warm_time:.3f}s "
+          f"({rows_time / warm_time:.1f}x)")
+    print(f"reannotate: {reannotate_time:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
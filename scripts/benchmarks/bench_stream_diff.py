@@ -0,0 +1,87 @@
+"""Times and measures the memory of streaming the diff of two months
+
+python scripts/benchmarks/bench_stream_diff.py [num_links] [partitions]
+
+Writes two synthetic as-rel2 files that differ in 1% of their links,
+and compares stream_diff against diffing two dicts held in memory (the
+least that diffing without partitions needs; building the graphs needs
+far more)
+"""
+
+from datetime import datetime
+from pathlib import Path
+import random
+import sys
+from tempfile import TemporaryDirectory
+import time
+import tracemalloc
+
+from caida_collector_pkg import CaidaCollector
+
+
+def write_months(tmp_dir: Path, num_links: int):
+    rand = random.Random(0)
+    links = set()
+    while len(links) < num_links:
+        asn1, asn2 = rand.sample(range(1, num_links // 2), 2)
+        links.add((asn1, asn2, rand.choice((-1, 0))))
+    links = sorted(links)
+    new_links = list(links)
+    for i in rand.sample(range(len(new_links)), num_links // 100):
+        asn1, asn2, rel = new_links[i]
+        new_links[i] = (asn2, asn1, rel) if rel else (asn1, asn2, -1)
+    for name, month_links in (("2021.09.01", links),
+                              ("2021.10.01", new_links)):
+        with (tmp_dir / name).open(mode="w") as f:
+            f.write("# input clique: 1 2 3\n# IXP ASes: 4 5\n")
+            for asn1, asn2, rel in month_links:
+                f.write(f"{asn1}|{asn2}|{rel}|bgp\n")
+
+
+def in_memory_diff(tmp_dir: Path) -> int:
+    months = []
+    for name in ("2021.09.01", "2021.10.01"):
+        with (tmp_dir / name).open() as f:
+            months.append({tuple(x.split("|")[:2]): x.split("|")[2]
+                           for x in f if not x.startswith("#")})
+    old, new = months
+    return sum(old.get(x) != new.get(x) for x in old.keys() | new.keys())
+
+
+def measure(func):
+    """Returns func's result, time, and peak traced memory in MB
+
+    Memory is traced in a second run, since tracing slows it down
+    """
+
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1] / 1e6
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    num_links = int(sys.argv[1]) if len(sys.argv) > 1 else 500000
+    partitions = int(sys.argv[2]) if len(sys.argv) > 2 else 64
+    collector = CaidaCollector(index_cache_path=None)
+    with TemporaryDirectory() as tmp_name:
+        tmp_dir = Path(tmp_name)
+        write_months(tmp_dir, num_links)
+        changes, stream_time, stream_peak = measure(lambda: sum(
+            1 for _ in collector.stream_diff(datetime(2021, 9, 1),
+                                             datetime(2021, 10, 1),
+                                             cache_dir=tmp_dir,
+                                             partitions=partitions)))
+        _, dict_time, dict_peak = measure(lambda: in_memory_diff(tmp_dir))
+    print(f"{num_links} links, {changes} changes")
+    print(f"in memory: {dict_time:.2f}s, peak {dict_peak:.1f}MB")
+    print(f"stream_diff ({partitions} partitions): {stream_time:.2f}s, "
+          f"peak {stream_peak:.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Times extracting subgraphs against building them from filtered links
+
+python scripts/benchmarks/bench_subgraph.py [num_ases]
+
+Uses a synthetic graph shaped like Caida's, with peers
+(see bench_propagation_ranks.py)
+"""
+
+import sys
+import time
+
+from caida_collector_pkg import BGPDAG, CustomerProviderLink, PeerLink
+
+from bench_propagation_ranks import synthetic_dag
+
+
+def rebuild(bgp_dag, asns):
+    """Filters the links by hand and builds a new graph
+
+    ASes without links between them aren't in it, as there's no link to
+    build them from. If none have links, the graph is empty
+    """
+
+    cp_links = set()
+    peer_links = set()
+    for as_obj in bgp_dag:
+        for customer in as_obj.customers:
+            if as_obj.asn in asns and customer.asn in asns:
+                cp_links.add(CustomerProviderLink(provider_asn=as_obj.asn,
+                                                  customer_asn=customer.asn))
+        for peer in as_obj.peers:
+            if as_obj.asn in asns and peer.asn in asns:
+                peer_links.add(PeerLink(as_obj.asn, peer.asn))
+    return BGPDAG(cp_links, peer_links)
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    num_ases = int(sys.argv[1]) if len(sys.argv) > 1 else 75000
+    # About 5 peer links per AS, as in Caida's graph
+    bgp_dag = synthetic_dag(num_ases, min(num_ases * 5, 400000))
+    # Warm the cached index and CSR arrays, which every subgraph reuses
+    bgp_dag.asn_to_idx
+    for rel in ("peers", "providers", "customers"):
+        bgp_dag.csr(rel)
+
+    # A mid sized cone, the 500th largest of 75k ASes
+    as_obj = sorted(bgp_dag, key=lambda x: x.customer_cone_size or 0)[
+        -max(num_ases // 150, 1)]
+    leaf = min(bgp_dag, key=lambda x: len(x.neighbors))
+    print(f"{num_ases} ASes")
+    for name, func, args in (
+            ("cone_subgraph", bgp_dag.cone_subgraph, (as_obj.asn,)),
+            ("khop, k=2", bgp_dag.khop, ({leaf.asn}, 2))):
+        sub_dag, sub_time = timed(func, *args)
+        _, rebuild_time = timed(rebuild, bgp_dag, set(sub_dag.as_dict))
+        print(f"{name} ({len(sub_dag)} ASes): {sub_time:.4f}s, "
+              f"filtering links and rebuilding: {rebuild_time:.3f}s "
+              f"({rebuild_time / sub_time:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
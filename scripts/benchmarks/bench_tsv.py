@@ -0,0 +1,52 @@
+"""Times writing the TSV against writing each db_row with a DictWriter
+
+python scripts/benchmarks/bench_tsv.py [num_ases] [num_peer_links] [jobs]
+
+Uses a synthetic graph shaped like Caida's, with peers
+(see bench_propagation_ranks.py), and checks the TSVs are identical
+"""
+
+from pathlib import Path
+import sys
+from tempfile import TemporaryDirectory
+import time
+
+from caida_collector_pkg import CaidaCollector
+
+from bench_propagation_ranks import synthetic_dag
+
+
+def timed(func, *args) -> float:
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    num_ases = int(sys.argv[1]) if len(sys.argv) > 1 else 75000
+    num_peer_links = int(sys.argv[2]) if len(sys.argv) > 2 else 400000
+    jobs = int(sys.argv[3]) if len(sys.argv) > 3 else 2
+    bgp_dag = synthetic_dag(num_ases, num_peer_links)
+    collector = CaidaCollector()
+
+    with TemporaryDirectory() as tmp_name:
+        paths = [Path(tmp_name) / f"{x}.tsv" for x in range(3)]
+        rows_time = timed(collector._write_tsv_rows, bgp_dag, paths[0])
+        # The CSR arrays are cached after the first write, so clear them
+        bgp_dag._clear_csr()
+        fast_time = timed(collector._write_tsv, bgp_dag, paths[1], 1)
+        bgp_dag._clear_csr()
+        jobs_time = timed(collector._write_tsv, bgp_dag, paths[2], jobs)
+        tsvs = [x.read_bytes() for x in paths]
+        assert tsvs[0] == tsvs[1] == tsvs[2]
+
+    print(f"{num_ases} ASes, {num_peer_links} peer links, "
+          f"{len(tsvs[0]) / 1e6:.1f}MB TSV")
+    print(f"db_row per AS: {rows_time:.2f}s")
+    print(f"columns: {fast_time:.2f}s ({rows_time / fast_time:.1f}x)")
+    print(f"columns, {jobs} jobs: {jobs_time:.2f}s "
+          f"({rows_time / jobs_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()